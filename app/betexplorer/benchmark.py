@@ -0,0 +1,221 @@
+"""Сравнение скорости разборщиков HTML (selectolax Modest и Lexbor) на сохраненных страницах BetExplorer.
+
+Для каждого вида страницы замеряется время разбора HTML, поиска нужного блока и разбора данных функцией parsing_*.
+Для таблиц результатов и расписания отдельно замеряется разбор дат с запоминанием и без.
+
+Запуск: python -m app.betexplorer.benchmark [-n <повторов>] <каталог страниц> [<каталог страниц> ...]
+"""
+import argparse
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Final, NamedTuple
+
+from app.betexplorer.betexplorer import (
+    COLUMN_GAME_DATE,
+    COLUMN_MAPPING,
+    CSS_CHAMPIONSHIPS,
+    CSS_COUNTRIES,
+    CSS_FIXTURE,
+    CSS_MATCH,
+    CSS_PAGE_TEAM,
+    CSS_RESULT,
+    CSS_RESULTS,
+    IS_FIXTURE,
+    IS_RESULT,
+    SPORTS_3,
+    column_layout,
+    parse_date_fixtures,
+    parse_date_results,
+    parsing_btc,
+    parsing_championships,
+    parsing_countries,
+    parsing_match_time,
+    parsing_ou,
+    parsing_results,
+    parsing_team,
+)
+from app.betexplorer.schemas import EVENT_AH, EVENT_OU, SportType, sports_url
+from app.pagestore import PAGE_SUFFIX, FilePageStore
+from app.utilbase import HTML_PARSERS, ReceivedData
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    import datetime  # noqa: ICN001
+
+SPORTS_BY_PATH: dict[str, SportType] = {url.strip('/'): sport_id for sport_id, url in sports_url.items()}
+"""Вид спорта по первой части пути страницы."""
+PARTS_CHAMPIONSHIPS: Final[int] = 2
+"""Количество частей пути страницы чемпионатов страны ('football/england')."""
+PARTS_MATCH: Final[int] = 5
+"""Количество частей пути страницы матча ('football/england/fa-cup/arsenal-chelsea/AbCd1234')."""
+
+
+class PageType(NamedTuple):
+    """Вид страницы для замера."""
+
+    name: str
+    """Название вида страницы."""
+    css: str
+    """Блок страницы, который разбирается ('' - вся страница)."""
+    parse: Callable[[ReceivedData, SportType], Any] | None = None
+    """Разбор данных блока."""
+
+
+class SavedPage(NamedTuple):
+    """Сохраненная страница."""
+
+    data: str | bytes
+    """Содержимое страницы."""
+    creation_date: datetime.datetime
+    """Дата загрузки страницы."""
+    sport_id: SportType
+    """Вид спорта."""
+
+
+PAGE_COUNTRIES = PageType('countries', CSS_COUNTRIES, lambda soup, _: parsing_countries(soup))
+PAGE_CHAMPIONSHIPS = PageType(
+    'championships', CSS_CHAMPIONSHIPS, lambda soup, sport_id: parsing_championships(soup, sport_id, 0))
+PAGE_RESULTS = PageType(
+    'results', CSS_RESULTS, lambda soup, sport_id: parsing_results(soup, sport_id, 0, None, IS_RESULT))
+PAGE_FIXTURES = PageType(
+    'fixtures', CSS_RESULTS, lambda soup, sport_id: parsing_results(soup, sport_id, 0, None, IS_FIXTURE))
+PAGE_TEAM = PageType('team', CSS_PAGE_TEAM, parsing_team)
+PAGE_MATCH = PageType(
+    'match', CSS_MATCH, lambda soup, sport_id: parsing_match_time(soup, sport_id, 0, '', '', 0, IS_RESULT))
+PAGE_BTC = PageType('odds_btc', '', parsing_btc)
+PAGE_OU = PageType('odds_ou', '', lambda soup, sport_id: parsing_ou(soup, sport_id, EVENT_OU))
+PAGE_AH = PageType('odds_ah', '', lambda soup, sport_id: parsing_ou(soup, sport_id, EVENT_AH))
+PAGE_OTHER = PageType('other', '')
+
+
+def page_type(key: str) -> tuple[PageType, SportType]:
+    """Вид страницы и вид спорта по ключу страницы в хранилище.
+
+    :param key: Ключ страницы ('football/england/fa-cup/results.http')
+    """
+    parts: list[str] = key.removesuffix(PAGE_SUFFIX).split('/')
+    if parts[0] == 'match-odds-old':
+        odds: dict[str, PageType] = {'bts': PAGE_BTC, 'ou': PAGE_OU, 'ah': PAGE_AH}
+        return next((odds[part] for part in parts if part in odds), PAGE_OTHER), SportType.FOOTBALL
+    if (sport_id := SPORTS_BY_PATH.get(parts[0])) is None:
+        return PAGE_OTHER, SportType.FOOTBALL
+    kind: PageType = PAGE_OTHER
+    if len(parts) == 1:
+        kind = PAGE_COUNTRIES
+    elif parts[1] == 'team':
+        kind = PAGE_TEAM
+    elif len(parts) == PARTS_CHAMPIONSHIPS:
+        kind = PAGE_CHAMPIONSHIPS
+    elif parts[-1].startswith('results'):
+        kind = PAGE_RESULTS
+    elif parts[-1].startswith('fixtures'):
+        kind = PAGE_FIXTURES
+    elif len(parts) == PARTS_MATCH:
+        kind = PAGE_MATCH
+    return kind, sport_id
+
+
+async def load_pages(root_dirs: list[str]) -> dict[PageType, list[SavedPage]]:
+    """Чтение сохраненных страниц, сгруппированных по видам.
+
+    :param root_dirs: Каталоги с сохраненными страницами
+    """
+    pages: dict[PageType, list[SavedPage]] = {}
+    for root_dir in root_dirs:
+        store = FilePageStore(root_dir)
+        for key in store.keys():  # noqa: SIM118
+            if not key.endswith(PAGE_SUFFIX) or (creation_date := await store.creation_date(key)) is None:
+                continue
+            kind, sport_id = page_type(key)
+            pages.setdefault(kind, []).append(SavedPage(await store.read_html(key), creation_date, sport_id))
+    return pages
+
+
+def benchmark(pages: dict[PageType, list[SavedPage]], backends: tuple[str, ...],
+              repeat: int = 1) -> dict[tuple[str, str], float]:
+    """Замер времени разбора страниц разными разборщиками.
+
+    :param pages: Сохраненные страницы по видам
+    :param backends: Имена разборщиков HTML ('modest', 'lexbor')
+    :param repeat: Количество повторов разбора каждой страницы
+    :return: Среднее время разбора одной страницы в секундах по виду страницы и разборщику
+    """
+    timings: dict[tuple[str, str], float] = {}
+    for kind, saved in pages.items():
+        for backend in backends:
+            parser: type = HTML_PARSERS[backend]
+            start: float = time.perf_counter()
+            for _ in range(repeat):
+                for page in saved:
+                    node = parser(page.data) if kind.css == '' else parser(page.data).css_first(kind.css)
+                    if kind.parse is not None and node is not None:
+                        kind.parse(ReceivedData(node, page.creation_date), page.sport_id)
+            timings[kind.name, backend] = (time.perf_counter() - start) / (repeat * len(saved))
+    return timings
+
+
+def date_texts(page: SavedPage, is_fixture: int) -> list[str]:
+    """Тексты колонки с датой из таблицы результатов или расписания.
+
+    :param page: Сохраненная страница
+    :param is_fixture: Таблица результатов (0) или расписания (1)
+    """
+    texts: list[str] = []
+    index: int = column_layout(COLUMN_MAPPING, is_fixture, page.sport_id in SPORTS_3).index(COLUMN_GAME_DATE)
+    if (table := HTML_PARSERS['modest'](page.data).css_first(
+            CSS_RESULT if is_fixture == IS_RESULT else CSS_FIXTURE)) is not None:
+        for row in table.iter(include_text=False):
+            if row.child is not None and row.child.tag != 'th':
+                cells: list = list(row.iter(include_text=False))
+                if len(cells) > index and (text := cells[index].text(deep=False, strip=True)):
+                    texts.append(text)
+    return texts
+
+
+def benchmark_dates(pages: dict[PageType, list[SavedPage]], repeat: int = 1) -> dict[tuple[str, str], float]:
+    """Замер времени разбора дат таблиц с запоминанием разобранных дат и без.
+
+    :param pages: Сохраненные страницы по видам
+    :param repeat: Количество повторов разбора каждой страницы
+    :return: Среднее время разбора одной даты в секундах по виду страницы и способу ('memo', 'no memo')
+    """
+    timings: dict[tuple[str, str], float] = {}
+    for kind, is_fixture, parse in ((PAGE_RESULTS, IS_RESULT, parse_date_results),
+                                    (PAGE_FIXTURES, IS_FIXTURE, parse_date_fixtures)):
+        tables: list[tuple[list[str], datetime.datetime]] = [
+            (date_texts(page, is_fixture), page.creation_date) for page in pages.get(kind, [])]
+        if not (count := sum(len(texts) for texts, _ in tables) * repeat):
+            continue
+        for method, function in (('no memo', parse.__wrapped__), ('memo', parse)):
+            start: float = time.perf_counter()
+            for _ in range(repeat):
+                for texts, creation_date in tables:
+                    parse.cache_clear()
+                    for text in texts:
+                        function(text, creation_date)
+            timings[kind.name, method] = (time.perf_counter() - start) / count
+    return timings
+
+
+def main() -> None:
+    """Вывод таблицы времени разбора страниц по видам страниц и разборщикам."""
+    arg_parser = argparse.ArgumentParser(description='Сравнение скорости разборщиков HTML на сохраненных страницах')
+    arg_parser.add_argument('root_dirs', nargs='+', help='Каталоги с сохраненными страницами')
+    arg_parser.add_argument('-n', '--repeat', type=int, default=5, help='Количество повторов разбора каждой страницы')
+    args = arg_parser.parse_args()
+    backends: tuple[str, ...] = tuple(backend for backend, parser in HTML_PARSERS.items() if parser is not None)
+    pages: dict[PageType, list[SavedPage]] = asyncio.run(load_pages(args.root_dirs))
+    timings: dict[tuple[str, str], float] = benchmark(pages, backends, args.repeat)
+    print(f'{"Страницы":<15}{"Кол-во":>8}' + ''.join(f'{backend + ", мс":>14}' for backend in backends),  # noqa: T201
+          flush=True)
+    for kind, saved in sorted(pages.items(), key=lambda item: item[0].name):
+        best: str = min(backends, key=lambda backend: timings[kind.name, backend])
+        print(f'{kind.name:<15}{len(saved):>8}'  # noqa: T201
+              + ''.join(f'{timings[kind.name, backend] * 1000:>14.3f}' for backend in backends)
+              + f'  {best}', flush=True)
+    for (name, method), timing in benchmark_dates(pages, args.repeat).items():
+        print(f'Даты {name}, {method}: {timing * 1_000_000:.2f} мкс', flush=True)  # noqa: T201
+
+
+if __name__ == '__main__':
+    main()
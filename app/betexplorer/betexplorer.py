@@ -1,20 +1,35 @@
 """Работа с сайтом Betexplorer."""
 import asyncio
 from asyncio import ProactorEventLoop
+from collections import Counter
+from collections.abc import Callable, Iterator
 from concurrent.futures import Future, ProcessPoolExecutor
 from contextlib import nullcontext
 import datetime
-from multiprocessing import Manager
-from multiprocessing.synchronize import Lock as MultiLock
+import functools
+import multiprocessing
+import multiprocessing.util
+from pathlib import Path
 import re
 import signal
-from typing import TYPE_CHECKING, Any, Callable, Final, Optional
+from typing import TYPE_CHECKING, Any, Final, NamedTuple, Optional
 from urllib.parse import urljoin, urlparse
 
 from selectolax.parser import Node
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.betexplorer.crud import DATABASE_NOT_USE, CRUDbetexplorer, DatabaseUsage
+from app.betexplorer.crud import DATABASE_NOT_USE, DATABASE_WRITE_DATA, CRUDbetexplorer, DatabaseUsage
+from app.betexplorer.freshness import FreshnessPolicy, PageKind
+from app.betexplorer.pipeline import PipelineConfig, StageQueue
+from app.betexplorer.schedule import (
+    CHECKPOINT_FILE,
+    COSTS_FILE,
+    SERVICE_FILES,
+    Checkpoint,
+    SeasonDone,
+    WorkCosts,
+    season_done,
+)
 from app.betexplorer.schemas import (
     EVENT_AH,
     EVENT_BTC,
@@ -25,15 +40,22 @@ from app.betexplorer.schemas import (
     CountryBetexplorer,
     MatchBetexplorer,
     MatchEventBetexplorer,
+    MatchRecord,
+    Record,
     ResultsBetexplorer,
-    ScoreHalvesBetexplorer,
-    ShooterBetexplorer,
+    ScoreHalvesRecord,
+    ShooterRecord,
     SportType,
+    StoredResults,
     TeamBetexplorer,
+    TeamRecord,
     sports_url,
 )
+from app.betexplorer.teams import TeamRegistry
 from app.database import DatabaseSessionManager
-from app.utilbase import LoadSave, ReceivedData
+from app.pagestore import StoreConfig, open_parsed_cache, open_store
+from app.ratelimit import HostLimit, RateLimiter, RetryPolicy, install_limiter
+from app.utilbase import PARSER_MODEST, Freshness, LoadSave, ReceivedData, gather_limited
 
 if TYPE_CHECKING:
     from multiprocessing.managers import SyncManager
@@ -52,6 +74,10 @@ IS_FIXTURE: Final[int] = 1
 
 SPORTS_3: Final[set] = {SportType.FOOTBALL, SportType.HOCKEY, SportType.HANDBALL}
 
+PARSER_VERSION: Final[int] = 2
+"""Версия разбора страниц, увеличивается при изменении функций разбора (сохраненные результаты разбора
+становятся недействительными)."""
+
 COLUMN_MAPPING: Final[dict] = {
     (IS_RESULT, 0, True): COLUMN_TEAMS,
     (IS_RESULT, 0, False): COLUMN_TEAMS,
@@ -119,16 +145,17 @@ COLUMN_MAPPING_OU: Final[dict] = {
 
 REG_ROUND: re.Pattern = re.compile(r'^\d+?(?=. Round)')
 
-REG_DATE: re.Pattern = re.compile(r'^(\d{2})[/.-](\d{2})[/.-](\d{4})')
-REG_DATE_SHORT: re.Pattern = re.compile(r'(\d{2})[/.-](\d{2})[/.-]')
-REG_TODAY: re.Pattern = re.compile(r'Today')
-REG_YESTERDAY: re.Pattern = re.compile(r'Yesterday')
-
-REG_DATE_FIXTURES: re.Pattern = re.compile(r'(\d{2})[.](\d{2})[.](\d{4}) (\d{2}):(\d{2})')
-REG_DATE_SHORT_FIXTURES: re.Pattern = re.compile(r'(\d{2})[.](\d{2})[.] (\d{2}):(\d{2})')
-REG_TODAY_FIXTURES: re.Pattern = re.compile(r'Today (\d{1,2}):(\d{2})')
-REG_TOMORROW_FIXTURES: re.Pattern = re.compile(r'Tomorrow (\d{1,2}):(\d{2})')
-REG_YESTERDAY_FIXTURES: re.Pattern = re.compile(r'Yesterday (\d{1,2}):(\d{2})')
+REG_DATE_RESULTS: re.Pattern = re.compile(
+    r'(?P<day>\d{2})[/.-](?P<month>\d{2})[/.-](?P<year>\d{4})?|(?P<relative>Today|Yesterday)\Z')
+"""Дата в результатах: '31.12.2023', '10.02.' (год загрузки страницы), 'Today', 'Yesterday'."""
+REG_DATE_FIXTURES: re.Pattern = re.compile(
+    r'(?P<day>\d{2})\.(?P<month>\d{2})\.(?P<year>\d{4})? (?P<hour>\d{2}):(?P<minute>\d{2})'
+    r'|(?P<relative>Today|Tomorrow|Yesterday) (?P<relative_hour>\d{1,2}):(?P<relative_minute>\d{2})')
+"""Дата в расписании: '13.11.2023 20:30', '13.03. 20:30' (год загрузки страницы), 'Today 15:00' и т.п."""
+RELATIVE_DAYS: Final[dict[str, int]] = {'Yesterday': -1, 'Today': 0, 'Tomorrow': 1}
+"""Смещение в днях от даты загрузки страницы."""
+DATE_CACHE_SIZE: Final[int] = 4096
+"""Количество запоминаемых разобранных дат (в таблице повторяется небольшое количество разных дат)."""
 
 REG_SCORE_HALVES: re.Pattern = re.compile(r'((?:(\d{1,3}):(\d{1,3}))+),?', re.MULTILINE)
 REG_DATE_MATCH: re.Pattern = re.compile(r'(\d{1,2}),(\d{1,2}),(\d{4}),(\d{1,2}),(\d{1,2})')
@@ -176,16 +203,17 @@ def parsing_countries(soup: Optional[ReceivedData]) -> list[CountryBetexplorer]:
     ] if soup is not None else []
 
 
-async def get_countries(ls: LoadSave, url: str, need_refresh: bool = False) -> Optional[
-    list[CountryBetexplorer]]:  # noqa: FBT001, FBT002
+async def get_countries(ls: LoadSave, url: str, need_refresh: bool = False,  # noqa: FBT001, FBT002
+                        freshness: Freshness | None = None) -> list[CountryBetexplorer] | None:
     """Загрузка страницы стран.
 
     :param ls: Класс для работы с файлами
     :param url: Адрес страницы для разбора
     :param need_refresh: Необходимо обновить данные
+    :param freshness: Требования к свежести сохраненной страницы
     """
     load_countries: Optional[ReceivedData]
-    if (load_countries := await ls.get_read(url, CSS_COUNTRIES, need_refresh)) is not None:
+    if (load_countries := await ls.get_read(url, CSS_COUNTRIES, need_refresh, freshness)) is not None:
         return parsing_countries(load_countries)
     return None
 
@@ -284,27 +312,51 @@ def parsing_stages(soup: ReceivedData) -> list[ChampionshipStageBetexplorer]:
     return ret_main
 
 
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date_results(date_game: str, creation_date: datetime.datetime) -> datetime.datetime | None:
+    """Разбор текста даты в результатах (результат запоминается для текста и даты загрузки страницы).
+
+    :param date_game: Текст даты
+    :param creation_date: Дата создания страницы
+    """
+    if (reg := REG_DATE_RESULTS.match(date_game)) is not None:
+        if (relative := reg['relative']) is None:
+            return datetime.datetime(int(reg['year']) if reg['year'] else creation_date.year,
+                                     int(reg['month']), int(reg['day']))
+        date: datetime.datetime = creation_date + datetime.timedelta(days=RELATIVE_DAYS[relative])
+        return datetime.datetime(date.year, date.month, date.day)
+    print(f'Не могу определить дату сыгранной игры {date_game}', flush=True)
+    return None
+
+
 def parsing_date_results(item: Node, creation_date: datetime.datetime) -> Optional[datetime.datetime]:
     """Расшифровать колонку дата в результатах.
 
     :param item: Колонка с датой
     :param creation_date: Дата создания страницы
     """
-    date_game: str = item.text(deep=False, strip=True)
-    if (reg := REG_DATE.match(date_game)) is not None:
-        return datetime.datetime(int(reg[3]), int(reg[2]), int(reg[1]))
-    if (reg := REG_DATE_SHORT.match(date_game)) is not None:
-        return datetime.datetime(int(creation_date.year), int(reg[2]), int(reg[1]))
-    if date_game == 'Today':
-        return datetime.datetime(creation_date.year, creation_date.month, creation_date.day)
-    if date_game == 'Yesterday':
-        tmp: datetime.datetime = creation_date - datetime.timedelta(days=1)
-        return datetime.datetime(tmp.year, tmp.month, tmp.day)
-    print(f'Не могу определить дату сыгранной игры {date_game}', flush=True)
+    return parse_date_results(item.text(deep=False, strip=True), creation_date)
+
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date_fixtures(date_game: str, creation_date: datetime.datetime) -> datetime.datetime | None:
+    """Разбор текста даты в расписании (результат запоминается для текста и даты загрузки страницы).
+
+    :param date_game: Текст даты (не пустой)
+    :param creation_date: Дата создания страницы
+    """
+    if (reg := REG_DATE_FIXTURES.match(date_game)) is not None:
+        if (relative := reg['relative']) is None:
+            return datetime.datetime(int(reg['year']) if reg['year'] else creation_date.year,
+                                     int(reg['month']), int(reg['day']), int(reg['hour']), int(reg['minute']))
+        date: datetime.datetime = creation_date + datetime.timedelta(days=RELATIVE_DAYS[relative])
+        return datetime.datetime(date.year, date.month, date.day,
+                                 int(reg['relative_hour']), int(reg['relative_minute']))
+    print(f'Не могу определить дату в расписании {date_game}', flush=True)
     return None
 
 
-def parsing_date_fixtures(item: Node,  # noqa: PLR0911
+def parsing_date_fixtures(item: Node,
                           creation_date: datetime.datetime,
                           default: datetime.datetime) -> Optional[datetime.datetime]:
     """Расшифровать колонку дата в расписании.
@@ -313,24 +365,9 @@ def parsing_date_fixtures(item: Node,  # noqa: PLR0911
     :param creation_date: Дата создания страницы
     :param default: Дата по умолчанию для случая когда колонка пустая
     """
-    date_game: str = item.text(deep=False, strip=True)
-    if (reg := REG_DATE_SHORT_FIXTURES.match(date_game)) is not None:
-        return datetime.datetime(int(creation_date.year), int(reg[2]), int(reg[1]), int(reg[3]), int(reg[4]))
-    if (reg := REG_DATE_FIXTURES.match(date_game)) is not None:
-        return datetime.datetime(int(reg[3]), int(reg[2]), int(reg[1]), int(reg[4]), int(reg[5]))
-    if (reg := REG_TODAY_FIXTURES.match(date_game)) is not None:
-        return datetime.datetime(creation_date.year, creation_date.month, creation_date.day, int(reg[1]),
-                                 int(reg[2]))
-    if (reg := REG_TOMORROW_FIXTURES.match(date_game)) is not None:
-        tmp: datetime.datetime = creation_date + datetime.timedelta(days=1)
-        return datetime.datetime(tmp.year, tmp.month, tmp.day, int(reg[1]), int(reg[2]))
-    if (reg := REG_YESTERDAY_FIXTURES.match(date_game)) is not None:
-        tmp: datetime.datetime = creation_date - datetime.timedelta(days=1)
-        return datetime.datetime(tmp.year, tmp.month, tmp.day, int(reg[1]), int(reg[2]))
-    if not date_game:
+    if not (date_game := item.text(deep=False, strip=True)):
         return default
-    print(f'Не могу определить дату в расписании {date_game}', flush=True)
-    return None
+    return parse_date_fixtures(date_game, creation_date)
 
 
 def parsing_date_match(item: Node) -> Optional[datetime.datetime]:
@@ -368,7 +405,7 @@ def get_column_type(sport_id: SportType, is_fixture: int, column_number: int) ->
     )
 
 
-def parsing_score_halves(item: Node) -> list[ScoreHalvesBetexplorer]:
+def parsing_score_halves(item: Node) -> list[ScoreHalvesRecord]:
     """Расшифровать колонку счет по таймам.
 
     :param item: Колонка со счетами
@@ -376,12 +413,8 @@ def parsing_score_halves(item: Node) -> list[ScoreHalvesBetexplorer]:
     if (((link := item.css_first(CSS_SCORE_HALVES_ITEMS)) is not None)
             and (reg := REG_SCORE_HALVES.findall(link.text(deep=False, strip=True)))):
         return [
-            {
-                'time_id': None,
-                'half_number': number,
-                'home_score': int(score[1]),
-                'away_score': int(score[2]),
-            } for number, score in enumerate(reg)
+            ScoreHalvesRecord(half_number=number, home_score=int(score[1]), away_score=int(score[2]))
+            for number, score in enumerate(reg)
         ]
     return []
 
@@ -467,43 +500,142 @@ def get_column_type_ou(column_number: int) -> Optional[int]:
     )
 
 
-def parsing_shooters(sport_id: SportType, table_data: Node, tab_index: int) -> list[ShooterBetexplorer]:
+def column_layout(mapping: dict, table_type: int, is_sports_3: bool) -> tuple[int | None, ...]:  # noqa: FBT001
+    """Типы колонок таблицы по порядку до последней разбираемой колонки (None - колонка не разбирается).
+
+    :param mapping: Типы колонок по ключу (вид таблицы, номер колонки, вид спорта из списка)
+    :param table_type: Вид таблицы (результаты или расписание, хозяева или гости)
+    :param is_sports_3: Вид спорта входит в список для этой таблицы
+    """
+    layout: list[int | None] = [mapping.get((table_type, number, is_sports_3))
+                                   for number in range(max(number for _, number, _ in mapping) + 1)]
+    while layout and layout[-1] is None:
+        layout.pop()
+    return tuple(layout)
+
+
+def column_index(mapping: dict, column_type: int) -> int:
+    """Номер первой колонки заданного типа.
+
+    :param mapping: Типы колонок по номеру колонки
+    :param column_type: Тип колонки
+    """
+    return min(number for number, value in mapping.items() if value == column_type)
+
+
+ColumnHandler = Callable[[MatchRecord, Node, datetime.datetime, datetime.datetime | None], None]
+"""Разбор колонки строки матча: матч, колонка, дата загрузки страницы, дата предыдущего матча расписания."""
+
+
+def column_teams(match: MatchRecord, item: Node, *_: Any) -> None:
+    """Колонка с командами и ссылкой на матч."""
+    match.match_url, match.home_team.team_name, match.away_team.team_name = parsing_team_match(item)
+
+
+def column_score(match: MatchRecord, item: Node, *_: Any) -> None:
+    """Колонка со счетом."""
+    match.home_score, match.away_score, match.score_stage_short, match.score_stage = parsing_score_stage(item)
+
+
+def column_odds_1(match: MatchRecord, item: Node, *_: Any) -> None:
+    """Колонка с коэффициентом на победу хозяев."""
+    match.odds_1 = parsing_odds(item)
+
+
+def column_odds_x(match: MatchRecord, item: Node, *_: Any) -> None:
+    """Колонка с коэффициентом на ничью."""
+    match.odds_x = parsing_odds(item)
+
+
+def column_odds_2(match: MatchRecord, item: Node, *_: Any) -> None:
+    """Колонка с коэффициентом на победу гостей."""
+    match.odds_2 = parsing_odds(item)
+
+
+def column_date_result(match: MatchRecord, item: Node, creation_date: datetime.datetime, *_: Any) -> None:
+    """Колонка с датой сыгранного матча."""
+    match.game_date = parsing_date_results(item, creation_date)
+
+
+def column_date_fixture(match: MatchRecord, item: Node, creation_date: datetime.datetime,
+                        saved_date: datetime.datetime | None) -> None:
+    """Колонка с датой матча в расписании (пустая колонка - дата предыдущего матча)."""
+    match.game_date = parsing_date_fixtures(item, creation_date, saved_date)
+
+
+COLUMN_HANDLERS: Final[dict[tuple[int, int], ColumnHandler]] = {
+    (IS_RESULT, COLUMN_TEAMS): column_teams,
+    (IS_FIXTURE, COLUMN_TEAMS): column_teams,
+    (IS_RESULT, COLUMN_SCORE): column_score,
+    (IS_FIXTURE, COLUMN_SCORE): column_score,
+    (IS_RESULT, COLUMN_ODDS_1): column_odds_1,
+    (IS_FIXTURE, COLUMN_ODDS_1): column_odds_1,
+    (IS_RESULT, COLUMN_ODDS_X): column_odds_x,
+    (IS_FIXTURE, COLUMN_ODDS_X): column_odds_x,
+    (IS_RESULT, COLUMN_ODDS_2): column_odds_2,
+    (IS_FIXTURE, COLUMN_ODDS_2): column_odds_2,
+    (IS_RESULT, COLUMN_GAME_DATE): column_date_result,
+    (IS_FIXTURE, COLUMN_GAME_DATE): column_date_fixture,
+}
+"""Разбор колонки по виду таблицы (результаты, расписание) и типу колонки."""
+
+RESULT_HANDLERS: Final[dict[tuple[int, bool], tuple[ColumnHandler | None, ...]]] = {
+    (is_fixture, is_sports_3): tuple(
+        None if column_type is None else COLUMN_HANDLERS[is_fixture, column_type]
+        for column_type in column_layout(COLUMN_MAPPING, is_fixture, is_sports_3))
+    for is_fixture in (IS_RESULT, IS_FIXTURE) for is_sports_3 in (True, False)
+}
+"""Разбор колонок строки матча по порядку для вида таблицы и количества исходов вида спорта."""
+
+SHOOTER_LAYOUTS: Final[dict[tuple[int, bool], tuple[int | None, ...]]] = {
+    (tab_index, is_sports_3): column_layout(COLUMN_MAPPING_SHOOTER, tab_index, is_sports_3)
+    for tab_index in (0, 1) for is_sports_3 in (True, False)
+}
+"""Типы колонок забивающих голы по порядку для команды (0 - хозяева, 1 - гости) и вида спорта."""
+
+COLUMN_INDEX_BTC_YES: Final[int] = column_index(COLUMN_MAPPING_BTC, COLUMN_BTC_YES)
+COLUMN_INDEX_BTC_NO: Final[int] = column_index(COLUMN_MAPPING_BTC, COLUMN_BTC_NO)
+COLUMN_INDEX_OU_INDICATOR: Final[int] = column_index(COLUMN_MAPPING_OU, COLUMN_OU_INDICATOR)
+
+
+def get_column_handlers(sport_id: SportType, is_fixture: int) -> tuple[ColumnHandler | None, ...]:
+    """Разбор колонок строки матча по порядку (None - колонка не разбирается).
+
+    :param sport_id: Вид спорта
+    :param is_fixture: Строка это результат (0) или расписание (1)
+    """
+    return RESULT_HANDLERS[is_fixture, sport_id in SPORTS_3]
+
+
+def parsing_shooters(sport_id: SportType, table_data: Node, tab_index: int) -> list[ShooterRecord]:
     """Разбор забивающих голы.
 
     :param sport_id: Вид спорта
     :param table_data: Данные для разбора
     :param tab_index: Номер колонки
     """
-    shooters: list[ShooterBetexplorer] = []
+    shooters: list[ShooterRecord] = []
+    layout: tuple[int | None, ...] = SHOOTER_LAYOUTS[tab_index, sport_id in SPORTS_SHOOTERS_3]
     for event_order, event_item in enumerate(table_data.iter(include_text=False)):
-        shooter: ShooterBetexplorer = {
-            'shooter_id': None,
-            'home_away': tab_index,
-            'event_order': event_order,
-            'event_time': None,
-            'overtime': None,
-            'player_name': None,
-            'penalty_kick': None,
-        }
-        for index, item in enumerate(event_item.iter(include_text=False)):
-            column_type: Optional[int] = get_column_type_shooters(sport_id, tab_index, index)
+        shooter: ShooterRecord = ShooterRecord(home_away=tab_index, event_order=event_order)
+        for column_type, item in zip(layout, event_item.iter(include_text=False), strict=False):
             if column_type == COLUMN_PENALTY_KICK:
                 if pen := item.text(deep=True, strip=True):
-                    shooter['penalty_kick'] = pen
+                    shooter.penalty_kick = pen
             elif column_type == COLUMN_EVENT_TIME:
                 event_time: str = item.text(deep=True, strip=True)
                 if (reg := REG_EVENT_TIME.match(event_time)) is not None:
-                    shooter['event_time'] = reg[1]
+                    shooter.event_time = reg[1]
                 elif (reg := REG_EVENT_TIME_OVERTIME.match(event_time)) is not None:
-                    shooter['event_time'] = reg[1]
-                    shooter['overtime'] = reg[2]
+                    shooter.event_time = reg[1]
+                    shooter.overtime = reg[2]
                 elif (reg := REG_EVENT_TIME_MIN_SEC.match(event_time)) is not None:
-                    shooter['event_time'] = event_time
+                    shooter.event_time = event_time
                 elif event_time and event_time not in ['.', '446226.', '446227.', '+2.']:
-                    shooter['event_time'] = event_time
+                    shooter.event_time = event_time
                     print(f'Не найдено время {event_time}')
             elif column_type == COLUMN_PLAYER_NAME:
-                shooter['player_name'] = item.text(deep=True, strip=True)
+                shooter.player_name = item.text(deep=True, strip=True)
         shooters.append(shooter)
     return shooters
 
@@ -514,7 +646,7 @@ def parsing_results(
         sport_id: SportType,
         championship_id: int,
         stage_name: Optional[str],
-        is_fixture: int) -> list[MatchBetexplorer]:
+        is_fixture: int) -> list[MatchRecord]:
     """Разбор страницы результатов матчей чемпионата.
 
     :param soup: Данные для разбора
@@ -524,49 +656,83 @@ def parsing_results(
     :param is_fixture: Строка это результат (0) или расписание (1)
     """
     if soup is not None:
-        matches: list[MatchBetexplorer] = []
+        matches: list[MatchRecord] = []
         if (table_result := soup.node.css_first(
                 CSS_RESULT if is_fixture == IS_RESULT else CSS_FIXTURE)) is not None:
             round_name: Optional[str] = None
             round_number: Optional[int] = None
             saved_date: Optional[datetime.datetime] = None
+            handlers: tuple[ColumnHandler | None, ...] = get_column_handlers(sport_id, is_fixture)
+            save_date: datetime.datetime = datetime.datetime.now()
             for season_table in table_result.iter(include_text=False):
                 if season_table.child.tag == 'th':
                     round_name, round_number = parsing_round(season_table)
                 else:
-                    match: MatchBetexplorer = match_init(
+                    match: MatchRecord = match_init(
                         sport_id.value, championship_id, stage_name, round_name, round_number, is_fixture,
-                        soup.creation_date)
-                    for index, item in enumerate(season_table.iter(include_text=False)):
-                        column_type: Optional[int] = get_column_type(sport_id, is_fixture, index)
-
-                        if column_type == COLUMN_TEAMS:
-                            (match['match_url'],
-                             match['home_team']['team_name'],
-                             match['away_team']['team_name'],
-                             ) = parsing_team_match(item)
-                        elif column_type == COLUMN_SCORE:
-                            (match['home_score'], match['away_score'],
-                             match['score_stage_short'], match['score_stage']) = parsing_score_stage(item)
-                        elif column_type == COLUMN_ODDS_1:
-                            match['odds_1'] = parsing_odds(item)
-                        elif column_type == COLUMN_ODDS_X:
-                            match['odds_x'] = parsing_odds(item)
-                        elif column_type == COLUMN_ODDS_2:
-                            match['odds_2'] = parsing_odds(item)
-                        elif column_type == COLUMN_GAME_DATE:
-                            if is_fixture == IS_RESULT:
-                                match['game_date'] = parsing_date_results(
-                                    item, soup.creation_date)
-                            else:
-                                match['game_date'] = parsing_date_fixtures(
-                                    item, soup.creation_date, saved_date)
-                                saved_date = match['game_date']
+                        soup.creation_date, save_date)
+                    for handler, item in zip(handlers, season_table.iter(include_text=False), strict=False):
+                        if handler is not None:
+                            handler(match, item, soup.creation_date, saved_date)
+                            if handler is column_date_fixture:
+                                saved_date = match.game_date
                     matches.append(match)
         return matches
     return []
 
 
+def new_results(matches: list[MatchBetexplorer], stored: StoredResults | None) -> list[MatchBetexplorer]:
+    """Результаты, которых еще нет в базе данных.
+
+    Пропускаются матчи, сыгранные раньше самого позднего сохраненного дня, и сохраненные матчи этого дня.
+    Перенесенные матчи остаются в таблице в своем туре, но с более поздней датой, поэтому просматривается
+    вся таблица.
+
+    :param matches: Разобранные результаты стадии
+    :param stored: Самые поздние результаты стадии, уже сохраненные в базе (None - все результаты новые)
+    """
+    if stored is None:
+        return matches
+    return [match for match in matches
+            if match['game_date'] is None or match['game_date'].date() > stored.game_date
+            or (match['game_date'].date() == stored.game_date and match['match_url'] not in stored.match_urls)]
+
+
+def parsing_results_stages(
+        soup: ReceivedData,
+        sport_id: SportType,
+        championship_id: int,
+        is_fixture: int) -> tuple[list[ChampionshipStageBetexplorer], list[MatchBetexplorer]]:
+    """Разбор первой страницы результатов: стадии чемпионата, а если их нет - матчи.
+
+    :param soup: Данные для разбора
+    :param sport_id: Вид спорта
+    :param championship_id: Идентификатор чемпионата
+    :param is_fixture: Строка это результат (0) или расписание (1)
+    """
+    stages: list[ChampionshipStageBetexplorer] = parsing_stages(soup)
+    return stages, [] if stages else parsing_results(soup, sport_id, championship_id, None, is_fixture)
+
+
+def refresh_save_date(value: Any, save_date: datetime.datetime | None = None) -> None:
+    """Обновить дату сохранения в результате разбора, взятом из сохраненных (как при новом разборе страницы).
+
+    :param value: Результат разбора (матчи, стадии, команды)
+    :param save_date: Дата сохранения
+    """
+    if save_date is None:
+        save_date = datetime.datetime.now()
+    if isinstance(value, (dict, Record)):
+        if value.get('save_date') is not None:
+            value['save_date'] = save_date
+        for item in value.values():
+            if isinstance(item, (dict, Record, list, tuple)):
+                refresh_save_date(item, save_date)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            refresh_save_date(item, save_date)
+
+
 def match_init(
         sport_id: int,
         championship_id: int,
@@ -574,7 +740,8 @@ def match_init(
         round_name: str,
         round_number: int,
         is_fixture: int,
-        creation_date: datetime.datetime) -> MatchBetexplorer:
+        creation_date: datetime.datetime,
+        save_date: datetime.datetime | None = None) -> MatchRecord:
     """Инициализация информации об матче.
 
     :param sport_id: Вид спорта
@@ -584,51 +751,82 @@ def match_init(
     :param round_number: Номер тура
     :param is_fixture: Строка это результат (0) или расписание (1)
     :param creation_date: Дата загрузки информации
+    :param save_date: Дата разбора (одна для всех матчей страницы, None - текущее время)
     """
-    return {
-        'match_id': None,
-        'championship_id': championship_id,
-        'match_url': None,
-        'home_team': {
-            'team_id': None,
-            'sport_id': sport_id,
-            'team_name': None,
-            'team_full': None,
-            'team_url': None,
-            'team_country': None,
-            'country_id': None,
-            'team_emblem': None,
-            'download_date': creation_date,
-            'save_date': datetime.datetime.now(),
-        },
-        'home_team_emblem': None,
-        'away_team': {
-            'team_id': None,
-            'sport_id': sport_id,
-            'team_name': None,
-            'team_full': None,
-            'team_url': None,
-            'team_country': None,
-            'country_id': None,
-            'team_emblem': None,
-            'download_date': creation_date,
-            'save_date': datetime.datetime.now(),
-        },
-        'away_team_emblem': None,
-        'home_score': None, 'away_score': None,
-        'odds_1': None, 'odds_x': None, 'odds_2': None,
-        'game_date': None,
-        'score_stage': None, 'score_stage_short': None,
-        'score_halves': [],
-        'shooters': [],
-        'match_event': [],
-        'stage_name': stage_name,
-        'round_name': round_name,
-        'round_number': round_number,
-        'is_fixture': is_fixture,
-        'download_date': creation_date,
-        'save_date': datetime.datetime.now(),
-    }
+    if save_date is None:
+        save_date = datetime.datetime.now()
+    home_team: TeamRecord = TeamRecord()
+    home_team.sport_id = sport_id
+    home_team.download_date = creation_date
+    home_team.save_date = save_date
+    away_team: TeamRecord = TeamRecord()
+    away_team.sport_id = sport_id
+    away_team.download_date = creation_date
+    away_team.save_date = save_date
+    match: MatchRecord = MatchRecord()
+    match.championship_id = championship_id
+    match.home_team = home_team
+    match.away_team = away_team
+    match.stage_name = stage_name
+    match.round_name = round_name
+    match.round_number = round_number
+    match.is_fixture = is_fixture
+    match.download_date = creation_date
+    match.save_date = save_date
+    return match
+
+
+async def get_main_stages(ls: LoadSave,
+                          result_url: str,
+                          stages: list[ChampionshipStageBetexplorer],
+                          need_refresh: bool,  # noqa: FBT001
+                          freshness: Freshness | None = None) -> list[ChampionshipStageBetexplorer]:
+    """Стадии чемпионата для загрузки: если есть закладка Main, то стадии с ее страницы.
+
+    :param ls: Класс для загрузки данных
+    :param result_url: Путь к странице результатов (расписания)
+    :param stages: Стадии с первой страницы результатов
+    :param need_refresh: Необходимо обновить данные по чемпионату
+    :param freshness: Требования к свежести сохраненных страниц
+    """
+    main_stage: int | None = next((i for i, item in enumerate(stages) if item['stage_name'] == 'Main'), None)
+    if main_stage is not None:
+        main_stage_url: str = stages[main_stage]['stage_url']
+        if (stages := await ls.get_parsed(
+                urljoin(result_url, main_stage_url), CSS_RESULTS, parsing_stages,
+                version=PARSER_VERSION, need_refresh=need_refresh, freshness=freshness)) is None:
+            print(f'Закладка Main пустая {result_url} {main_stage_url}', flush=True)
+            return []
+    return stages
+
+
+async def fetch_results(ls: LoadSave,
+                        championship_url: str,
+                        is_fixture: int,
+                        need_refresh: bool,  # noqa: FBT001
+                        freshness: Freshness | None = None) -> bool:
+    """Загрузка страниц результатов в хранилище без разбора матчей (стадия загрузки конвейера).
+
+    Разбираются только списки стадий, страницы стадий загружаются, если их нет или они устарели.
+
+    :param ls: Класс для загрузки данных
+    :param championship_url: Путь к странице чемпионата
+    :param is_fixture: Результаты (0) или расписание (1)
+    :param need_refresh: Необходимо обновить данные по чемпионату
+    :param freshness: Требования к свежести сохраненных страниц
+    :return: Первая страница результатов загружена
+    """
+    result_url: str = urljoin(urlparse(championship_url).path, 'results' if is_fixture == IS_RESULT else 'fixtures')
+    stages: list[ChampionshipStageBetexplorer] | None
+    if (stages := await ls.get_parsed(
+            result_url, CSS_RESULTS, parsing_stages,
+            version=PARSER_VERSION, need_refresh=need_refresh, freshness=freshness)) is None:
+        return False
+    if stages:
+        await gather_limited(ls.concurrency, *(
+            ls.fetch(urljoin(result_url, stage['stage_url']), CSS_RESULTS, need_refresh, freshness)
+            for stage in await get_main_stages(ls, result_url, stages, need_refresh, freshness)))
+    return True
 
 
 async def get_results(ls: LoadSave,
@@ -636,7 +834,9 @@ async def get_results(ls: LoadSave,
                       sport_id: SportType,
                       championship_id: int,
                       is_fixture: int,
-                      need_refresh: bool) -> Optional[ResultsBetexplorer]:
+                      need_refresh: bool,  # noqa: FBT001
+                      freshness: Freshness | None = None,
+                      stored: dict[str | None, StoredResults] | None = None) -> ResultsBetexplorer | None:
     """Загрузка и разбор результатов.
 
     :param ls: Класс для загрузки данных
@@ -645,39 +845,51 @@ async def get_results(ls: LoadSave,
     :param championship_id: Идентификатор чемпионата
     :param is_fixture: Строка это результат (0) или расписание (1)
     :param need_refresh: Необходимо обновить данные по чемпионату
+    :param freshness: Требования к свежести сохраненных страниц
+    :param stored: Самые поздние сохраненные результаты по имени стадии (в результатах только более новые матчи)
     """
+    if stored is None or is_fixture != IS_RESULT:
+        stored = {}
     result_url: str = urljoin(urlparse(championship_url).path, 'results' if is_fixture == IS_RESULT else 'fixtures')
-    load_results: Optional[ReceivedData]
-    if (load_results := await ls.get_read(result_url, CSS_RESULTS, need_refresh)) is not None:
-        stages: list[ChampionshipStageBetexplorer] = parsing_stages(load_results)
+    root: tuple[list[ChampionshipStageBetexplorer], list[MatchBetexplorer]] | None
+    if (root := await ls.get_parsed(
+            result_url, CSS_RESULTS, parsing_results_stages, sport_id, championship_id, is_fixture,
+            version=PARSER_VERSION, need_refresh=need_refresh, freshness=freshness,
+            on_cached=refresh_save_date)) is not None:
+        stages: list[ChampionshipStageBetexplorer] = root[0]
         if stages:
-            main_stage: Optional[int] = next((i for i, item in enumerate(stages) if item['stage_name'] == 'Main'), None)
-            if main_stage is not None:
-                load_results = await ls.get_read(urljoin(result_url, stages[main_stage]['stage_url']), CSS_RESULTS, need_refresh)
-                if load_results is None:
-                    print(f'Закладка Main пустая {result_url} {stages[main_stage]["stage_url"]}', flush=True)
-                stages = parsing_stages(load_results)
+            stages = await get_main_stages(ls, result_url, stages, need_refresh, freshness)
             matches = []
-            for stage in stages:
-                if (load_results := await ls.get_read(
-                        urljoin(result_url, stage['stage_url']), CSS_RESULTS, need_refresh)) is not None:
-                    matches.extend(parsing_results(load_results, sport_id, championship_id, stage['stage_name'], is_fixture))
+            stage_results: list[list[MatchBetexplorer] | None] = await gather_limited(ls.concurrency, *(
+                ls.get_parsed(
+                    urljoin(result_url, stage['stage_url']), CSS_RESULTS, parsing_results,
+                    sport_id, championship_id, stage['stage_name'], is_fixture,
+                    version=PARSER_VERSION, need_refresh=need_refresh, freshness=freshness,
+                    on_cached=refresh_save_date)
+                for stage in stages))
+            for stage, stage_matches in zip(stages, stage_results, strict=True):
+                if stage_matches is not None:
+                    matches.extend(new_results(stage_matches, stored.get(stage['stage_name'])))
             return {
                 'stages': stages,
                 'matches': matches,
             }
         return {
             'stages': [],
-            'matches': parsing_results(load_results, sport_id, championship_id, None, is_fixture),
+            'matches': new_results(root[1], stored.get(None)),
         }
     return None
 
 
-async def get_results_fixtures(ls: LoadSave,
+async def get_results_fixtures(ls: LoadSave,  # noqa: PLR0913, PLR0917
                                championship_url: str,
                                sport_id: SportType,
                                championship_id: int,
-                               need_refresh: bool = False) -> Optional[ResultsBetexplorer]:
+                               need_refresh: bool = False,  # noqa: FBT001, FBT002
+                               policy: FreshnessPolicy | None = None,
+                               championship_years: str = '',
+                               stored: dict[str | None, StoredResults] | None = None,
+                               ) -> ResultsBetexplorer | None:
     """Получение результатов и расписания.
 
     :param ls: Класс для загрузки данных
@@ -685,14 +897,19 @@ async def get_results_fixtures(ls: LoadSave,
     :param sport_id: Вид спорта
     :param championship_id: Идентификатор чемпионата
     :param need_refresh: Данные по чемпионату необходимо обновить
+    :param policy: Правила обновления сохраненных страниц
+    :param championship_years: Годы проведения чемпионата
+    :param stored: Самые поздние сохраненные результаты по имени стадии (в результатах только более новые матчи)
     """
     results: Optional[ResultsBetexplorer]
     fixtures: Optional[ResultsBetexplorer]
-    if ((results := await get_results(ls, championship_url, sport_id, championship_id, IS_RESULT,
-                                      need_refresh)) is not None
-            and (
-                    fixtures := await get_results(ls, championship_url, sport_id, championship_id, IS_FIXTURE,
-                                                  need_refresh)) is not None):
+    results, fixtures = await asyncio.gather(
+        get_results(ls, championship_url, sport_id, championship_id, IS_RESULT, need_refresh,
+                    policy.season(PageKind.RESULTS, championship_years) if policy is not None else None, stored),
+        get_results(ls, championship_url, sport_id, championship_id, IS_FIXTURE, need_refresh,
+                    policy.season(PageKind.FIXTURES, championship_years) if policy is not None else None),
+    )
+    if results is not None and fixtures is not None:
         matches: list[MatchBetexplorer] = results['matches'][:]
         matches.extend(fixtures['matches'])
         # await self.get_standing(championship['championship_url'], need_refresh)
@@ -750,7 +967,7 @@ def parsing_match_time(
         stage_name: str,
         round_name: str,
         round_number: int,
-        is_fixture: int) -> Optional[MatchBetexplorer]:
+        is_fixture: int) -> MatchRecord | None:
     """Разбор страницы конкретного матча по таймам.
 
     :param soup: Данные для разбора
@@ -761,31 +978,31 @@ def parsing_match_time(
     :param round_number: Номер тура
     :param is_fixture: Строка это результат (0) или расписание (1)
     """
-    match: MatchBetexplorer = match_init(sport_id.value, championship_id, stage_name,
-                                         round_name, round_number, is_fixture, soup.creation_date)
+    match: MatchRecord = match_init(sport_id.value, championship_id, stage_name,
+                                    round_name, round_number, is_fixture, soup.creation_date)
     data: Node
     if (data := soup.node.css_first('ul.list-details')) is not None:
         for index, item in enumerate(data.iter(include_text=False)):
             if index == 0:
-                match['home_team']['team_url'], match['home_team']['team_name'], match['home_team']['team_emblem'], \
-                    match['home_team']['team_full'] = parsing_team_data(item)
-                match['home_team_emblem'] = match['home_team']['team_emblem']
+                match.home_team.team_url, match.home_team.team_name, match.home_team.team_emblem, \
+                    match.home_team.team_full = parsing_team_data(item)
+                match.home_team_emblem = match.home_team.team_emblem
             elif index == 1:
-                match['game_date'] = parsing_date_match(item)
+                match.game_date = parsing_date_match(item)
                 if (link := item.css_first('p.list-details__item__score')) is not None:
-                    match['home_score'], match['away_score'] = parsing_score(link)
+                    match.home_score, match.away_score = parsing_score(link)
                 if (link := item.css_first('h2.list-details__item__eventstage')) is not None:
-                    match['score_stage'] = link.text(deep=False, strip=True)
-                match['score_halves'] = parsing_score_halves(item)
+                    match.score_stage = link.text(deep=False, strip=True)
+                match.score_halves = parsing_score_halves(item)
             else:
-                match['away_team']['team_url'], match['away_team']['team_name'], match['away_team']['team_emblem'], \
-                    match['away_team']['team_full'] = parsing_team_data(item)
-                match['away_team_emblem'] = match['away_team']['team_emblem']
+                match.away_team.team_url, match.away_team.team_name, match.away_team.team_emblem, \
+                    match.away_team.team_full = parsing_team_data(item)
+                match.away_team_emblem = match.away_team.team_emblem
 
     if (data := soup.node.css_first(CSS_SHOOTERS)) is not None:
         for tab_index, tab_item in enumerate(data.iter(include_text=False)):
             if (table_data := tab_item.css_first('table tbody')) is not None:
-                match['shooters'].extend(parsing_shooters(sport_id, table_data, tab_index))
+                match.shooters.extend(parsing_shooters(sport_id, table_data, tab_index))
     return match
 
 
@@ -872,7 +1089,11 @@ async def get_team(ls: LoadSave,
                    session: Optional[AsyncSession],
                    teams: list[TeamBetexplorer],
                    fast_country: dict[str, int],
-                   fast_team: dict[(int, str, str, str), Optional[TeamBetexplorer]]) -> None:
+                   fast_team: dict[(int, str, str, str), TeamBetexplorer | None],
+                   team_loading: dict[str, asyncio.Future] | None = None,
+                   session_lock: asyncio.Lock | None = None,
+                   freshness: Freshness | None = None,
+                   registry: TeamRegistry | None = None) -> None:
     """Обновление данных о команде.
 
     :param ls: Класс для загрузки данных
@@ -881,25 +1102,47 @@ async def get_team(ls: LoadSave,
     :param teams: Список команд для обновления
     :param fast_country: Справочник стран
     :param fast_team: Справочник закаченных команд
+    :param team_loading: Команды, загрузка которых уже выполняется другими задачами
+    :param session_lock: Блокировка сессии базы данных при одновременной работе нескольких задач
+    :param freshness: Требования к свежести сохраненных страниц команд
+    :param registry: Справочник команд, общий для всех процессов (команда из него не загружается повторно)
     """
+    if team_loading is None:
+        team_loading = {}
     team: TeamBetexplorer
     for team in teams:
-        if (team_update := fast_team.get(team['team_url'])) is None:
-            if (team['team_url'] is not None) and ((load_team := await ls.get_read(team['team_url'],
-                                                                                   CSS_PAGE_TEAM)) is not None) and (
-                    (team_update := parsing_team(load_team, team['sport_id'])) is not None):
-                if team_update['team_emblem'] is not None:
-                    await ls.get_as_file(team_update['team_emblem'])
-                team.update({
-                    'download_date': team_update['download_date'],
-                    'save_date': team_update['save_date'],
-                    'team_full': team_update['team_full'],
-                    'team_country': team_update['team_country'],
-                    'team_emblem': team_update['team_emblem'],
-                    'country_id': fast_country.get(team_update['team_country']),
-                })
-            await crd.team_merge(session, team)
-            fast_team[team['team_url']] = team.copy()
+        if ((team_update := fast_team.get(team['team_url'])) is None
+                and (loading := team_loading.get(team['team_url'])) is not None):
+            team_update = await loading
+        if (team_update is None and registry is not None and team['team_url'] is not None
+                and (team_update := await registry.acquire(
+                    team['team_url'], freshness if ls.load_net else None)) is not None):
+            fast_team[team['team_url']] = team_update
+        if team_update is None:
+            loading = asyncio.get_running_loop().create_future()
+            team_loading[team['team_url']] = loading
+            try:
+                if (team['team_url'] is not None) and ((team_update := await ls.get_parsed(
+                        team['team_url'], CSS_PAGE_TEAM, parsing_team, team['sport_id'], version=PARSER_VERSION,
+                        freshness=freshness, on_cached=refresh_save_date)) is not None):
+                    if team_update['team_emblem'] is not None:
+                        await ls.get_as_file(team_update['team_emblem'])
+                    team.update({
+                        'download_date': team_update['download_date'],
+                        'save_date': team_update['save_date'],
+                        'team_full': team_update['team_full'],
+                        'team_country': team_update['team_country'],
+                        'team_emblem': team_update['team_emblem'],
+                        'country_id': fast_country.get(team_update['team_country']),
+                    })
+                async with session_lock if session_lock is not None else nullcontext():
+                    await crd.team_merge(session, team)
+                fast_team[team['team_url']] = team.copy()
+            finally:
+                team_loading.pop(team['team_url'], None)
+                if registry is not None and team['team_url'] is not None:
+                    await registry.release(team['team_url'], fast_team.get(team['team_url']))
+                loading.set_result(fast_team.get(team['team_url']))
         else:
             team.update({
                 'download_date': team_update['download_date'],
@@ -917,7 +1160,7 @@ async def get_match_time(
         sport_id: SportType,
         championship: ChampionshipBetexplorer,
         match: MatchBetexplorer,
-        need_refresh: bool,  # noqa: FBT001
+        freshness: Freshness | None = None,
 ) -> MatchBetexplorer | None:
     """Загрузка и разбор информации по тайм-матч.
 
@@ -925,20 +1168,13 @@ async def get_match_time(
     :param sport_id: Вид спорта
     :param championship: Информация о чемпионате
     :param match: Информация о матче
-    :param need_refresh: Необходимо обновить данные
+    :param freshness: Требования к свежести сохраненной страницы матча
     """
     if match['match_url'] is not None:
-        load_match: ReceivedData | None
-        if (load_match := await ls.get_read(match['match_url'], CSS_MATCH, need_refresh)) is not None:
-            match_time: MatchBetexplorer | None = parsing_match_time(
-                load_match, sport_id, championship['championship_id'], match['stage_name'],
-                match['round_name'], match['round_number'], match['is_fixture'])
-            if ((not need_refresh)
-                    and ((match['game_date'] + datetime.timedelta(days=2)) > match_time['download_date'])
-                    and ((match['game_date'] - datetime.timedelta(days=14)) < datetime.datetime.now())
-            ):
-                return await get_match_time(ls, sport_id, championship, match, True)  # noqa: FBT003
-            return match_time
+        return await ls.get_parsed(
+            match['match_url'], CSS_MATCH, parsing_match_time, sport_id, championship['championship_id'],
+            match['stage_name'], match['round_name'], match['round_number'], match['is_fixture'],
+            version=PARSER_VERSION, freshness=freshness, on_cached=refresh_save_date)
     return None
 
 
@@ -955,10 +1191,9 @@ def parsing_btc(
         odds_less: float | None = None
         odds_greater: float | None = None
         for index, item in enumerate(event_item.iter(include_text=False)):
-            column_type: Optional[int] = get_column_type_btc(index)
-            if column_type == COLUMN_BTC_YES:
+            if index == COLUMN_INDEX_BTC_YES:
                 odds_less = parsing_odds(item)
-            if column_type == COLUMN_BTC_NO:
+            elif index == COLUMN_INDEX_BTC_NO:
                 odds_greater = parsing_odds(item)
         if (odds_less is not None) and (odds_greater is not None):
             ret = {
@@ -988,8 +1223,7 @@ def parsing_ou(
             indicator: str | None = None
             if (event_item := table.css_first('tbody tr')) is not None:
                 for index, item in enumerate(event_item.iter(include_text=False)):
-                    column_type: Optional[int] = get_column_type_ou(index)
-                    if column_type == COLUMN_OU_INDICATOR:
+                    if index == COLUMN_INDEX_OU_INDICATOR:
                         indicator = item.text(deep=False, strip=True)
                         break
 
@@ -997,13 +1231,10 @@ def parsing_ou(
                 odds_less: float | None = None
                 odds_greater: float | None = None
                 for index, item in enumerate(event_item.iter(include_text=False)):
-                    column_type: Optional[int] = get_column_type_btc(index)
-                    if column_type == COLUMN_BTC_YES:
+                    if index == COLUMN_INDEX_BTC_YES:
                         odds_less = parsing_odds(item)
-                        continue
-                    if column_type == COLUMN_BTC_NO:
+                    elif index == COLUMN_INDEX_BTC_NO:
                         odds_greater = parsing_odds(item)
-                        continue
                 if (indicator is not None) and (odds_less is not None) and (odds_greater is not None):
                     ret.append( {
                         'match_event_id': None,
@@ -1021,7 +1252,7 @@ async def get_match_line(
         sport_id: SportType,
         championship: ChampionshipBetexplorer,
         match: MatchBetexplorer,
-        need_refresh: bool,  # noqa: FBT001
+        freshness: Freshness | None = None,
 ) -> None:
     """Загрузка и разбор информации по линии.
 
@@ -1029,7 +1260,7 @@ async def get_match_line(
     :param sport_id: Вид спорта
     :param championship: Информация о чемпионате
     :param match: Информация о матче
-    :param need_refresh: Необходимо обновить данные
+    :param freshness: Требования к свежести сохраненных страниц коэффициентов
     """
     if match['match_url'] is not None:
         match_bet: str = [x for x in urlparse(match['match_url']).path.split('/') if x][-1]
@@ -1037,7 +1268,7 @@ async def get_match_line(
         if sport_id in [SportType.FOOTBALL, SportType.HOCKEY]:
             load_btc: Optional[ReceivedData]
             pbe: MatchEventBetexplorer | None
-            if (load_btc := await ls.get_read(urljoin('/match-odds-old/', match_bet + '/1/bts/1/'), '')) is not None and (pbe := parsing_btc(load_btc, sport_id)) is not None:  # noqa: E501
+            if (load_btc := await ls.get_read(urljoin('/match-odds-old/', match_bet + '/1/bts/1/'), '', freshness=freshness)) is not None and (pbe := parsing_btc(load_btc, sport_id)) is not None:  # noqa: E501
                 match['match_event'].append(pbe)
 
         # load_ou: Optional[ReceivedData]
@@ -1047,7 +1278,7 @@ async def get_match_line(
 
         load_ah: Optional[ReceivedData]
         pah: list[MatchEventBetexplorer] | None
-        if (load_ah := await ls.get_read(urljoin('/match-odds-old/', match_bet + '/1/ah/1/'), '')) is not None and (pah := parsing_ou(load_ah, sport_id, EVENT_AH)) is not None:  # noqa: E501
+        if (load_ah := await ls.get_read(urljoin('/match-odds-old/', match_bet + '/1/ah/1/'), '', freshness=freshness)) is not None and (pah := parsing_ou(load_ah, sport_id, EVENT_AH)) is not None:  # noqa: E501
             match['match_event'].extend(pah)
     # await ls.get_read(
     #     self, urljoin('/match-odds/', [x for x in urlparse(match['match_url']).path.split('/') if x][-1] + '/1/ou/'),
@@ -1055,97 +1286,466 @@ async def get_match_line(
     #     need_refresh)
 
 
-async def get_championships(
-        root_dir: str,
-        database: Optional[str],
-        config_engine: Optional[dict],
-        load_net: bool,
-        load_detail: bool,
-        load_detail_coefficients: bool,
-        save_database: DatabaseUsage,
+async def get_match_detail(  # noqa: PLR0913, PLR0917
+        ls: LoadSave,
+        crd: CRUDbetexplorer,
+        session: AsyncSession | None,
         sport_id: SportType,
-        country: CountryBetexplorer,
-        updated_years: list[str],
+        championship: ChampionshipBetexplorer,
+        match: MatchBetexplorer,
+        load_detail_coefficients: bool,  # noqa: FBT001
+        policy: FreshnessPolicy,
         fast_country: dict[str, int],
-        lock: MultiLock,
+        fast_team: dict[(int, str, str, str), TeamBetexplorer | None],
+        team_loading: dict[str, asyncio.Future],
+        session_lock: asyncio.Lock,
+        registry: TeamRegistry | None = None,
 ) -> None:
-    """Загрузка матчей.
+    """Загрузка подробной информации о матче (таймы, команды, коэффициенты).
 
-    :param root_dir: Путь для сохранения данных на диске
-    :param database: Путь к базе данных
-    :param config_engine: Конфигурация движка базы данных
-    :param load_net: Загрузка данных из интернета False - нет (использовать только сохраненные на диске), True - да
+    :param ls: Класс для загрузки данных
+    :param crd: Класс для сохранения данных
+    :param session: Текущая сессия базы данных
+    :param sport_id: Вид спорта
+    :param championship: Информация о чемпионате
+    :param match: Информация о матче
+    :param load_detail_coefficients: Загружать подробную информацию о коэффициентах (тотал, фора)
+    :param policy: Правила обновления сохраненных страниц
+    :param fast_country: Справочник стран
+    :param fast_team: Справочник закаченных команд
+    :param team_loading: Команды, загрузка которых уже выполняется другими задачами
+    :param session_lock: Блокировка сессии базы данных
+    :param registry: Справочник команд, общий для всех процессов
+    """
+    match_time: MatchBetexplorer | None
+    if (match_time := await get_match_time(ls, sport_id, championship, match, policy.match(
+            match['game_date'], championship['championship_years']))) is not None:
+        update_match_time(match, match_time)
+        await get_team(
+            ls, crd, session,
+            [match['home_team'], match['away_team']], fast_country, fast_team, team_loading, session_lock,
+            policy.page(PageKind.TEAM), registry)
+        if load_detail_coefficients:
+            await get_match_line(ls, sport_id, championship, match, policy.match(
+                match['game_date'], championship['championship_years'], PageKind.ODDS))
+
+
+async def get_country_championships(  # noqa: PLR0913, PLR0917
+        ls: LoadSave,
+        crd: CRUDbetexplorer,
+        session: AsyncSession | None,
+        sport_id: SportType,
+        countries: list[CountryBetexplorer],
+        policy: FreshnessPolicy,
+) -> list[ChampionshipBetexplorer]:
+    """Загрузка и сохранение в базе данных сезонов чемпионатов стран.
+
+    :param ls: Класс для загрузки данных
+    :param crd: Класс для сохранения данных
+    :param session: Текущая сессия базы данных
+    :param sport_id: Вид спорта
+    :param countries: Страны
+    :param policy: Правила обновления сохраненных страниц
+    :return: Сезоны чемпионатов всех стран (с идентификаторами в базе данных)
+    """
+    championships: list[ChampionshipBetexplorer] = []
+    load_seasons: list[ReceivedData | None] = await gather_limited(ls.concurrency, *(
+        ls.get_read(country['country_url'], CSS_CHAMPIONSHIPS, freshness=policy.page(PageKind.CHAMPIONSHIPS))
+        for country in countries))
+    for country, seasons in zip(countries, load_seasons, strict=True):
+        if seasons is not None:
+            country_championships: list[ChampionshipBetexplorer] = parsing_championships(
+                seasons, sport_id.value, country['country_id'])
+            await crd.insert_championship(session, sport_id, country['country_id'], country_championships)
+            championships.extend(country_championships)
+    return championships
+
+
+async def get_championships(
+        ls: LoadSave,
+        db: DatabaseSessionManager,
+        crd: CRUDbetexplorer,
+        load_detail: bool,  # noqa: FBT001
+        load_detail_coefficients: bool,  # noqa: FBT001
+        sport_id: SportType,
+        championships: list[ChampionshipBetexplorer],
+        policy: FreshnessPolicy,
+        fast_country: dict[str, int],
+        incremental: bool = False,  # noqa: FBT001, FBT002
+        checkpoint: Checkpoint | None = None,
+        registry: TeamRegistry | None = None,
+) -> dict[str, SeasonDone]:
+    """Загрузка матчей сезонов чемпионатов.
+
+    :param ls: Класс для загрузки данных
+    :param db: Подключение к базе данных
+    :param crd: Класс для сохранения данных
     :param load_detail: Загружать подробную информацию о матче (таймы, игроки) с сайта
     :param load_detail_coefficients: Загружать подробную информацию о коэффициентах (тотал, фора)
-    :param save_database: Операции с базой данных 0 - без операций, 1 - только читать, 2 - читать и записывать
     :param sport_id: Вид спорта
-    :param country: Информация о стране
-    :param updated_years: Список годов чемпионатов для обновления
+    :param championships: Сезоны чемпионатов (уже сохраненные в базе данных)
+    :param policy: Правила обновления сохраненных страниц
     :param fast_country: Массив идентификаторов-названий стран
-    :param lock: Действия требующие монополизма
+    :param incremental: Разбирать и загружать подробно только результаты новее сохраненных в базе
+    :param checkpoint: Контрольная точка загрузки (только при запуске в основном процессе)
+    :param registry: Справочник команд, общий для всех процессов
+    :return: Итоги обработки сезонов по ссылке на чемпионат
     """
-    ls = LoadSave(
+    save_database: DatabaseUsage = crd.save_database
+    done: dict[str, SeasonDone] = {}
+    async with db.get_session() if save_database != DATABASE_NOT_USE else nullcontext() as session:
+        fast_team: dict[(int, str, str, str), TeamBetexplorer | None] = {}
+        team_loading: dict[str, asyncio.Future] = {}
+        session_lock = asyncio.Lock()
+        championship: ChampionshipBetexplorer
+        for championship in championships:
+            stored: dict[str | None, StoredResults] | None = None
+            if incremental and save_database == DATABASE_WRITE_DATA:
+                stored = await crd.last_results(session, championship['championship_id'])
+            results: ResultsBetexplorer | None = await get_results_fixtures(
+                ls,
+                championship['championship_url'], sport_id,
+                championship['championship_id'], False, policy,  # noqa: FBT003
+                championship['championship_years'], stored)
+            if results is not None:
+                if load_detail:
+                    await gather_limited(ls.concurrency, *(get_match_detail(
+                        ls, crd, session, sport_id, championship, match, load_detail_coefficients, policy,
+                        fast_country, fast_team, team_loading, session_lock, registry)
+                        for match in results['matches']))
+                if save_database != DATABASE_NOT_USE:
+                    async with session.begin():
+                        await crd.add_championship_stages(session, championship['championship_id'], results['stages'])
+                        await crd.add_matches(session, championship['championship_id'], results['matches'])
+            done[championship['championship_url']] = season_done(
+                results['matches'] if results is not None else [], bool(stored))
+            if checkpoint is not None:
+                checkpoint.complete(sport_id.value, championship, done[championship['championship_url']])
+    return done
+
+
+def new_loader(root_dir: str, page_store: StoreConfig | None, parser_backend: str) -> LoadSave:
+    """Создать класс для загрузки страниц сайта.
+
+    :param root_dir: Путь для сохранения данных на диске
+    :param page_store: Настройки хранилища страниц (база SQLite, сжатие)
+    :param parser_backend: Разборщик HTML ('modest', 'lexbor')
+    """
+    return LoadSave(
         root_url='https://www.betexplorer.com',
         root_dir=root_dir,
+        store=open_store(root_dir, page_store, SERVICE_FILES),
+        parsed=open_parsed_cache(page_store),
+        parser_backend=parser_backend,
     )
-    await ls.load_data(load_net=load_net, lock=lock)
 
+
+class WorkerContext(NamedTuple):
+    """Окружение рабочего процесса, создаваемое один раз при его запуске и общее для всех его задач."""
+
+    loop: asyncio.AbstractEventLoop
+    """Цикл событий, в котором выполняются задачи."""
+    ls: LoadSave
+    """Класс для загрузки данных (с открытым соединением с сайтом)."""
+    db: DatabaseSessionManager
+    """Подключение к базе данных (с пулом соединений)."""
+    crd: CRUDbetexplorer
+    """Класс для сохранения данных."""
+    registry: TeamRegistry
+    """Справочник команд, общий для всех процессов."""
+
+
+_worker: WorkerContext | None = None
+"""Окружение текущего рабочего процесса."""
+
+
+def register_signal_handler() -> None:
+    """Что бы не было ошибки по ctr+c в мультипоточном режиме."""
+    signal.signal(signal.SIGINT, lambda _, __: None)
+
+
+def init_worker(  # noqa: PLR0913, PLR0917
+        limiter: RateLimiter,
+        root_dir: str,
+        database: str | None,
+        config_engine: dict | None,
+        config_http: dict | None,
+        concurrency: int,
+        load_net: bool,  # noqa: FBT001
+        save_database: DatabaseUsage,
+        retry_policy: RetryPolicy | None,
+        page_store: StoreConfig | None,
+        parser_backend: str,
+        registry: TeamRegistry,
+) -> None:
+    """Инициализация рабочего процесса: цикл событий, соединение с сайтом и движок базы данных.
+
+    Все создается один раз и используется всеми задачами процесса, закрывается при завершении процесса.
+
+    :param limiter: Ограничитель частоты запросов, общий для всех процессов
+    :param root_dir: Путь для сохранения данных на диске
+    :param database: Путь к базе данных
+    :param config_engine: Конфигурация движка базы данных
+    :param config_http: Параметры пула соединений с сайтом
+    :param concurrency: Количество страниц, загружаемых одновременно в одном процессе
+    :param load_net: Загрузка данных из интернета False - нет (использовать только сохраненные на диске), True - да
+    :param save_database: Операции с базой данных 0 - без операций, 1 - только читать, 2 - читать и записывать
+    :param retry_policy: Правила повтора неудачных запросов
+    :param page_store: Настройки хранилища страниц (база SQLite, сжатие)
+    :param parser_backend: Разборщик HTML ('modest', 'lexbor')
+    :param registry: Справочник команд, общий для всех процессов
+    """
+    global _worker  # noqa: PLW0603
+    register_signal_handler()
+    install_limiter(limiter)
+    loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    ls: LoadSave = new_loader(root_dir, page_store, parser_backend)
+    loop.run_until_complete(ls.load_data(load_net=load_net, limiter=limiter, config_http=config_http,
+                                         concurrency=concurrency, retry_policy=retry_policy))
     db = DatabaseSessionManager()
     if save_database != DATABASE_NOT_USE:
         db.init(database, **config_engine)
-    crd = CRUDbetexplorer(save_database=save_database)
+    _worker = WorkerContext(loop, ls, db, CRUDbetexplorer(save_database=save_database), registry)
+    multiprocessing.util.Finalize(None, close_worker, exitpriority=10)
 
-    async with db.get_session() if save_database != DATABASE_NOT_USE else nullcontext() as session:
-        load_seasons: Optional[ReceivedData]
-        if (load_seasons := await ls.get_read(country['country_url'], CSS_CHAMPIONSHIPS, True)) is not None:
-            championships: list[ChampionshipBetexplorer] = parsing_championships(
-                load_seasons, sport_id.value, country['country_id'])
-            await crd.insert_championship(session, sport_id, country['country_id'], championships)
-
-            fast_team: dict[(int, str, str, str), Optional[TeamBetexplorer]] = {}
-            championship: ChampionshipBetexplorer
-            for championship in championships:
-                need_refresh: bool = any(year in championship['championship_years'] for year in updated_years)
-
-                results: ResultsBetexplorer | None
-                if (results := await get_results_fixtures(
-                        ls,
-                        championship['championship_url'], sport_id,
-                        championship['championship_id'], need_refresh)) is not None:
-                    if load_detail:
-                        match: MatchBetexplorer
-                        for match in results['matches']:
-                            match_time: MatchBetexplorer | None
-                            if (match_time := await get_match_time(ls, sport_id, championship, match, False)) is not None:
-                                update_match_time(match, match_time)
-                                await get_team(
-                                    ls, crd, session,
-                                    [match['home_team'], match['away_team']], fast_country, fast_team)
-                                if load_detail_coefficients:
-                                    await get_match_line(ls, sport_id, championship, match, need_refresh)
-                    if save_database != DATABASE_NOT_USE:
-                        async with session.begin():
-                            await crd.add_championship_stages(session, championship['championship_id'], results['stages'])
-                            await crd.add_matches(session, championship['championship_id'], results['matches'])
-    await db.close()
-    await ls.close_session()
 
+def close_worker() -> None:
+    """Закрыть окружение рабочего процесса (вызывается при завершении процесса)."""
+    global _worker
+    if _worker is not None:
+        worker, _worker = _worker, None
+        worker.loop.run_until_complete(worker.db.close())
+        worker.loop.run_until_complete(worker.ls.close_session())
+        worker.loop.close()
 
-def wrapper(async_func: Callable, *args: Any) -> None:
-    """Обвертка для запуска асинхронной функции.
 
-    :param async_func: Асинхронная функция для запуска
-    :param args: Параметры функции
+def run_championships(  # noqa: PLR0913, PLR0917
+        load_detail: bool,  # noqa: FBT001
+        load_detail_coefficients: bool,  # noqa: FBT001
+        sport_id: SportType,
+        championships: list[ChampionshipBetexplorer],
+        policy: FreshnessPolicy,
+        fast_country: dict[str, int],
+        incremental: bool,  # noqa: FBT001
+) -> tuple[Counter, dict[str, SeasonDone]]:
+    """Задача рабочего процесса: загрузка матчей сезонов чемпионатов в окружении процесса.
+
+    :param load_detail: Загружать подробную информацию о матче (таймы, игроки) с сайта
+    :param load_detail_coefficients: Загружать подробную информацию о коэффициентах (тотал, фора)
+    :param sport_id: Вид спорта
+    :param championships: Сезоны чемпионатов (уже сохраненные в базе данных)
+    :param policy: Правила обновления сохраненных страниц
+    :param fast_country: Массив идентификаторов-названий стран
+    :param incremental: Разбирать и загружать подробно только результаты новее сохраненных в базе
+    :return: Статистика работы с сетью за время задачи и итоги обработки сезонов по ссылке на чемпионат
     """
-    asyncio.run(async_func(*args))
+    done: dict[str, SeasonDone] = _worker.loop.run_until_complete(get_championships(
+        _worker.ls, _worker.db, _worker.crd, load_detail, load_detail_coefficients, sport_id, championships, policy,
+        fast_country, incremental, registry=_worker.registry))
+    stats: Counter = Counter(_worker.ls.stats)
+    _worker.ls.stats.clear()
+    return stats, done
 
 
-def register_signal_handler() -> None:
-    """Что бы не было ошибки по ctr+c в мультипоточном режиме."""
-    signal.signal(signal.SIGINT, lambda _, __: None)
+def parse_season(
+        sport_id: SportType,
+        championship: ChampionshipBetexplorer,
+        policy: FreshnessPolicy,
+        stored: dict[str | None, StoredResults] | None,
+) -> tuple[Counter, ResultsBetexplorer | None]:
+    """Задача процесса разбора конвейера: разбор страниц результатов сезона, уже загруженных в хранилище.
 
+    :param sport_id: Вид спорта
+    :param championship: Информация о чемпионате
+    :param policy: Правила обновления сохраненных страниц
+    :param stored: Самые поздние сохраненные результаты по имени стадии (разбираются только более новые матчи)
+    :return: Статистика работы за время задачи и результаты сезона
+    """
+    results: ResultsBetexplorer | None = _worker.loop.run_until_complete(get_results_fixtures(
+        _worker.ls, championship['championship_url'], sport_id, championship['championship_id'],
+        False, policy, championship['championship_years'], stored))  # noqa: FBT003
+    stats: Counter = Counter(_worker.ls.stats)
+    _worker.ls.stats.clear()
+    return stats, results
+
+
+async def fetch_seasons(  # noqa: PLR0913, PLR0917
+        ls: LoadSave,
+        db: DatabaseSessionManager,
+        crd: CRUDbetexplorer,
+        work: Iterator[tuple[SportType, ChampionshipBetexplorer, dict[str, int]]],
+        pages: StageQueue,
+        policy: FreshnessPolicy,
+        incremental: bool,  # noqa: FBT001
+        session_lock: asyncio.Lock,
+) -> None:
+    """Стадия загрузки конвейера: загрузка страниц результатов и расписания сезонов в хранилище.
 
-async def load_data(
+    :param ls: Класс для загрузки данных
+    :param db: Подключение к базе данных
+    :param crd: Класс для сохранения данных
+    :param work: Сезоны чемпионатов (общий для всех задач стадии)
+    :param pages: Очередь сезонов, загруженных для разбора
+    :param policy: Правила обновления сохраненных страниц
+    :param incremental: Разбирать только результаты новее сохраненных в базе
+    :param session_lock: Блокировка сессии базы данных
+    """
+    save_database: DatabaseUsage = crd.save_database
+    async with db.get_session() if save_database != DATABASE_NOT_USE else nullcontext() as session:
+        for sport_id, championship, _ in work:
+            stored: dict[str | None, StoredResults] | None = None
+            if incremental and save_database == DATABASE_WRITE_DATA:
+                async with session_lock:
+                    stored = await crd.last_results(session, championship['championship_id'])
+            if ls.load_net:
+                await asyncio.gather(
+                    fetch_results(ls, championship['championship_url'], IS_RESULT, False,  # noqa: FBT003
+                                  policy.season(PageKind.RESULTS, championship['championship_years'])),
+                    fetch_results(ls, championship['championship_url'], IS_FIXTURE, False,  # noqa: FBT003
+                                  policy.season(PageKind.FIXTURES, championship['championship_years'])),
+                )
+            await pages.put((sport_id, championship, stored))
+
+
+async def parse_seasons(
+        pool: ProcessPoolExecutor,
+        pages: StageQueue,
+        results: StageQueue,
+        policy: FreshnessPolicy,
+        stats: Counter,
+) -> int:
+    """Стадия разбора конвейера: передача загруженных сезонов процессам разбора.
+
+    :param pool: Процессы разбора
+    :param pages: Очередь сезонов, загруженных для разбора
+    :param results: Очередь разобранных сезонов для записи в базу данных
+    :param policy: Правила обновления сохраненных страниц
+    :param stats: Статистика работы процессов разбора
+    :return: Количество сезонов, разбор которых завершился ошибкой
+    """
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    failed: int = 0
+    while (season := await pages.get()) is not None:
+        sport_id, championship, stored = season
+        try:
+            season_stats, season_results = await loop.run_in_executor(
+                pool, parse_season, sport_id, championship, policy, stored)
+        except Exception as e:  # noqa: BLE001
+            failed += 1
+            print(f'Ошибка разбора сезона {championship["championship_url"]}: {e!r}', flush=True)  # noqa: T201
+            continue
+        stats.update(season_stats)
+        await results.put((sport_id, championship, season_results, bool(stored)))
+    return failed
+
+
+async def write_seasons(  # noqa: PLR0913, PLR0917
+        db: DatabaseSessionManager,
+        crd: CRUDbetexplorer,
+        results: StageQueue,
+        batch: int,
+        costs: WorkCosts,
+        checkpoint: Checkpoint,
+) -> int:
+    """Стадия записи конвейера: запись разобранных сезонов в базу данных пакетами.
+
+    :param db: Подключение к базе данных
+    :param crd: Класс для сохранения данных
+    :param results: Очередь разобранных сезонов
+    :param batch: Наибольшее количество сезонов в одной транзакции
+    :param costs: Трудоемкость сезонов чемпионатов
+    :param checkpoint: Контрольная точка загрузки
+    :return: Количество сезонов, запись которых завершилась ошибкой
+    """
+    save_database: DatabaseUsage = crd.save_database
+    failed: int = 0
+    finished: bool = False
+    async with db.get_session() if save_database != DATABASE_NOT_USE else nullcontext() as session:
+        while not finished:
+            seasons: list[tuple[SportType, ChampionshipBetexplorer, ResultsBetexplorer | None, bool]] = []
+            if (season := await results.get()) is None:
+                break
+            seasons.append(season)
+            while len(seasons) < batch and not results.empty():
+                if (season := results.get_nowait()) is None:
+                    finished = True
+                    break
+                seasons.append(season)
+            if save_database != DATABASE_NOT_USE:
+                try:
+                    async with session.begin():
+                        for _, championship, season_results, _ in seasons:
+                            if season_results is not None:
+                                await crd.add_championship_stages(
+                                    session, championship['championship_id'], season_results['stages'])
+                                await crd.add_matches(session, championship['championship_id'],
+                                                      season_results['matches'])
+                except Exception as e:  # noqa: BLE001
+                    failed += len(seasons)
+                    print(f'Ошибка записи сезонов: {e!r}', flush=True)  # noqa: T201
+                    continue
+            for sport_id, championship, season_results, incremental in seasons:
+                done: SeasonDone = season_done(
+                    season_results['matches'] if season_results is not None else [], incremental)
+                costs.complete({championship['championship_url']: done})
+                checkpoint.complete(sport_id.value, championship, done)
+    return failed
+
+
+async def run_pipeline(  # noqa: PLR0913, PLR0917
+        ls: LoadSave,
+        db: DatabaseSessionManager,
+        crd: CRUDbetexplorer,
+        pool: ProcessPoolExecutor,
+        config: PipelineConfig,
+        work: list[tuple[SportType, ChampionshipBetexplorer, dict[str, int]]],
+        policy: FreshnessPolicy,
+        incremental: bool,  # noqa: FBT001
+        costs: WorkCosts,
+        checkpoint: Checkpoint,
+) -> tuple[Counter, int]:
+    """Загрузка сезонов чемпионатов конвейером: загрузка страниц, разбор в процессах, запись в базу данных.
+
+    :param ls: Класс для загрузки данных
+    :param db: Подключение к базе данных
+    :param crd: Класс для сохранения данных
+    :param pool: Процессы разбора (созданные init_worker без загрузки из интернета и без базы данных)
+    :param config: Настройки конвейера
+    :param work: Сезоны чемпионатов в порядке обработки
+    :param policy: Правила обновления сохраненных страниц
+    :param incremental: Разбирать только результаты новее сохраненных в базе
+    :param costs: Трудоемкость сезонов чемпионатов
+    :param checkpoint: Контрольная точка загрузки
+    :return: Статистика работы процессов разбора и количество сезонов, обработка которых завершилась ошибкой
+    """
+    pages: StageQueue = StageQueue('загруженных сезонов', config.pages_queue)
+    results: StageQueue = StageQueue('разобранных сезонов', config.results_queue)
+    stats: Counter = Counter()
+    seasons: Iterator[tuple[SportType, ChampionshipBetexplorer, dict[str, int]]] = iter(work)
+    session_lock = asyncio.Lock()
+
+    async def fetch_stage() -> None:
+        await asyncio.gather(*(fetch_seasons(ls, db, crd, seasons, pages, policy, incremental, session_lock)
+                               for _ in range(config.fetchers)))
+        await pages.close(config.parsers)
+
+    async def parse_stage() -> int:
+        parse_failed: list[int] = await asyncio.gather(*(
+            parse_seasons(pool, pages, results, policy, stats) for _ in range(config.parsers)))
+        await results.close(1)
+        return sum(parse_failed)
+
+    async with asyncio.TaskGroup() as group:
+        group.create_task(fetch_stage())
+        parsing: asyncio.Task = group.create_task(parse_stage())
+        writing: asyncio.Task = group.create_task(write_seasons(db, crd, results, config.batch, costs, checkpoint))
+    print(pages.report(), flush=True)  # noqa: T201
+    print(results.report(), flush=True)  # noqa: T201
+    return stats, parsing.result() + writing.result()
+
+
+async def load_data(  # noqa: PLR0915
         root_dir: str,
         database: str | None = None,
         sport_type: Optional[list[SportType]] = None,
@@ -1155,9 +1755,18 @@ async def load_data(
         save_database: DatabaseUsage = DATABASE_NOT_USE,
         create_tables: int = 0,
         config_engine: dict | None = None,
-        start_updating: datetime.datetime | None = None,
+        freshness: FreshnessPolicy | None = None,
         exclude_countries: Optional[tuple] = None,  # noqa: UP007
-        processes: int = 1) -> None:
+        processes: int = 1,
+        rate_limits: dict[str, HostLimit] | None = None,
+        config_http: dict | None = None,
+        concurrency: int = 1,
+        retry_policy: RetryPolicy | None = None,
+        page_store: StoreConfig | None = None,
+        parser_backend: str = PARSER_MODEST,
+        incremental: bool = False,
+        resume: bool = False,
+        pipeline: PipelineConfig | None = None) -> None:
     """Первоначальная Загрузка данных спортивных состязаний всех чемпионатов во всех странах.
 
     :param root_dir: Путь для сохранения данных на диске
@@ -1169,26 +1778,33 @@ async def load_data(
     :param save_database: Операции с базой данных 0 - без операций, 1 - только читать, 2 - читать и записывать
     :param create_tables: Создание базы данных если не существует 0 -не создавать, 1 - создать
     :param config_engine: Выводить команды SQL отправляемые на сервер
-    :param start_updating: Дата начала обновления данных
+    :param freshness: Правила обновления сохраненных страниц
     :param exclude_countries: Список стран которые не загружаем
-    :param processes: Одновременное количество запущенных процессов
+    :param processes: Одновременное количество запущенных процессов (сезоны чемпионатов передаются им по убыванию
+        трудоемкости при предыдущем запуске)
+    :param rate_limits: Ограничения частоты запросов по сайтам
+    :param config_http: Параметры пула соединений с сайтом (aiohttp.TCPConnector)
+    :param concurrency: Количество страниц, загружаемых одновременно в одном процессе
+    :param retry_policy: Правила повтора неудачных запросов
+    :param page_store: Настройки хранилища страниц (база SQLite, сжатие)
+    :param parser_backend: Разборщик HTML ('modest', 'lexbor')
+    :param incremental: Разбирать и загружать подробно только результаты новее сохраненных в базе
+    :param resume: Продолжить прерванную загрузку, пропуская сезоны, завершенные в ней
+    :param pipeline: Загружать сезоны конвейером: загрузка страниц, разбор в процессах, запись в базу данных
+        (None - каждый сезон целиком в одном процессе, конвейер не используется при load_detail)
     """
-    if start_updating is None:
-        updated_years = []
-    else:
-        updated_years = [str(x) for x in range(start_updating.year, start_updating.year + 6)]
+    if freshness is None:
+        freshness = FreshnessPolicy()
     if exclude_countries is None:
         exclude_countries = ()
     if sport_type is None:
         sport_type = [SportType.FOOTBALL]
 
-    ls = LoadSave(
-        root_url='https://www.betexplorer.com',
-        root_dir=root_dir,
-    )
-    manager: SyncManager = Manager()
-    lock: MultiLock = manager.Lock()
-    await ls.load_data(load_net=load_net, lock=lock)
+    ls: LoadSave = new_loader(root_dir, page_store, parser_backend)
+    ls.store.prepare()
+    limiter: RateLimiter = RateLimiter(rate_limits)
+    await ls.load_data(load_net=load_net, limiter=limiter, config_http=config_http, concurrency=concurrency,
+                       retry_policy=retry_policy)
 
     db = DatabaseSessionManager()
     if save_database != DATABASE_NOT_USE:
@@ -1196,38 +1812,102 @@ async def load_data(
         if create_tables == 1:
             await db.created_db_tables()
     crd: CRUDbetexplorer = CRUDbetexplorer(save_database=save_database)
-    pool: ProcessPoolExecutor = ProcessPoolExecutor(max_workers=processes, initializer=register_signal_handler)
+    if pipeline is not None and load_detail:
+        print('Конвейер не используется при загрузке подробной информации о матчах', flush=True)  # noqa: T201
+        pipeline = None
+    manager: SyncManager | None = multiprocessing.Manager() if processes > 1 and pipeline is None else None
+    registry: TeamRegistry = TeamRegistry(manager.dict(), manager.Lock()) if manager is not None else TeamRegistry()
+    pool: ProcessPoolExecutor
+    if pipeline is not None:
+        # Процессы разбора читают страницы, загруженные основным процессом, поэтому без списка файлов в памяти
+        pool = ProcessPoolExecutor(
+            max_workers=pipeline.parsers, initializer=init_worker, initargs=(
+                limiter, root_dir, None, None, config_http, concurrency, False, DATABASE_NOT_USE, retry_policy,
+                page_store._replace(manifest=False) if page_store is not None else None, parser_backend, registry))
+    else:
+        pool = ProcessPoolExecutor(
+            max_workers=processes, initializer=init_worker, initargs=(
+                limiter, root_dir, database, config_engine, config_http, concurrency, load_net, save_database,
+                retry_policy, page_store, parser_backend, registry))
     # noinspection PyTypeChecker
     loop: ProactorEventLoop = asyncio.get_running_loop()
     futures: list[Future] = []
+    stats: Counter = Counter()
+    costs: WorkCosts = WorkCosts(str(Path(root_dir, COSTS_FILE)))
+    checkpoint: Checkpoint = Checkpoint(str(Path(root_dir, CHECKPOINT_FILE)), resume)
+    if checkpoint.done:
+        print(f'Продолжение прерванной загрузки, завершено сезонов: {len(checkpoint.done)}', flush=True)  # noqa: T201
+    work: list[tuple[SportType, ChampionshipBetexplorer, dict[str, int]]] = []
+    failed: int = 0
 
     async with db.get_session() if save_database != DATABASE_NOT_USE else nullcontext() as session:
         await crd.sports_insert_all(session, SPORTS)
+        if manager is not None:  # в одном процессе команды из базы находятся при загрузке деталей матча
+            registry.preload(await crd.team_all(session))
         sport_id: SportType
         for sport_id in sport_type:
             countries: list[CountryBetexplorer]
-            if (countries := await get_countries(ls, sports_url[sport_id])) is not None:
+            if (countries := await get_countries(
+                    ls, sports_url[sport_id], freshness=freshness.page(PageKind.COUNTRIES))) is not None:
                 await crd.country_insert_all(session, sport_id, countries)
                 fast_country: dict[str, int] = {country['country_name']: country['country_id'] for country in countries}
-                country: CountryBetexplorer
-                for country in list(filter(lambda x: x['country_name'] not in exclude_countries, countries)):
-                    if processes == 1:
-                        await get_championships(
-                            root_dir, database, config_engine, load_net, load_detail, load_detail_coefficients,
-                            save_database, sport_id, country, updated_years, fast_country, lock
-                        )
-                    else:
-                        futures.append(loop.run_in_executor(
-                            pool, wrapper, get_championships,
-                            root_dir, database, config_engine, load_net, load_detail, load_detail_coefficients,
-                            save_database, sport_id, country, updated_years, fast_country, lock)  # noqa: COM812
-                        )
-    if futures:
-        await asyncio.wait(futures)
+                championships: list[ChampionshipBetexplorer] = [
+                    championship for championship in await get_country_championships(
+                        ls, crd, session, sport_id,
+                        [country for country in countries if country['country_name'] not in exclude_countries],
+                        freshness)
+                    if not checkpoint.is_done(championship)]
+                if processes == 1 and pipeline is None:
+                    sport_done: dict[str, SeasonDone] = await get_championships(
+                        ls, db, crd, load_detail, load_detail_coefficients, sport_id, championships, freshness,
+                        fast_country, incremental, checkpoint, registry,
+                    )
+                    costs.complete(sport_done)
+                else:
+                    work.extend((sport_id, championship, fast_country) for championship in championships)
+        work.sort(key=lambda item: costs.priority(item[1]))
+        if pipeline is None:
+            for sport_id, championship, fast_country in work:
+                futures.append(loop.run_in_executor(
+                    pool, run_championships,
+                    load_detail, load_detail_coefficients, sport_id, [championship], freshness, fast_country,
+                    incremental,
+                ))
+    if pipeline is not None:
+        pipeline_stats, failed = await run_pipeline(
+            ls, db, crd, pool, pipeline, work, freshness, incremental, costs, checkpoint)
+        stats += pipeline_stats
+    seasons: dict[str, tuple[SportType, ChampionshipBetexplorer]] = {
+        championship['championship_url']: (sport_id, championship) for sport_id, championship, _ in work}
+    for future in asyncio.as_completed(futures):
+        try:
+            season_stats, season_results = await future
+        except Exception as e:  # noqa: BLE001
+            failed += 1
+            print(f'Ошибка загрузки сезона: {e!r}', flush=True)  # noqa: T201
+            continue
+        stats += season_stats
+        costs.complete(season_results)
+        for url, season in season_results.items():
+            checkpoint.complete(seasons[url][0].value, seasons[url][1], season)
+    costs.save()
+    if failed:
+        print(f'Не завершено сезонов: {failed}, продолжение загрузки - resume=True', flush=True)  # noqa: T201
+        checkpoint.close()
+    else:
+        checkpoint.finish()
+    stats += ls.stats
+    if load_net:
+        print(f'Запросов: {stats["requests"]}, новых соединений: {stats["connections_created"]}, '  # noqa: T201
+              f'повторно использованных соединений: {stats["connections_reused"]}', flush=True)
+        print(f'Повторов запросов: {stats["retries"]}, '  # noqa: T201
+              f'приостановок обращений к сайту: {stats["circuit_open"]}', flush=True)
+    print(f'Объединено одинаковых одновременных запросов: {stats["coalesced"]}', flush=True)  # noqa: T201
     await crd.analyze_match(session)
 
     pool.shutdown()
-    manager.shutdown()
+    if manager is not None:
+        manager.shutdown()
     await db.close()
     await ls.close_session()
 # temp = timeit.timeit("soup.node.css_first('.table-main')", globals={'soup': soup}, number=200000)
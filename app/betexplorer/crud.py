@@ -8,10 +8,12 @@ from sqlalchemy import (
     Row,
     Select,
     TextClause,
+    and_,
     bindparam,
     func,
     inspect,
     literal_column,
+    or_,
     select,
     text,
     types,
@@ -43,6 +45,7 @@ from app.betexplorer.schemas import (
     MatchBetexplorer,
     SportBetexplorer,
     SportType,
+    StoredResults,
     TeamBetexplorer,
 )
 
@@ -412,6 +415,37 @@ class CRUDbetexplorer:
             team['team_id'] = team_rec.team_id
             return team_rec.team_id
 
+    async def team_all(self, session: AsyncSession) -> list[TeamBetexplorer]:
+        """Все команды, сохраненные в базе данных (для заполнения справочника команд).
+
+        :param session: Текущая сессия
+
+        SELECT team.*, country.country_name AS team_country
+        FROM public.team
+        LEFT JOIN public.country ON country.country_id = team.country_id
+        WHERE team.team_url IS NOT NULL;
+        """
+        if self.save_database == DATABASE_NOT_USE:
+            return []
+        async with session.begin():
+            teams_rec = await session.execute(
+                select(
+                    Team.team_id,
+                    Team.sport_id,
+                    Team.country_id,
+                    Country.country_name.label('team_country'),
+                    Team.team_name,
+                    Team.team_full,
+                    Team.team_url,
+                    Team.team_emblem,
+                    Team.download_date,
+                    Team.save_date,
+                )
+                .outerjoin(Country, Country.country_id == Team.country_id)
+                .where(Team.team_url.is_not(None)),
+            )
+        return [dict(row) for row in teams_rec.mappings()]
+
     async def add_matches(
             self,
             session: AsyncSession,
@@ -525,6 +559,48 @@ class CRUDbetexplorer:
     # if modified:
     #     await self.analyze_tables(session, [Match, TimeScore, Shooter])
 
+    async def last_results(self,
+                           session: AsyncSession,
+                           championship_id: int) -> dict[str | None, StoredResults]:
+        """Самые поздние сохраненные результаты матчей чемпионата по стадиям.
+
+        :param session: Текущая сессия
+        :param championship_id: Идентификатор чемпионата
+        :return: День самого позднего результата и ссылки на матчи этого дня по имени стадии (None - без стадий)
+
+        SELECT stage_name, max(game_date)
+        FROM public."match"
+        WHERE championship_id = 10818 AND is_fixture = 0
+        GROUP BY stage_name;
+
+        SELECT stage_name, match_url
+        FROM public."match"
+        WHERE championship_id = 10818 AND is_fixture = 0
+          AND (stage_name IS NULL AND game_date >= '2024-01-10' AND game_date < '2024-01-11' OR ...);
+        """
+        if self.save_database == DATABASE_NOT_USE:
+            return {}
+        async with session.begin():
+            last_day: dict[str | None, datetime.date] = {
+                stage_name: game_date.date() for stage_name, game_date in (await session.execute(
+                    select(Match.stage_name, func.max(Match.game_date))
+                    .where(Match.championship_id == championship_id, Match.is_fixture == 0)
+                    .group_by(Match.stage_name)))}
+            if not last_day:
+                return {}
+            match_urls: dict[str | None, set[str]] = {stage_name: set() for stage_name in last_day}
+            for stage_name, match_url in (await session.execute(
+                    select(Match.stage_name, Match.match_url)
+                    .where(Match.championship_id == championship_id, Match.is_fixture == 0, or_(*(and_(
+                        Match.stage_name.is_(None) if stage_name is None else Match.stage_name == stage_name,
+                        Match.game_date >= datetime.datetime.combine(game_day, datetime.time.min),
+                        Match.game_date < datetime.datetime.combine(
+                            game_day + datetime.timedelta(days=1), datetime.time.min),
+                    ) for stage_name, game_day in last_day.items()))))):
+                match_urls[stage_name].add(match_url)
+        return {stage_name: StoredResults(game_day, frozenset(match_urls[stage_name]))
+                for stage_name, game_day in last_day.items()}
+
     async def add_championship_stages(
             self,
             session: AsyncSession,
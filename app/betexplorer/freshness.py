@@ -0,0 +1,126 @@
+"""Правила обновления сохраненных страниц BetExplorer.
+
+Для каждого вида страницы задается допустимый возраст сохраненной копии отдельно для текущих
+и завершенных (архивных) чемпионатов. Страница архивного сезона или сыгранного матча, загруженная
+после его окончания, считается окончательной и повторно не загружается.
+"""
+import datetime  # noqa: ICN001
+import enum
+import re
+from typing import Final
+
+from app.utilbase import Freshness
+
+
+class PageKind(enum.Enum):
+    """Вид страницы сайта."""
+
+    COUNTRIES = 'countries'
+    """Список стран вида спорта."""
+    CHAMPIONSHIPS = 'championships'
+    """Список сезонов чемпионатов страны."""
+    RESULTS = 'results'
+    """Результаты матчей чемпионата."""
+    FIXTURES = 'fixtures'
+    """Расписание матчей чемпионата."""
+    MATCH = 'match'
+    """Подробная информация о матче."""
+    TEAM = 'team'
+    """Информация о команде."""
+    ODDS = 'odds'
+    """Коэффициенты матча (обе забьют, фора)."""
+
+
+PageTTL = tuple[datetime.timedelta | None, datetime.timedelta | None]
+"""Допустимый возраст страницы для текущего и архивного чемпионата (None - не ограничен)."""
+
+DEFAULT_TTL: Final[dict[PageKind, PageTTL]] = {
+    PageKind.COUNTRIES: (datetime.timedelta(days=7), datetime.timedelta(days=7)),
+    PageKind.CHAMPIONSHIPS: (datetime.timedelta(days=1), datetime.timedelta(days=1)),
+    PageKind.RESULTS: (datetime.timedelta(hours=12), None),
+    PageKind.FIXTURES: (datetime.timedelta(hours=12), None),
+    PageKind.MATCH: (datetime.timedelta(days=1), None),
+    PageKind.TEAM: (datetime.timedelta(days=30), datetime.timedelta(days=30)),
+    PageKind.ODDS: (datetime.timedelta(days=1), None),
+}
+"""Допустимый возраст страниц по умолчанию."""
+
+MATCH_SETTLED: Final[datetime.timedelta] = datetime.timedelta(days=2)
+"""Через сколько после начала матча его страница считается окончательной."""
+
+MATCH_HORIZON: Final[datetime.timedelta] = datetime.timedelta(days=14)
+"""Страница матча начинает обновляться, когда до его начала остается меньше этого срока."""
+
+REG_YEAR: re.Pattern = re.compile(r'\d{4}')
+
+
+class FreshnessPolicy:
+    """Правила обновления сохраненных страниц."""
+
+    __slots__ = ['ttl']
+
+    def __init__(self, ttl: dict[PageKind, PageTTL] | None = None) -> None:
+        """Инициализация правил.
+
+        :param ttl: Допустимый возраст страниц (не указанные виды страниц берутся из DEFAULT_TTL)
+        """
+        self.ttl: dict[PageKind, PageTTL] = DEFAULT_TTL | (ttl or {})
+
+    @staticmethod
+    def season_end(championship_years: str) -> datetime.datetime | None:
+        """Дата, после которой сезон чемпионата считается завершенным.
+
+        :param championship_years: Годы проведения чемпионата ('2023', '2023/2024')
+        """
+        if not (years := REG_YEAR.findall(championship_years or '')):
+            return None
+        return datetime.datetime(max(int(year) for year in years) + 1, 1, 1)  # noqa: DTZ001
+
+    def is_archived(self, championship_years: str, now: datetime.datetime | None = None) -> bool:
+        """Чемпионат завершен.
+
+        :param championship_years: Годы проведения чемпионата
+        :param now: Текущее время
+        """
+        return (end := self.season_end(championship_years)) is not None and end <= (now or datetime.datetime.now())  # noqa: DTZ005
+
+    def page(self, kind: PageKind, archived: bool = False,  # noqa: FBT001, FBT002
+             not_before: datetime.datetime | None = None) -> Freshness:
+        """Требования к свежести страницы.
+
+        :param kind: Вид страницы
+        :param archived: Страница относится к завершенному чемпионату
+        :param not_before: Страница, загруженная после этой даты, больше не обновляется
+        """
+        return Freshness(self.ttl[kind][1 if archived else 0], not_before)
+
+    def season(self, kind: PageKind, championship_years: str) -> Freshness:
+        """Требования к свежести страницы чемпионата.
+
+        Страница архивного чемпионата, загруженная до окончания сезона, загружается еще один раз.
+
+        :param kind: Вид страницы
+        :param championship_years: Годы проведения чемпионата
+        """
+        archived: bool = self.is_archived(championship_years)
+        return self.page(kind, archived, self.season_end(championship_years) if archived else None)
+
+    def match(self, game_date: datetime.datetime | None, championship_years: str,
+              kind: PageKind = PageKind.MATCH, now: datetime.datetime | None = None) -> Freshness:
+        """Требования к свежести страницы матча.
+
+        Страница матча, до начала которого больше MATCH_HORIZON, не обновляется. Страница матча, который
+        начнется в ближайшие дни или уже прошел, загружается заново при каждом обращении, пока не будет
+        загружена после его окончания (начало матча + MATCH_SETTLED), после этого она больше не обновляется.
+        Допустимый возраст страницы из правил используется только для матча без даты начала.
+
+        :param game_date: Дата начала матча
+        :param championship_years: Годы проведения чемпионата
+        :param kind: Вид страницы (матч или коэффициенты матча)
+        :param now: Текущее время
+        """
+        if game_date is None:
+            return self.page(kind, self.is_archived(championship_years, now))
+        if game_date - MATCH_HORIZON >= (now or datetime.datetime.now()):  # noqa: DTZ005
+            return Freshness()
+        return Freshness(datetime.timedelta(0), game_date + MATCH_SETTLED)
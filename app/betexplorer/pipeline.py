@@ -0,0 +1,83 @@
+"""Конвейер загрузки сезонов чемпионатов: загрузка страниц, разбор, запись в базу данных.
+
+Стадии работают одновременно и связаны ограниченными очередями: когда следующая стадия не успевает,
+очередь перед ней заполняется и предыдущая стадия ждет (обратное давление), поэтому в памяти
+находится не больше заданного количества сезонов. По глубине очередей видно, какая стадия
+ограничивает скорость загрузки.
+"""
+import asyncio
+from typing import Any, NamedTuple
+
+
+class PipelineConfig(NamedTuple):
+    """Настройки конвейера загрузки."""
+
+    fetchers: int = 4
+    """Количество сезонов, страницы которых загружаются одновременно (в основном процессе)."""
+    parsers: int = 4
+    """Количество процессов разбора страниц."""
+    batch: int = 8
+    """Наибольшее количество сезонов, записываемых в базу данных одной транзакцией."""
+    pages_queue: int = 16
+    """Наибольшее количество загруженных сезонов, ожидающих разбора."""
+    results_queue: int = 16
+    """Наибольшее количество разобранных сезонов, ожидающих записи в базу данных."""
+
+
+class StageQueue(asyncio.Queue):
+    """Ограниченная очередь между стадиями конвейера с замером ее глубины.
+
+    Завершение стадии передается потребителям значением None (по одному на каждого потребителя).
+    """
+
+    def __init__(self, name: str, maxsize: int) -> None:
+        """Создать очередь.
+
+        :param name: Название очереди (для вывода замеров)
+        :param maxsize: Наибольшее количество элементов в очереди
+        """
+        super().__init__(maxsize)
+        self.name: str = name
+        self.items: int = 0
+        """Количество переданных через очередь элементов."""
+        self.depth_total: int = 0
+        """Сумма глубины очереди после добавления каждого элемента."""
+        self.depth_max: int = 0
+        """Наибольшая глубина очереди."""
+        self.put_waits: int = 0
+        """Сколько раз поставщик ждал освобождения места (следующая стадия не успевает)."""
+        self.get_waits: int = 0
+        """Сколько раз потребитель ждал появления элемента (предыдущая стадия не успевает)."""
+
+    async def put(self, item: Any) -> None:
+        """Добавить элемент, дождавшись свободного места.
+
+        :param item: Элемент
+        """
+        if self.full():
+            self.put_waits += 1
+        await super().put(item)
+        self.items += 1
+        self.depth_total += self.qsize()
+        self.depth_max = max(self.depth_max, self.qsize())
+
+    async def get(self) -> Any:
+        """Взять элемент, дождавшись его появления."""
+        if self.empty():
+            self.get_waits += 1
+        return await super().get()
+
+    async def close(self, consumers: int) -> None:
+        """Сообщить потребителям о завершении предыдущей стадии.
+
+        :param consumers: Количество потребителей очереди
+        """
+        for _ in range(consumers):
+            await super().put(None)
+
+    def report(self) -> str:
+        """Замеры очереди для вывода."""
+        return (f'Очередь {self.name}: элементов {self.items}, '
+                f'глубина средняя {self.depth_total / self.items if self.items else 0:.1f}, '
+                f'наибольшая {self.depth_max} из {self.maxsize}, '
+                f'ожиданий места {self.put_waits}, ожиданий данных {self.get_waits}')
@@ -0,0 +1,196 @@
+"""Распределение сезонов чемпионатов между рабочими процессами.
+
+Единица работы - один сезон чемпионата. Сезоны передаются в пул процессов в порядке убывания
+трудоемкости (количества матчей при предыдущем запуске), освободившийся процесс берет следующий
+сезон из общей очереди пула. Сезоны без оценки (новые) передаются первыми.
+
+Завершенные сезоны записываются в контрольную точку, по которой прерванная загрузка
+продолжается с того места, где она остановилась.
+"""
+import datetime  # noqa: ICN001
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Final, NamedTuple
+
+if TYPE_CHECKING:
+    from app.betexplorer.schemas import ChampionshipBetexplorer, MatchBetexplorer
+
+COSTS_FILE: Final[str] = 'championship_costs.json'
+"""Файл с трудоемкостью сезонов чемпионатов (в каталоге сохраненных страниц)."""
+CHECKPOINT_FILE: Final[str] = 'crawl_checkpoint.jsonl'
+"""Файл контрольной точки загрузки (в каталоге сохраненных страниц)."""
+SERVICE_FILES: Final[frozenset[str]] = frozenset({CHECKPOINT_FILE, COSTS_FILE, f'{COSTS_FILE}.tmp'})
+"""Файлы загрузки в каталоге сохраненных страниц, которые хранилище не должно считать страницами."""
+
+
+class SeasonDone(NamedTuple):
+    """Итог обработки сезона чемпионата."""
+
+    matches: int
+    """Количество матчей (трудоемкость для следующего запуска)."""
+    content_hash: str
+    """Хэш результатов сезона (ссылки, даты и счет матчей)."""
+    incremental: bool = False
+    """Разобраны только матчи новее сохраненных в базе (количество и хэш относятся только к ним)."""
+
+
+def season_done(matches: list[MatchBetexplorer], incremental: bool = False) -> SeasonDone:  # noqa: FBT001, FBT002
+    """Итог обработки сезона по его матчам.
+
+    :param matches: Матчи сезона
+    :param incremental: Матчи - только новые результаты сезона, а не весь сезон
+    """
+    content = hashlib.sha256()
+    for match in matches:
+        content.update(
+            f'{match["match_url"]}|{match["game_date"]}|{match["home_score"]}|{match["away_score"]}\n'.encode())
+    return SeasonDone(len(matches), content.hexdigest(), incremental)
+
+
+class WorkCosts:
+    """Трудоемкость сезонов чемпионатов, сохраняемая между запусками."""
+
+    __slots__ = ('costs', 'path')
+
+    def __init__(self, path: str | None = None) -> None:
+        """Прочитать трудоемкость, сохраненную при предыдущем запуске.
+
+        :param path: Путь к файлу с трудоемкостью (None - не сохраняется)
+        """
+        self.path: str | None = path
+        self.costs: dict[str, int] = {}
+        if path is not None and Path(path).is_file():
+            try:
+                with Path(path).open(encoding='utf-8') as f:
+                    self.costs = {url: int(cost) for url, cost in json.load(f).items()}
+            except (OSError, ValueError, AttributeError) as e:
+                print(f'Не прочитана трудоемкость чемпионатов {path}: {e}', flush=True)  # noqa: T201
+
+    def cost(self, championship: ChampionshipBetexplorer) -> int | None:
+        """Трудоемкость сезона чемпионата при предыдущем запуске (None - неизвестна).
+
+        :param championship: Информация о чемпионате
+        """
+        return self.costs.get(championship['championship_url'])
+
+    def priority(self, championship: ChampionshipBetexplorer) -> float:
+        """Ключ сортировки сезонов для передачи рабочим процессам.
+
+        Сначала сезоны с неизвестной трудоемкостью, затем по ее убыванию.
+
+        :param championship: Информация о чемпионате
+        """
+        return -cost if (cost := self.cost(championship)) is not None else float('-inf')
+
+    def update(self, costs: dict[str, int]) -> None:
+        """Запомнить трудоемкость обработанных сезонов.
+
+        :param costs: Количество матчей по ссылке на чемпионат
+        """
+        self.costs.update(costs)
+
+    def complete(self, seasons: dict[str, SeasonDone]) -> None:
+        """Запомнить трудоемкость завершенных сезонов.
+
+        При инкрементальной загрузке разбираются только новые матчи, их количество не отражает
+        трудоемкость сезона, поэтому оценка с предыдущего запуска остается прежней.
+
+        :param seasons: Итог обработки по ссылке на чемпионат
+        """
+        self.update({url: season.matches for url, season in seasons.items() if not season.incremental})
+
+    def save(self) -> None:
+        """Сохранить трудоемкость для следующего запуска."""
+        if self.path is None:
+            return
+        tmp_path: Path = Path(f'{self.path}.tmp')
+        with tmp_path.open('w', encoding='utf-8') as f:
+            json.dump(self.costs, f, ensure_ascii=False, sort_keys=True)
+        tmp_path.replace(self.path)
+
+
+class Checkpoint:
+    """Контрольная точка загрузки: завершенные сезоны чемпионатов.
+
+    Каждый завершенный сезон дописывается в файл отдельной строкой JSON и сразу сбрасывается на диск,
+    поэтому при аварийном завершении теряются только сезоны, обработка которых не закончилась.
+    """
+
+    __slots__ = ('done', 'file', 'path')
+
+    def __init__(self, path: str | None = None, resume: bool = False) -> None:  # noqa: FBT001, FBT002
+        """Открыть контрольную точку.
+
+        :param path: Путь к файлу контрольной точки (None - не сохраняется)
+        :param resume: Продолжить незавершенную загрузку (False - начать заново)
+        """
+        self.path: str | None = path
+        self.done: dict[str, dict[str, Any]] = {}
+        self.file: IO[str] | None = None
+        if path is None:
+            return
+        line: str = '\n'
+        if resume and Path(path).is_file():
+            with Path(path).open(encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        unit: dict[str, Any] = json.loads(line)
+                    except ValueError:
+                        continue  # строка, не дописанная при аварийном завершении
+                    if unit.get('finished'):
+                        self.done = {}
+                    else:
+                        self.done[unit['championship_url']] = unit
+        self.file = Path(path).open('a' if self.done else 'w', encoding='utf-8')  # noqa: SIM115
+        if self.done and not line.endswith('\n'):
+            self.file.write('\n')
+
+    def is_done(self, championship: ChampionshipBetexplorer) -> bool:
+        """Сезон чемпионата уже обработан в прерванной загрузке.
+
+        :param championship: Информация о чемпионате
+        """
+        return championship['championship_url'] in self.done
+
+    def complete(self, sport_id: int, championship: ChampionshipBetexplorer, done: SeasonDone) -> None:
+        """Записать завершенный сезон чемпионата.
+
+        :param sport_id: Вид спорта
+        :param championship: Информация о чемпионате
+        :param done: Итог обработки сезона
+        """
+        unit: dict[str, Any] = {
+            'sport_id': sport_id,
+            'country_id': championship['country_id'],
+            'championship_id': championship['championship_id'],
+            'championship_url': championship['championship_url'],
+            'finish_time': datetime.datetime.now().isoformat(timespec='seconds'),  # noqa: DTZ005
+            'matches': done.matches,
+            'content_hash': done.content_hash,
+            'incremental': done.incremental,
+        }
+        self.done[championship['championship_url']] = unit
+        self._write(unit)
+
+    def finish(self) -> None:
+        """Отметить загрузку завершенной (следующая загрузка начнется заново) и закрыть файл."""
+        self._write({'finished': True, 'finish_time': datetime.datetime.now().isoformat(timespec='seconds')})  # noqa: DTZ005
+        self.close()
+
+    def close(self) -> None:
+        """Закрыть файл контрольной точки."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def _write(self, unit: dict[str, Any]) -> None:
+        """Дописать строку в файл и сбросить ее на диск.
+
+        :param unit: Запись контрольной точки
+        """
+        if self.file is not None:
+            self.file.write(json.dumps(unit, ensure_ascii=False) + '\n')
+            self.file.flush()
+            os.fsync(self.file.fileno())
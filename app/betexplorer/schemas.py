@@ -2,8 +2,9 @@
 
 Определяет структуры данных для всех сущностей системы.
 """
+from collections.abc import Iterator, MutableMapping
 import enum
-from typing import TYPE_CHECKING, Final, TypedDict
+from typing import TYPE_CHECKING, Any, ClassVar, Final, NamedTuple, TypedDict
 
 if TYPE_CHECKING:
     import datetime
@@ -279,3 +280,159 @@ class ResultsBetexplorer(TypedDict):
     """Список стадий чемпионата."""
     matches: list[MatchBetexplorer]
     """Список матчей."""
+
+
+class StoredResults(NamedTuple):
+    """Самые поздние результаты стадии чемпионата, уже сохраненные в базе данных."""
+
+    game_date: datetime.date
+    """День самого позднего сохраненного результата."""
+    match_urls: frozenset[str]
+    """Ссылки на матчи этого дня, уже сохраненные в базе."""
+
+
+class Record(MutableMapping):
+    """Компактная запись (поля в __slots__) с доступом к полям как к ключам словаря.
+
+    Заменяет словари TypedDict в результатах разбора страниц: код, работающий со словарями (crud, fbcup),
+    обращается к полям через record['field'], get, items, update. Поля, которым не присвоено значение,
+    равны None, списки создаются при первом обращении.
+    """
+
+    __slots__ = ()
+
+    FIELDS: ClassVar[tuple[str, ...]] = ()
+    """Поля записи (ключи словаря)."""
+    LISTS: ClassVar[frozenset[str]] = frozenset()
+    """Поля со списками, создаваемыми при первом обращении."""
+    _field_set: ClassVar[frozenset[str]] = frozenset()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Запомнить множество полей подкласса для быстрой проверки ключей."""
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.FIELDS)
+
+    def __init__(self, **values: Any) -> None:
+        """Инициализация записи.
+
+        :param values: Значения полей
+        """
+        for name, value in values.items():
+            setattr(self, name, value)
+
+    def __getattr__(self, name: str) -> Any:
+        """Значение поля, которому не присвоено значение."""
+        if name in self.LISTS:
+            value: list = []
+            setattr(self, name, value)
+            return value
+        if name in self._field_set:
+            return None
+        raise AttributeError(f'{type(self).__name__!r} object has no attribute {name!r}')  # noqa: EM102, TRY003
+
+    def __getitem__(self, key: str) -> Any:
+        """Значение поля."""
+        if key not in self._field_set:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        """Присвоить значение полю."""
+        if key not in self._field_set:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        """Сбросить значение поля (поле снова равно None)."""
+        if key not in self._field_set:
+            raise KeyError(key)
+        if self._is_set(key):
+            delattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        """Все поля записи, в том числе без значения."""
+        return iter(self.FIELDS)
+
+    def __len__(self) -> int:
+        """Количество полей записи."""
+        return len(self.FIELDS)
+
+    def __contains__(self, key: object) -> bool:
+        """Поле есть в записи."""
+        return key in self._field_set
+
+    def __repr__(self) -> str:
+        """Представление записи с присвоенными значениями."""
+        return f'{type(self).__name__}({self.as_dict()!r})'
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Присвоенные значения для передачи записи в другой процесс."""
+        return {name: object.__getattribute__(self, name) for name in self.FIELDS if self._is_set(name)}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Восстановить запись, переданную из другого процесса."""
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def _is_set(self, name: str) -> bool:
+        """Полю присвоено значение."""
+        try:
+            object.__getattribute__(self, name)
+        except AttributeError:
+            return False
+        return True
+
+    def copy(self) -> Record:
+        """Поверхностная копия записи."""
+        record: Record = type(self).__new__(type(self))
+        record.__setstate__(self.__getstate__())
+        return record
+
+    def as_dict(self) -> dict[str, Any]:
+        """Запись в виде словаря (вложенные записи тоже переводятся в словари)."""
+        return {name: as_plain(getattr(self, name)) for name in self.FIELDS}
+
+
+def as_plain(value: Any) -> Any:
+    """Перевод записей (в том числе вложенных в списки) в словари.
+
+    :param value: Значение поля
+    """
+    if isinstance(value, Record):
+        return value.as_dict()
+    if isinstance(value, list):
+        return [as_plain(item) for item in value]
+    return value
+
+
+class TeamRecord(Record):
+    """Компактная запись команды (TeamBetexplorer)."""
+
+    FIELDS = ('team_id', 'sport_id', 'team_name', 'team_full', 'team_url', 'team_country', 'country_id',
+              'team_emblem', 'download_date', 'save_date')
+    __slots__ = FIELDS
+
+
+class ScoreHalvesRecord(Record):
+    """Компактная запись счета тайма (ScoreHalvesBetexplorer)."""
+
+    FIELDS = ('time_id', 'half_number', 'home_score', 'away_score')
+    __slots__ = FIELDS
+
+
+class ShooterRecord(Record):
+    """Компактная запись гола (ShooterBetexplorer)."""
+
+    FIELDS = ('shooter_id', 'home_away', 'event_order', 'event_time', 'overtime', 'player_name', 'penalty_kick')
+    __slots__ = FIELDS
+
+
+class MatchRecord(Record):
+    """Компактная запись матча (MatchBetexplorer)."""
+
+    FIELDS = ('match_id', 'championship_id', 'match_url', 'home_team', 'home_team_emblem', 'away_team',
+              'away_team_emblem', 'home_score', 'away_score', 'odds_1', 'odds_x', 'odds_2', 'game_date',
+              'score_stage', 'score_stage_short', 'score_halves', 'shooters', 'match_event', 'stage_name',
+              'round_name', 'round_number', 'is_fixture', 'download_date', 'save_date')
+    LISTS = frozenset({'score_halves', 'shooters', 'match_event'})
+    __slots__ = FIELDS
@@ -0,0 +1,158 @@
+"""Справочник команд, общий для всех рабочих процессов загрузки.
+
+Одна и та же команда встречается в чемпионате страны, кубках и международных турнирах, которые
+обрабатываются разными процессами. Справочник заполняется командами из базы данных при запуске
+загрузки и пополняется загруженными командами, поэтому страница каждой команды загружается
+и сохраняется в базе не более одного раза за срок ее свежести.
+"""
+import asyncio
+from contextlib import AbstractContextManager, nullcontext
+import time
+from typing import TYPE_CHECKING, Any, Final
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, MutableMapping
+
+    from app.betexplorer.schemas import TeamBetexplorer
+    from app.utilbase import Freshness
+
+TEAM_WAIT: Final[float] = 0.1
+"""Пауза между проверками команды, которую загружает другой процесс (секунды)."""
+TEAM_CLAIM_TIMEOUT: Final[float] = 120.0
+"""Время, после которого незавершенная загрузка команды другим процессом считается прерванной (секунды)."""
+
+
+class TeamRegistry:
+    """Справочник команд по ссылке на страницу команды.
+
+    Общая часть хранится в словаре, разделяемом между процессами (multiprocessing.Manager), пока команда
+    загружается в нем хранится время начала загрузки. Найденные команды запоминаются и в словаре
+    процесса, чтобы не обращаться к общему словарю повторно.
+    """
+
+    __slots__ = ['_local', '_lock', '_shared']
+
+    def __init__(self,
+                 shared: MutableMapping | None = None,
+                 lock: AbstractContextManager | None = None) -> None:
+        """Создать справочник до запуска рабочих процессов.
+
+        :param shared: Словарь, общий для процессов (None - справочник только текущего процесса)
+        :param lock: Блокировка общего словаря
+        """
+        self._shared: MutableMapping = shared if shared is not None else {}
+        self._lock: AbstractContextManager = lock if lock is not None else nullcontext()
+        self._local: dict[str, TeamBetexplorer] = {}
+
+    def __getstate__(self) -> tuple[MutableMapping, AbstractContextManager]:
+        """Передать рабочему процессу только общий словарь и блокировку."""
+        return self._shared, self._lock
+
+    def __setstate__(self, state: tuple[MutableMapping, AbstractContextManager]) -> None:
+        """Восстановить справочник в рабочем процессе.
+
+        :param state: Общий словарь и блокировка
+        """
+        self._shared, self._lock = state
+        self._local = {}
+
+    def preload(self, teams: list[TeamBetexplorer]) -> None:
+        """Заполнить справочник командами, уже сохраненными в базе данных.
+
+        :param teams: Команды из базы данных
+        """
+        self._shared.update({team['team_url']: team for team in teams if team['team_url'] is not None})
+
+    @staticmethod
+    def is_stale(team: TeamBetexplorer, freshness: Freshness | None) -> bool:
+        """Страницу команды нужно загрузить заново.
+
+        :param team: Команда из справочника
+        :param freshness: Требования к свежести страницы команды (None - не обновляется)
+        """
+        return freshness is not None and team['download_date'] is not None and freshness.is_stale(
+            team['download_date'])
+
+    @staticmethod
+    def is_claimable(value: Any, freshness: Freshness | None) -> bool:
+        """Загрузку команды можно занять: команды нет, она устарела или ее загрузка прервана.
+
+        :param value: Значение из общего словаря (команда или время начала загрузки)
+        :param freshness: Требования к свежести страницы команды
+        """
+        return (value is None
+                or (isinstance(value, float) and value + TEAM_CLAIM_TIMEOUT < time.time())
+                or (isinstance(value, dict) and TeamRegistry.is_stale(value, freshness)))
+
+    async def acquire(self, url: str, freshness: Freshness | None = None) -> TeamBetexplorer | None:
+        """Найти команду в справочнике, дождавшись ее загрузки другим процессом.
+
+        Если команды нет или она устарела, загрузку занимает вызывающий, он должен завершить ее вызовом release.
+
+        :param url: Ссылка на страницу команды
+        :param freshness: Требования к свежести страницы команды
+        :return: Команда или None, если ее нужно загрузить
+        """
+        while (team := self._local.get(url)) is None:
+            value: Any = await self._call(self._claim, url, freshness)
+            if value is None:
+                return None
+            if isinstance(value, dict):
+                self._local[url] = value
+                return value
+            await asyncio.sleep(TEAM_WAIT)
+        return team
+
+    async def release(self, url: str, team: TeamBetexplorer | None) -> None:
+        """Завершить загрузку команды.
+
+        :param url: Ссылка на страницу команды
+        :param team: Загруженная команда (None - загрузка не удалась, ее может повторить другой процесс)
+        """
+        await self._call(self._release, url, team)
+        if team is not None:
+            self._local[url] = team
+
+    async def _call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Выполнить обращение к общему словарю.
+
+        Обращение к словарю multiprocessing.Manager - блокирующий обмен с процессом менеджера,
+        поэтому оно выполняется в пуле потоков, чтобы не останавливать цикл событий.
+
+        :param func: Функция обращения к общему словарю
+        :param args: Аргументы функции
+        """
+        if isinstance(self._shared, dict):
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    def _claim(self, url: str, freshness: Freshness | None) -> Any:
+        """Занять загрузку команды, если ее можно занять (блокирующий вызов).
+
+        Пока команду загружает другой процесс, значение читается без блокировки, за одно обращение к словарю.
+
+        :param url: Ссылка на страницу команды
+        :param freshness: Требования к свежести страницы команды
+        :return: None, если загрузка занята, иначе значение из общего словаря
+        """
+        value: Any = self._shared.get(url)
+        if not self.is_claimable(value, freshness):
+            return value
+        with self._lock:
+            value = self._shared.get(url)
+            if self.is_claimable(value, freshness):
+                self._shared[url] = time.time()
+                return None
+        return value
+
+    def _release(self, url: str, team: TeamBetexplorer | None) -> None:
+        """Записать итог загрузки команды в общий словарь (блокирующий вызов).
+
+        :param url: Ссылка на страницу команды
+        :param team: Загруженная команда (None - удалить отметку о начале загрузки)
+        """
+        with self._lock:
+            if team is not None:
+                self._shared[url] = team
+            elif isinstance(self._shared.get(url), float):
+                del self._shared[url]
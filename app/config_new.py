@@ -6,7 +6,11 @@ from typing import ClassVar
 from sqlalchemy import StaticPool
 
 from app.betexplorer.crud import DATABASE_NOT_USE, DATABASE_WRITE_DATA, DatabaseUsage
+from app.betexplorer.freshness import PageKind, PageTTL
+from app.betexplorer.pipeline import PipelineConfig  # noqa: TC001 - нужен для включения PIPELINE
 from app.betexplorer.schemas import SportType
+from app.pagestore import StoreConfig
+from app.ratelimit import DEFAULT_HOST, HostLimit, RetryPolicy
 
 
 class Settings:
@@ -61,15 +65,60 @@ class Settings:
     LOAD_DETAIL_COEFFICIENTS: bool = False
     """Загружать подробную информацию о коэффициентах (тотал, фора)."""
 
+    LOAD_INCREMENTAL: bool = True
+    """Разбирать и загружать подробно только результаты новее уже сохраненных в базе данных.
+
+    Таблица результатов разбирается до первого матча, сыгранного раньше самого позднего сохраненного дня.
+    Для полной перезагрузки результатов (например, после исправления старых матчей на сайте) - False.
+    """
+
+    LOAD_RESUME: bool = False
+    """Продолжить прерванную загрузку: пропустить сезоны чемпионатов, завершенные в ней.
+
+    Завершенные сезоны записываются в crawl_checkpoint.jsonl в DOWNLOAD_DIRECTORY. После полностью
+    завершенной загрузки следующая начинается заново.
+    """
+
     # SAVE_DATABASE: DatabaseUsage = DATABASE_NOT_USE
     SAVE_DATABASE: DatabaseUsage = DATABASE_WRITE_DATA
     """Не использовать базу данных, читать, записывать данные в базу данных."""
 
+    PAGE_STORE: StoreConfig = StoreConfig(database=None, compression=None, level=None, manifest=False, parsed=None,
+                                          sync_read_limit=64 * 1024)
+    """Хранилище скачанных страниц: путь к базе SQLite (None - отдельные файлы в DOWNLOAD_DIRECTORY),
+    сжатие страниц (None, 'gzip', 'zstd'), степень сжатия, список файлов в памяти (manifest, только для
+    отдельных файлов: наличие и дата страницы берутся из списка без обращения к диску) и путь к базе SQLite
+    с результатами разбора страниц (parsed: при повторной обработке неизменившиеся страницы не разбираются).
+    Файлы не больше sync_read_limit байт читаются сразу, без пула потоков aiofiles (0 - всегда через aiofiles).
+
+    Сжатие включается для новых страниц, сохраненные ранее несжатые страницы читаются как обычно.
+    Перенос сохраненных файлов в базу: python -m app.pagestore <DOWNLOAD_DIRECTORY> <database> [gzip|zstd]
+    """
+
+    PARSER_BACKEND: str = 'modest'
+    """Разборщик HTML selectolax: 'modest' (HTMLParser) или 'lexbor' (LexborHTMLParser).
+
+    Сравнение скорости разборщиков на сохраненных страницах: python -m app.betexplorer.benchmark <каталоги>
+    """
+
     CREATE_TABLES: int = 1
     """Создать таблицы перед работой."""
 
     START_UPDATING: datetime.datetime = datetime.datetime(2129, 1, 1)
-    """Обновлять данные после этой даты."""
+    """Обновлять данные после этой даты (только выгрузка fbcup: app.tofbc, app.analysis).
+
+    Загрузка BetExplorer (app.main) обновляет страницы по правилам FRESHNESS_TTL.
+    """
+
+    FRESHNESS_TTL: ClassVar[dict[PageKind, PageTTL]] = {
+        PageKind.RESULTS: (datetime.timedelta(hours=12), None),
+        PageKind.FIXTURES: (datetime.timedelta(hours=12), None),
+        PageKind.MATCH: (datetime.timedelta(days=1), None),
+    }
+    """Допустимый возраст сохраненных страниц для текущих и завершенных чемпионатов (None - не обновлять).
+
+    Не указанные виды страниц берутся из app.betexplorer.freshness.DEFAULT_TTL.
+    """
     # EXCLUDE_COUNTRIES: tuple = ('World', 'Africa', 'Asia', 'Europe', 'Australia & Oceania',
     #                             'North & Central America', 'South America')
     EXCLUDE_COUNTRIES: tuple = ()
@@ -78,5 +127,42 @@ class Settings:
     PROCESSES: int = 7
     """Одновременное количество запущенных процессов."""
 
+    PIPELINE: PipelineConfig | None = None
+    # PIPELINE: PipelineConfig | None = PipelineConfig(fetchers=4, parsers=6, batch=8, pages_queue=16,
+    #                                                     results_queue=16)
+    """Загрузка сезонов конвейером (None - каждый сезон целиком в одном из PROCESSES процессов).
+
+    Основной процесс загружает страницы результатов (fetchers сезонов одновременно), parsers процессов
+    их разбирают, записью в базу данных пакетами по batch сезонов занимается основной процесс. Между
+    стадиями очереди не больше pages_queue и results_queue сезонов, их заполнение выводится после загрузки.
+    Не используется при LOAD_DETAIL.
+    """
+
+    CONFIG_HTTP: ClassVar[dict] = {
+        'limit': 10,  # Всего соединений в одном процессе
+        'limit_per_host': 4,  # Соединений с одним сайтом
+        'ttl_dns_cache': 300,  # Время хранения DNS-ответов, секунд
+        'keepalive_timeout': 30,  # Время жизни простаивающего соединения, секунд
+        'force_close': False,  # False - повторно использовать соединения (keep-alive)
+    }
+    """Конфигурация пула соединений с сайтом (aiohttp.TCPConnector)."""
+
+    CONCURRENCY: int = 4
+    """Количество страниц (стадий чемпионата и т.п.), загружаемых одновременно в одном процессе."""
+
+    RATE_LIMITS: ClassVar[dict[str, HostLimit]] = {
+        'www.betexplorer.com': HostLimit(rate=4.0, burst=4, in_flight=4, failures=5, cooldown=60.0),
+        DEFAULT_HOST: HostLimit(rate=2.0, burst=2, in_flight=2),
+    }
+    """Ограничения частоты запросов по сайтам (запросов в секунду, запросов подряд, одновременных запросов,
+    ошибок подряд до приостановки обращений, длительность приостановки в секундах).
+
+    Действуют на все процессы вместе, поэтому рост PROCESSES не увеличивает нагрузку на сайт.
+    """
+
+    RETRY_POLICY: RetryPolicy = RetryPolicy(attempts=4, base_delay=60.0, max_delay=600.0)
+    """Повтор запросов при ответах 429/5xx, обрывах соединения и таймаутах (пауза растет в 2 раза, со случайной
+    добавкой; заголовок Retry-After учитывается)."""
+
 
 settings = Settings()
@@ -6,6 +6,7 @@ import time
 import timeit
 
 from app.betexplorer.betexplorer import load_data
+from app.betexplorer.freshness import FreshnessPolicy
 from app.config import settings
 
 
@@ -28,9 +29,18 @@ async def load() -> None:
         save_database=settings.SAVE_DATABASE,
         create_tables=settings.CREATE_TABLES,
         config_engine=settings.CONFIG_DATABASE,
-        start_updating=settings.START_UPDATING,
+        freshness=FreshnessPolicy(settings.FRESHNESS_TTL),
         exclude_countries=settings.EXCLUDE_COUNTRIES,
         processes=settings.PROCESSES,
+        rate_limits=settings.RATE_LIMITS,
+        config_http=settings.CONFIG_HTTP,
+        concurrency=settings.CONCURRENCY,
+        retry_policy=settings.RETRY_POLICY,
+        page_store=settings.PAGE_STORE,
+        parser_backend=settings.PARSER_BACKEND,
+        incremental=settings.LOAD_INCREMENTAL,
+        resume=settings.LOAD_RESUME,
+        pipeline=settings.PIPELINE,
     )
     elapsed_time = timeit.default_timer() - st
     elapsed_time_p = time.process_time() - st_p
@@ -0,0 +1,765 @@
+"""Хранилища сохраненных страниц сайта.
+
+Страница определяется ключом - относительным путем вида 'football/england/premier-league/results.http'.
+FilePageStore хранит каждую страницу отдельным файлом (дата загрузки - время модификации файла),
+SQLitePageStore хранит все страницы в одном файле базы SQLite.
+
+Страницы (текст) могут сохраняться сжатыми (gzip или zstd). Способ сжатия определяется при чтении
+по первым байтам данных, поэтому несжатые страницы, сохраненные ранее, читаются как обычно.
+"""
+import abc
+import asyncio
+import datetime  # noqa: ICN001
+import gzip
+import os
+from pathlib import Path
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from typing import IO, TYPE_CHECKING, Any, Final, NamedTuple
+
+import aiofiles
+from aiofiles import os as aiofiles_os
+
+try:
+    from compression import zstd
+except ImportError:
+    zstd = None
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from aiofiles.threadpool.binary import AsyncBufferedReader
+    from aiofiles.threadpool.text import AsyncTextIOWrapper
+
+ETAG_SUFFIX: Final[str] = '.etag'
+"""Расширение файла с версией страницы на сервере (заголовок ETag)."""
+
+MANIFEST_NAME: Final[str] = '.manifest'
+"""Имя файла со списком сохраненных файлов (в корне каталога страниц)."""
+
+MANIFEST_JOURNAL_NAME: Final[str] = '.manifest.journal'
+"""Имя файла с изменениями списка сохраненных файлов после его последней записи."""
+
+MANIFEST_REFRESH: Final[float] = 10.0
+"""Интервал применения журнала изменений, дописанного другими процессами (секунды)."""
+
+PAGE_SUFFIX: Final[str] = '.http'
+"""Расширение сохраненной страницы (текст), остальные файлы (эмблемы и т.п.) хранятся как есть."""
+
+SYNC_READ_LIMIT: Final[int] = 64 * 1024
+"""Файлы не больше этого размера читаются сразу, без передачи чтения в пул потоков aiofiles."""
+
+KEYS_BATCH: Final[int] = 1000
+"""Количество ключей страниц, читаемых из базы SQLite одним запросом."""
+
+COMPRESSION_GZIP: Final[str] = 'gzip'
+COMPRESSION_ZSTD: Final[str] = 'zstd'
+
+GZIP_MAGIC: Final[bytes] = b'\x1f\x8b'
+ZSTD_MAGIC: Final[bytes] = b'\x28\xb5\x2f\xfd'
+
+
+class StoreConfig(NamedTuple):
+    """Настройки хранилища страниц."""
+
+    database: str | None = None
+    """Путь к базе SQLite (None - хранить страницы отдельными файлами)."""
+    compression: str | None = None
+    """Сжатие сохраняемых страниц: None - без сжатия, 'gzip', 'zstd'."""
+    level: int | None = None
+    """Степень сжатия (None - по умолчанию для выбранного способа)."""
+    manifest: bool = False
+    """Хранить в памяти список сохраненных файлов (размер, время), вместо обращения к диску по каждой странице."""
+    parsed: str | None = None
+    """Путь к базе SQLite с результатами разбора страниц (None - не сохранять результаты разбора)."""
+    sync_read_limit: int = SYNC_READ_LIMIT
+    """Файлы не больше этого размера читаются без пула потоков (0 - все файлы читаются через aiofiles)."""
+
+
+def compress(data: bytes, compression: str, level: int | None = None) -> bytes:
+    """Сжатие данных.
+
+    :param data: Данные
+    :param compression: Способ сжатия ('gzip', 'zstd')
+    :param level: Степень сжатия
+    """
+    if compression == COMPRESSION_GZIP:
+        return gzip.compress(data, compresslevel=9 if level is None else level, mtime=0)
+    if compression == COMPRESSION_ZSTD and zstd is not None:
+        return zstd.compress(data, level=level)
+    raise ValueError(f'Неподдерживаемый способ сжатия: {compression}')  # noqa: EM102, TRY003
+
+
+def decompress(data: bytes) -> bytes:
+    """Распаковка данных, способ сжатия определяется по первым байтам (несжатые данные возвращаются как есть).
+
+    :param data: Сохраненные данные
+    """
+    if data[:2] == GZIP_MAGIC:
+        return gzip.decompress(data)
+    if data[:4] == ZSTD_MAGIC:
+        if zstd is None:
+            raise ValueError('Для чтения страниц, сжатых zstd, нужен модуль compression.zstd (Python 3.14)')  # noqa: EM101, TRY003
+        return zstd.decompress(data)
+    return data
+
+
+def decode_text(data: bytes) -> str:
+    """Перевод сохраненной страницы в текст (переводы строк, как при чтении файла в текстовом режиме).
+
+    :param data: Содержимое страницы
+    """
+    text: str = data.decode('utf-8')
+    return text.replace('\r\n', '\n').replace('\r', '\n') if '\r' in text else text
+
+
+def is_service_file(key: str, service_files: frozenset[str] = frozenset()) -> bool:
+    """Файл не страница, а служебный файл (ETag, список файлов или файл, заданный вызывающим).
+
+    :param key: Путь к файлу относительно каталога страниц
+    :param service_files: Другие служебные файлы в каталоге страниц (пути относительно каталога)
+    """
+    name: str = key.rsplit('/', 1)[-1]
+    return name.endswith(ETAG_SUFFIX) or name.startswith(MANIFEST_NAME) or key in service_files
+
+
+class PageStore(abc.ABC):
+    """Хранилище сохраненных страниц (базовый класс)."""
+
+    def __init__(self, compression: str | None = None, level: int | None = None) -> None:
+        """Инициализация хранилища.
+
+        :param compression: Сжатие сохраняемых страниц: None - без сжатия, 'gzip', 'zstd'
+        :param level: Степень сжатия
+        """
+        if compression not in {None, COMPRESSION_GZIP, COMPRESSION_ZSTD}:
+            raise ValueError(f'Неподдерживаемый способ сжатия: {compression}')  # noqa: EM102, TRY003
+        if compression == COMPRESSION_ZSTD and zstd is None:
+            raise ValueError('Для сжатия zstd нужен модуль compression.zstd (Python 3.14)')  # noqa: EM101, TRY003
+        self.compression = compression
+        self.level = level
+
+    @abc.abstractmethod
+    async def creation_date(self, key: str) -> datetime.datetime | None:
+        """Дата загрузки страницы.
+
+        :param key: Ключ страницы
+        :return: Дата загрузки или None, если страница не сохранена
+        """
+
+    @abc.abstractmethod
+    async def read_raw(self, key: str) -> bytes:
+        """Чтение сохраненных данных страницы как есть (возможно, сжатых).
+
+        :param key: Ключ страницы
+        """
+
+    @abc.abstractmethod
+    async def write_raw(self, key: str, data: str | bytes, creation_date: datetime.datetime) -> None:
+        """Запись данных страницы как есть.
+
+        :param key: Ключ страницы
+        :param data: Содержимое страницы
+        :param creation_date: Дата загрузки страницы
+        """
+
+    async def read_bytes(self, key: str) -> bytes:
+        """Чтение страницы как набора байт.
+
+        :param key: Ключ страницы
+        """
+        return decompress(await self.read_raw(key))
+
+    async def read_text(self, key: str) -> str:
+        """Чтение страницы как текста.
+
+        :param key: Ключ страницы
+        """
+        return decode_text(await self.read_bytes(key))
+
+    async def read_html(self, key: str) -> str | bytes:
+        """Чтение страницы для разбора HTMLParser (по возможности без перевода в текст).
+
+        :param key: Ключ страницы
+        """
+        data: bytes = await self.read_bytes(key)
+        return decode_text(data) if b'\r' in data else data
+
+    async def write(self, key: str, data: str | bytes, creation_date: datetime.datetime) -> None:
+        """Запись страницы (страницы сайта и текст сжимаются, если задано сжатие, остальные файлы - нет).
+
+        :param key: Ключ страницы
+        :param data: Содержимое страницы (текст или набор байт)
+        :param creation_date: Дата загрузки страницы
+        """
+        if self.compression is not None and (isinstance(data, str) or key.endswith(PAGE_SUFFIX)):
+            data = compress(data.encode('utf-8') if isinstance(data, str) else data, self.compression, self.level)
+        await self.write_raw(key, data, creation_date)
+
+    @abc.abstractmethod
+    async def touch(self, key: str, creation_date: datetime.datetime) -> None:
+        """Изменить дату загрузки страницы (страница на сервере не изменилась).
+
+        :param key: Ключ страницы
+        :param creation_date: Дата проверки
+        """
+
+    @abc.abstractmethod
+    async def get_etag(self, key: str) -> str | None:
+        """Версия страницы на сервере.
+
+        :param key: Ключ страницы
+        """
+
+    @abc.abstractmethod
+    async def set_etag(self, key: str, etag: str | None) -> None:
+        """Запомнить версию страницы на сервере.
+
+        :param key: Ключ страницы
+        :param etag: Версия страницы (None - удалить)
+        """
+
+    @abc.abstractmethod
+    def keys(self) -> Iterator[str]:
+        """Ключи всех сохраненных страниц (без служебных файлов)."""
+
+    def prepare(self) -> None:  # noqa: B027
+        """Подготовка хранилища перед запуском рабочих процессов."""
+
+    def close(self) -> None:  # noqa: B027
+        """Закрыть хранилище."""
+
+
+class FileManifest:
+    """Список сохраненных файлов (ключ - размер, время модификации), загружаемый в память один раз.
+
+    Список строится обходом каталога и сохраняется в файл MANIFEST_NAME. Изменения, сделанные процессом,
+    сразу дописываются строкой в MANIFEST_JOURNAL_NAME. Журнал применяется при загрузке списка, а затем
+    не чаще раза в MANIFEST_REFRESH секунд, поэтому процессы видят файлы, записанные и обновленные
+    другими процессами, а поиск файла в списке не обращается к диску. Для перестроения списка
+    (файлы изменены вне программы) достаточно удалить MANIFEST_NAME.
+    """
+
+    __slots__ = ['_entries', '_journal', '_journal_pos', '_refresh_time', 'root_dir', 'service_files']
+
+    def __init__(self, root_dir: str, service_files: frozenset[str] = frozenset()) -> None:
+        """Инициализация списка.
+
+        :param root_dir: Каталог сохраненных страниц
+        :param service_files: Служебные файлы в каталоге страниц, не включаемые в список
+        """
+        self.root_dir = root_dir
+        self.service_files = service_files
+        self._entries: dict[str, tuple[int, float]] | None = None
+        self._journal: IO[str] | None = None
+        self._journal_pos: int = 0
+        self._refresh_time: float = 0.0
+
+    @property
+    def entries(self) -> dict[str, tuple[int, float]]:
+        """Сохраненные файлы (загружаются при первом обращении)."""
+        if self._entries is None:
+            self.load()
+        return self._entries
+
+    def build(self) -> dict[str, tuple[int, float]]:
+        """Построение списка обходом каталога."""
+        entries: dict[str, tuple[int, float]] = {}
+        stack: list[tuple[str, str]] = [(self.root_dir, '')]
+        while stack:
+            dir_path, prefix = stack.pop()
+            try:
+                with os.scandir(dir_path) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append((entry.path, prefix + entry.name + '/'))
+                        elif not is_service_file(prefix + entry.name, self.service_files):
+                            stat: os.stat_result = entry.stat()
+                            entries[prefix + entry.name] = (stat.st_size, stat.st_mtime)
+            except FileNotFoundError:
+                pass
+        return entries
+
+    def load(self) -> None:
+        """Загрузка списка из файла (с изменениями из журнала) или построение обходом каталога."""
+        try:
+            with Path(self.root_dir, MANIFEST_NAME).open('rb') as f:
+                self._entries = pickle.load(f)  # noqa: S301
+        except FileNotFoundError:
+            self._entries = self.build()
+            self.save()
+            return
+        self._journal_pos = 0
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Применить строки журнала, дописанные после его предыдущего чтения (в том числе другими процессами)."""
+        self._refresh_time = time.monotonic()
+        journal_path: Path = Path(self.root_dir, MANIFEST_JOURNAL_NAME)
+        try:
+            size: int = journal_path.stat().st_size
+        except FileNotFoundError:
+            self._journal_pos = 0
+            return
+        if size == self._journal_pos:
+            return
+        if size < self._journal_pos:  # журнал очищен при записи списка
+            self._journal_pos = 0
+        with journal_path.open('rb') as f:
+            f.seek(self._journal_pos)
+            data: bytes = f.read(size - self._journal_pos)
+        end: int = data.rfind(b'\n') + 1  # недописанная строка читается в следующий раз
+        for line in data[:end].decode('utf-8').splitlines():
+            fields: list[str] = line.split('\t')
+            if len(fields) == 3:  # noqa: PLR2004
+                self._entries[fields[0]] = (int(fields[1]), float(fields[2]))
+            elif len(fields) == 1:  # файл удален
+                self._entries.pop(fields[0], None)
+        self._journal_pos += end
+
+    def save(self) -> None:
+        """Запись списка в файл, журнал изменений очищается."""
+        Path(self.root_dir).mkdir(parents=True, exist_ok=True)
+        tmp_path: Path = Path(self.root_dir, f'{MANIFEST_NAME}.tmp')
+        with tmp_path.open('wb') as f:
+            pickle.dump(self.entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(Path(self.root_dir, MANIFEST_NAME))
+        self.close()
+        Path(self.root_dir, MANIFEST_JOURNAL_NAME).unlink(missing_ok=True)
+        self._journal_pos = 0
+
+    def get(self, key: str) -> tuple[int, float] | None:
+        """Размер и время модификации файла.
+
+        :param key: Ключ страницы
+        :return: None, если файл не сохранен
+        """
+        entries: dict[str, tuple[int, float]] = self.entries
+        if time.monotonic() - self._refresh_time >= MANIFEST_REFRESH:
+            self.refresh()
+        return entries.get(key)
+
+    def record(self, key: str, stat: os.stat_result | None) -> None:
+        """Запомнить записанный, измененный или удаленный файл и сразу дописать изменение в журнал.
+
+        Строка дописывается одной записью, чтобы не перемешаться с записями других процессов.
+
+        :param key: Ключ страницы
+        :param stat: Данные файла (None - файл удален)
+        """
+        line: str
+        if stat is not None:
+            self.entries[key] = (stat.st_size, stat.st_mtime)
+            line = f'{key}\t{stat.st_size}\t{stat.st_mtime!r}\n'
+        else:
+            self.entries.pop(key, None)
+            line = f'{key}\n'
+        if self._journal is None:
+            self._journal = Path(self.root_dir, MANIFEST_JOURNAL_NAME).open('a', encoding='utf-8')  # noqa: SIM115
+        self._journal.write(line)
+        self._journal.flush()
+
+    def close(self) -> None:
+        """Закрыть журнал изменений."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+
+class FilePageStore(PageStore):
+    """Страницы хранятся отдельными файлами в каталогах, повторяющих путь страницы на сайте."""
+
+    def __init__(self, root_dir: str, compression: str | None = None, level: int | None = None,  # noqa: PLR0913, PLR0917
+                 manifest: bool = False, sync_read_limit: int = SYNC_READ_LIMIT,  # noqa: FBT001, FBT002
+                 service_files: frozenset[str] = frozenset()) -> None:
+        """Инициализация хранилища.
+
+        :param root_dir: Каталог для сохранения страниц
+        :param compression: Сжатие сохраняемых страниц: None - без сжатия, 'gzip', 'zstd'
+        :param level: Степень сжатия
+        :param manifest: Наличие и время файлов брать из списка в памяти (FileManifest)
+        :param sync_read_limit: Файлы не больше этого размера читаются без пула потоков
+        :param service_files: Служебные файлы вызывающего в каталоге страниц (не страницы)
+        """
+        super().__init__(compression, level)
+        self.root_dir = root_dir
+        self.sync_read_limit = sync_read_limit
+        self.service_files = service_files
+        self.manifest: FileManifest | None = FileManifest(root_dir, service_files) if manifest else None
+
+    def path(self, key: str) -> str:
+        """Путь к файлу страницы.
+
+        :param key: Ключ страницы
+        """
+        return str(Path(self.root_dir, *key.split('/')))
+
+    async def creation_date(self, key: str) -> datetime.datetime | None:
+        """Дата загрузки страницы - время модификации файла.
+
+        :param key: Ключ страницы
+        """
+        if self.manifest is not None:
+            entry: tuple[int, float] | None = self.manifest.get(key)
+            return datetime.datetime.fromtimestamp(entry[1]) if entry is not None else None  # noqa: DTZ006
+        try:
+            return datetime.datetime.fromtimestamp(await aiofiles_os.path.getmtime(self.path(key)))  # noqa: DTZ006
+        except OSError:
+            return None
+
+    async def read_raw(self, key: str) -> bytes:
+        """Чтение файла страницы (удаленный вне программы файл исключается из списка файлов).
+
+        :param key: Ключ страницы
+        """
+        file_path: Path = Path(self.path(key))
+        try:
+            if self.sync_read_limit > 0 and file_path.stat().st_size <= self.sync_read_limit:  # noqa: ASYNC240
+                # Чтение небольшого файла быстрее, чем передача открытия, чтения и закрытия в пул потоков
+                with file_path.open('rb') as sync_file:  # noqa: ASYNC230
+                    return sync_file.read()
+            f: AsyncBufferedReader
+            async with aiofiles.open(file_path, mode='rb') as f:
+                return await f.read()
+        except FileNotFoundError:
+            if self.manifest is not None:  # файл удален вне программы, страница считается не сохраненной
+                self.manifest.record(key, None)
+            raise
+
+    async def write_raw(self, key: str, data: str | bytes, creation_date: datetime.datetime) -> None:
+        """Запись файла страницы с временем модификации, равным дате загрузки.
+
+        :param key: Ключ страницы
+        :param data: Содержимое страницы
+        :param creation_date: Дата загрузки страницы
+        """
+        file_path: Path = Path(self.path(key))
+        await aiofiles_os.makedirs(file_path.parent, exist_ok=True)
+        f: AsyncTextIOWrapper | AsyncBufferedReader
+        if isinstance(data, str):
+            async with aiofiles.open(file_path, mode='w', encoding='utf-8') as f:
+                await f.write(data)
+                await f.flush()
+        else:
+            async with aiofiles.open(file_path, mode='wb') as f:
+                await f.write(data)
+                await f.flush()
+        await self.touch(key, creation_date)
+
+    async def touch(self, key: str, creation_date: datetime.datetime) -> None:
+        """Установить время модификации файла страницы.
+
+        :param key: Ключ страницы
+        :param creation_date: Дата проверки
+        """
+        dt_epoch: float = creation_date.timestamp()
+        os.utime(file_path := self.path(key), (dt_epoch, dt_epoch))
+        if self.manifest is not None:
+            self.manifest.record(key, Path(file_path).stat())  # noqa: ASYNC240
+
+    async def get_etag(self, key: str) -> str | None:
+        """Версия страницы из файла рядом со страницей.
+
+        :param key: Ключ страницы
+        """
+        try:
+            async with aiofiles.open(self.path(key) + ETAG_SUFFIX, encoding='utf-8') as f:
+                return await f.read()
+        except FileNotFoundError:
+            return None
+
+    async def set_etag(self, key: str, etag: str | None) -> None:
+        """Записать (удалить) файл с версией страницы.
+
+        :param key: Ключ страницы
+        :param etag: Версия страницы (None - удалить)
+        """
+        etag_path: str = self.path(key) + ETAG_SUFFIX
+        if etag is not None:
+            async with aiofiles.open(etag_path, mode='w', encoding='utf-8') as f:
+                await f.write(etag)
+        elif await aiofiles_os.path.exists(etag_path):
+            await aiofiles_os.remove(etag_path)
+
+    def keys(self) -> Iterator[str]:
+        """Ключи файлов обходом каталога страниц."""
+        for dir_path, _, file_names in os.walk(self.root_dir):
+            relative: str = os.path.relpath(dir_path, self.root_dir)
+            prefix: str = '' if relative == os.curdir else relative.replace(os.sep, '/') + '/'
+            for file_name in file_names:
+                if not is_service_file(key := prefix + file_name, self.service_files):
+                    yield key
+
+    def prepare(self) -> None:
+        """Загрузка (построение) списка файлов и запись его с изменениями один раз до запуска процессов."""
+        if self.manifest is not None:
+            self.manifest.load()
+            self.manifest.save()
+
+    def close(self) -> None:
+        """Закрыть журнал изменений списка файлов."""
+        if self.manifest is not None:
+            self.manifest.close()
+
+
+class SQLiteDatabase:
+    """Подключение к базе SQLite, общее для потоков.
+
+    Запросы выполняются в пуле потоков (asyncio.to_thread), чтобы ожидание блокировки базы, занятой
+    другим процессом, не останавливало цикл событий. Запросы к одному подключению выполняются по очереди.
+    """
+
+    __slots__ = ['_db', '_lock']
+
+    def __init__(self, database: str, schema: str) -> None:
+        """Открыть (создать) базу.
+
+        :param database: Путь к файлу базы SQLite
+        :param schema: Запрос создания таблицы
+        """
+        Path(database).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection = sqlite3.connect(
+            database, timeout=60.0, isolation_level=None, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(schema)
+
+    def query(self, sql: str, parameters: tuple = ()) -> list[tuple]:
+        """Выполнить запрос в текущем потоке.
+
+        :param sql: Запрос
+        :param parameters: Параметры запроса
+        :return: Строки результата
+        """
+        with self._lock:
+            return self._db.execute(sql, parameters).fetchall()
+
+    async def execute(self, sql: str, parameters: tuple = ()) -> list[tuple]:
+        """Выполнить запрос в пуле потоков.
+
+        :param sql: Запрос
+        :param parameters: Параметры запроса
+        :return: Строки результата
+        """
+        return await asyncio.to_thread(self.query, sql, parameters)
+
+    def close(self) -> None:
+        """Закрыть базу."""
+        with self._lock:
+            self._db.close()
+
+
+class SQLitePageStore(PageStore):
+    """Все страницы хранятся в одной таблице базы SQLite (ключ, дата загрузки, ETag, содержимое).
+
+    Вместо миллионов мелких файлов на диске один файл базы, поиск страницы - по первичному ключу.
+    Базу одновременно могут использовать несколько процессов (журнал WAL).
+    """
+
+    def __init__(self, database: str, compression: str | None = None, level: int | None = None) -> None:
+        """Открыть (создать) хранилище.
+
+        :param database: Путь к файлу базы SQLite
+        :param compression: Сжатие сохраняемых страниц: None - без сжатия, 'gzip', 'zstd'
+        :param level: Степень сжатия
+        """
+        super().__init__(compression, level)
+        self._db = SQLiteDatabase(
+            database,
+            'CREATE TABLE IF NOT EXISTS page ('
+            'key TEXT PRIMARY KEY, creation_date REAL NOT NULL, etag TEXT, data BLOB NOT NULL) WITHOUT ROWID')
+
+    async def creation_date(self, key: str) -> datetime.datetime | None:
+        """Дата загрузки страницы из базы.
+
+        :param key: Ключ страницы
+        """
+        rows: list[tuple] = await self._db.execute('SELECT creation_date FROM page WHERE key = ?', (key,))
+        return datetime.datetime.fromtimestamp(rows[0][0]) if rows else None  # noqa: DTZ006
+
+    async def read_raw(self, key: str) -> bytes:
+        """Чтение данных страницы из базы.
+
+        :param key: Ключ страницы
+        """
+        rows: list[tuple] = await self._db.execute('SELECT data FROM page WHERE key = ?', (key,))
+        if not rows:
+            raise FileNotFoundError(key)
+        return rows[0][0]
+
+    async def write_raw(self, key: str, data: str | bytes, creation_date: datetime.datetime) -> None:
+        """Добавить (заменить) страницу в базе.
+
+        :param key: Ключ страницы
+        :param data: Содержимое страницы
+        :param creation_date: Дата загрузки страницы
+        """
+        await self._db.execute(
+            'INSERT INTO page (key, creation_date, data) VALUES (?, ?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET creation_date = excluded.creation_date, data = excluded.data',
+            (key, creation_date.timestamp(), data.encode('utf-8') if isinstance(data, str) else data))
+
+    async def touch(self, key: str, creation_date: datetime.datetime) -> None:
+        """Изменить дату загрузки страницы в базе.
+
+        :param key: Ключ страницы
+        :param creation_date: Дата проверки
+        """
+        await self._db.execute('UPDATE page SET creation_date = ? WHERE key = ?', (creation_date.timestamp(), key))
+
+    async def get_etag(self, key: str) -> str | None:
+        """Версия страницы из базы.
+
+        :param key: Ключ страницы
+        """
+        rows: list[tuple] = await self._db.execute('SELECT etag FROM page WHERE key = ?', (key,))
+        return rows[0][0] if rows else None
+
+    async def set_etag(self, key: str, etag: str | None) -> None:
+        """Запомнить версию страницы в базе.
+
+        :param key: Ключ страницы
+        :param etag: Версия страницы (None - удалить)
+        """
+        await self._db.execute('UPDATE page SET etag = ? WHERE key = ?', (etag, key))
+
+    def keys(self) -> Iterator[str]:
+        """Ключи страниц из базы, читаемые частями по KEYS_BATCH."""
+        last: str = ''
+        while rows := self._db.query('SELECT key FROM page WHERE key > ? ORDER BY key LIMIT ?', (last, KEYS_BATCH)):
+            for (key,) in rows:
+                yield key
+            last = rows[-1][0]
+
+    def close(self) -> None:
+        """Закрыть базу."""
+        self._db.close()
+
+
+class ParsedCache:
+    """Результаты разбора страниц, сохраненные в базе SQLite.
+
+    Результат действителен, пока не изменилась дата загрузки страницы и версия разбора страниц,
+    поэтому при повторной обработке сохраненных страниц разбор HTML заменяется чтением готового результата.
+    """
+
+    def __init__(self, database: str) -> None:
+        """Открыть (создать) базу результатов разбора.
+
+        :param database: Путь к файлу базы SQLite
+        """
+        self._db = SQLiteDatabase(
+            database,
+            'CREATE TABLE IF NOT EXISTS parsed ('
+            'key TEXT NOT NULL, kind TEXT NOT NULL, creation_date REAL NOT NULL, version INTEGER NOT NULL, '
+            'data BLOB NOT NULL, PRIMARY KEY (key, kind)) WITHOUT ROWID')
+
+    async def get(self, key: str, kind: str, creation_date: datetime.datetime, version: int) -> Any | None:
+        """Сохраненный результат разбора.
+
+        :param key: Ключ страницы
+        :param kind: Вид разбора (функция и ее параметры)
+        :param creation_date: Дата загрузки страницы
+        :param version: Версия разбора страниц
+        :return: None, если результата нет или он устарел
+        """
+        rows: list[tuple] = await self._db.execute(
+            'SELECT data FROM parsed WHERE key = ? AND kind = ? AND creation_date = ? AND version = ?',
+            (key, kind, creation_date.timestamp(), version))
+        return pickle.loads(rows[0][0]) if rows else None  # noqa: S301
+
+    async def put(self, key: str, kind: str, creation_date: datetime.datetime, version: int, value: Any) -> None:
+        """Сохранить результат разбора.
+
+        :param key: Ключ страницы
+        :param kind: Вид разбора (функция и ее параметры)
+        :param creation_date: Дата загрузки страницы
+        :param version: Версия разбора страниц
+        :param value: Результат разбора
+        """
+        await self._db.execute(
+            'INSERT OR REPLACE INTO parsed (key, kind, creation_date, version, data) VALUES (?, ?, ?, ?, ?)',
+            (key, kind, creation_date.timestamp(), version, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)))
+
+    def close(self) -> None:
+        """Закрыть базу."""
+        self._db.close()
+
+
+def open_store(root_dir: str, config: StoreConfig | None = None,
+               service_files: frozenset[str] = frozenset()) -> PageStore:
+    """Открыть хранилище страниц.
+
+    :param root_dir: Каталог для хранения страниц отдельными файлами
+    :param config: Настройки хранилища (None - несжатые страницы отдельными файлами в root_dir)
+    :param service_files: Служебные файлы вызывающего в каталоге страниц (не страницы)
+    """
+    if config is None:
+        return FilePageStore(root_dir, service_files=service_files)
+    if config.database is None:
+        return FilePageStore(root_dir, config.compression, config.level, config.manifest, config.sync_read_limit,
+                             service_files)
+    return SQLitePageStore(config.database, config.compression, config.level)
+
+
+def open_parsed_cache(config: StoreConfig | None = None) -> ParsedCache | None:
+    """Открыть базу результатов разбора страниц.
+
+    :param config: Настройки хранилища
+    :return: None, если результаты разбора не сохраняются
+    """
+    return ParsedCache(config.parsed) if config is not None and config.parsed is not None else None
+
+
+async def migrate(source: PageStore, target: PageStore, report_every: int = 10000) -> int:
+    """Перенос всех страниц из одного хранилища в другое (даты загрузки и ETag сохраняются).
+
+    Страницы сохраняются со сжатием, заданным для target.
+
+    :param source: Исходное хранилище
+    :param target: Хранилище, в которое переносятся страницы
+    :param report_every: Через сколько страниц выводить сообщение о ходе переноса
+    :return: Количество перенесенных страниц
+    """
+    count: int = 0
+    for key in source.keys():  # noqa: SIM118
+        if is_service_file(key):
+            continue
+        creation_date: datetime.datetime | None = await source.creation_date(key)
+        if creation_date is None:
+            continue
+        await target.write(
+            key, await source.read_text(key) if key.endswith(PAGE_SUFFIX) else await source.read_bytes(key),
+            creation_date)
+        if (etag := await source.get_etag(key)) is not None:
+            await target.set_etag(key, etag)
+        count += 1
+        if count % report_every == 0:
+            print(f'{datetime.datetime.now()} Перенесено страниц: {count}', flush=True)  # noqa: DTZ005, T201
+    return count
+
+
+async def main(root_dir: str, database: str, compression: str | None = None) -> None:
+    """Перенос страниц, сохраненных отдельными файлами, в базу SQLite.
+
+    :param root_dir: Каталог с сохраненными страницами
+    :param database: Путь к базе SQLite
+    :param compression: Сжатие страниц в базе: None - без сжатия, 'gzip', 'zstd'
+    """
+    target = SQLitePageStore(database, compression)
+    try:
+        print(f'Перенесено страниц: {await migrate(FilePageStore(root_dir), target)}', flush=True)  # noqa: T201
+    finally:
+        target.close()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) not in {3, 4}:
+        print('Использование: python -m app.pagestore <каталог страниц> <база SQLite> [gzip|zstd]', flush=True)  # noqa: T201
+        sys.exit(1)
+    asyncio.run(main(*sys.argv[1:]))
+
@@ -0,0 +1,210 @@
+"""Ограничение частоты запросов к сайтам, общее для всех процессов загрузки."""
+import asyncio
+from contextlib import asynccontextmanager
+import multiprocessing
+import random
+import time
+from typing import TYPE_CHECKING, Final, NamedTuple
+from urllib.parse import urlparse
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from multiprocessing.sharedctypes import SynchronizedBase
+    from multiprocessing.synchronize import Lock as MultiLock
+
+
+class HostLimit(NamedTuple):
+    """Ограничения на обращения к одному сайту."""
+
+    rate: float
+    """Количество запросов в секунду."""
+    burst: int
+    """Количество запросов, которые можно выполнить подряд без ожидания."""
+    in_flight: int
+    """Количество одновременно выполняемых запросов."""
+    failures: int = 5
+    """Количество ошибок подряд, после которого обращения к сайту приостанавливаются."""
+    cooldown: float = 60.0
+    """На сколько секунд приостанавливаются обращения к сайту."""
+
+
+class RetryPolicy(NamedTuple):
+    """Правила повтора неудачных запросов."""
+
+    attempts: int = 4
+    """Количество попыток."""
+    base_delay: float = 60.0
+    """Пауза перед второй попыткой, секунд (каждая следующая в 2 раза больше)."""
+    max_delay: float = 600.0
+    """Наибольшая пауза между попытками, секунд."""
+    statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+    """Коды ответа сервера, при которых запрос повторяется."""
+
+    def backoff(self, attempt: int, retry_after: float | None = None) -> float:
+        """Пауза перед следующей попыткой.
+
+        Половина паузы случайная, чтобы процессы не повторяли запросы одновременно.
+        Если сервер указал Retry-After, пауза не меньше указанной.
+
+        :param attempt: Номер неудачной попытки (с 0)
+        :param retry_after: Пауза, которую запросил сервер, секунд
+        """
+        delay: float = min(self.max_delay, self.base_delay * 2 ** attempt)
+        delay = delay / 2 + random.uniform(0, delay / 2)  # noqa: S311
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+DEFAULT_HOST: Final[str] = '*'
+"""Ограничения для сайтов, которые не указаны в настройках явно."""
+
+DEFAULT_LIMITS: Final[dict[str, HostLimit]] = {
+    DEFAULT_HOST: HostLimit(rate=2.0, burst=2, in_flight=2),
+}
+"""Ограничения по умолчанию."""
+
+_TOKENS: Final[int] = 0
+_UPDATED: Final[int] = 1
+_IN_FLIGHT: Final[int] = 2
+_FAILURES: Final[int] = 3
+_OPEN_UNTIL: Final[int] = 4
+_SLOT_SIZE: Final[int] = 5
+
+
+class RateLimiter:
+    """Ограничитель частоты запросов (token bucket) в разделяемой памяти.
+
+    Состояние хранится в разделяемом массиве, блокировка берется только на время пересчета счетчиков,
+    поэтому ни один процесс не держит ее во время сетевого обмена или ожидания.
+
+    Там же хранится состояние предохранителя (circuit breaker): после HostLimit.failures ошибок подряд
+    обращения к сайту приостанавливаются во всех процессах на HostLimit.cooldown секунд.
+    """
+
+    __slots__ = ['_hosts', '_limits', '_lock', '_state']
+
+    def __init__(self, limits: dict[str, HostLimit] | None = None) -> None:
+        """Создать ограничитель до запуска рабочих процессов.
+
+        :param limits: Ограничения по сайтам (имя сайта - ограничение)
+        """
+        limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        limits.setdefault(DEFAULT_HOST, DEFAULT_LIMITS[DEFAULT_HOST])
+        self._hosts: dict[str, int] = {host: index for index, host in enumerate(limits)}
+        self._limits: list[HostLimit] = list(limits.values())
+        self._lock: MultiLock = multiprocessing.Lock()
+        self._state: SynchronizedBase = multiprocessing.RawArray('d', len(self._limits) * _SLOT_SIZE)
+        now: float = time.monotonic()
+        for index, limit in enumerate(self._limits):
+            self._state[index * _SLOT_SIZE + _TOKENS] = float(limit.burst)
+            self._state[index * _SLOT_SIZE + _UPDATED] = now
+
+    def _slot(self, url: str) -> int:
+        """Номер ячейки сайта в разделяемом массиве.
+
+        :param url: Адрес страницы
+        """
+        return self._hosts.get(urlparse(url).hostname, self._hosts[DEFAULT_HOST])
+
+    def _try_acquire(self, slot: int) -> float:
+        """Попытаться занять место для запроса.
+
+        :param slot: Номер ячейки сайта
+        :return: 0 если место занято, иначе сколько секунд подождать до следующей попытки
+        """
+        limit: HostLimit = self._limits[slot]
+        base: int = slot * _SLOT_SIZE
+        with self._lock:
+            now: float = time.monotonic()
+            tokens: float = min(float(limit.burst),
+                                self._state[base + _TOKENS] + (now - self._state[base + _UPDATED]) * limit.rate)
+            self._state[base + _TOKENS] = tokens
+            self._state[base + _UPDATED] = now
+            if self._state[base + _OPEN_UNTIL] > now:
+                return self._state[base + _OPEN_UNTIL] - now
+            if self._state[base + _IN_FLIGHT] >= limit.in_flight:
+                return 1.0 / limit.rate
+            if tokens < 1.0:
+                return (1.0 - tokens) / limit.rate
+            self._state[base + _TOKENS] = tokens - 1.0
+            self._state[base + _IN_FLIGHT] += 1.0
+            return 0.0
+
+    def _release(self, slot: int) -> None:
+        """Освободить место после завершения запроса.
+
+        :param slot: Номер ячейки сайта
+        """
+        with self._lock:
+            self._state[slot * _SLOT_SIZE + _IN_FLIGHT] = max(0.0, self._state[slot * _SLOT_SIZE + _IN_FLIGHT] - 1.0)
+
+    def record_success(self, url: str) -> None:
+        """Запрос к сайту выполнен успешно, счетчик ошибок сбрасывается.
+
+        :param url: Адрес страницы
+        """
+        slot: int = self._slot(url)
+        with self._lock:
+            self._state[slot * _SLOT_SIZE + _FAILURES] = 0.0
+
+    def record_failure(self, url: str) -> bool:
+        """Запрос к сайту завершился ошибкой.
+
+        После восстановления обращений первая же ошибка снова приостанавливает их.
+
+        :param url: Адрес страницы
+        :return: Обращения к сайту приостановлены
+        """
+        slot: int = self._slot(url)
+        limit: HostLimit = self._limits[slot]
+        base: int = slot * _SLOT_SIZE
+        with self._lock:
+            self._state[base + _FAILURES] = min(float(limit.failures), self._state[base + _FAILURES] + 1.0)
+            if self._state[base + _FAILURES] < limit.failures:
+                return False
+            self._state[base + _OPEN_UNTIL] = max(self._state[base + _OPEN_UNTIL], time.monotonic() + limit.cooldown)
+            return True
+
+    def pause(self, url: str, seconds: float) -> None:
+        """Приостановить обращения к сайту во всех процессах (например, по заголовку Retry-After).
+
+        :param url: Адрес страницы
+        :param seconds: На сколько секунд
+        """
+        base: int = self._slot(url) * _SLOT_SIZE
+        with self._lock:
+            self._state[base + _OPEN_UNTIL] = max(self._state[base + _OPEN_UNTIL], time.monotonic() + seconds)
+
+    @asynccontextmanager
+    async def limit(self, url: str) -> AsyncIterator[None]:
+        """Выполнить запрос с соблюдением ограничений сайта.
+
+        :param url: Адрес страницы
+        """
+        slot: int = self._slot(url)
+        # Ограничения общие для процессов, освобождение места в другом процессе можно заметить только опросом
+        while (delay := self._try_acquire(slot)) > 0:  # noqa: ASYNC110
+            await asyncio.sleep(delay)
+        try:
+            yield
+        finally:
+            self._release(slot)
+
+
+_worker_limiter: RateLimiter | None = None
+"""Ограничитель, переданный рабочему процессу при его запуске."""
+
+
+def install_limiter(limiter: RateLimiter | None) -> None:
+    """Запомнить ограничитель в рабочем процессе (вызывается из initializer пула процессов).
+
+    :param limiter: Ограничитель частоты запросов
+    """
+    global _worker_limiter  # noqa: PLW0603
+    _worker_limiter = limiter
+
+
+def installed_limiter() -> RateLimiter | None:
+    """Ограничитель текущего рабочего процесса."""
+    return _worker_limiter
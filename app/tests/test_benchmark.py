@@ -0,0 +1,52 @@
+"""Тесты сравнения скорости разборщиков HTML."""
+import pytest
+
+from app.betexplorer.benchmark import (
+    PAGE_AH,
+    PAGE_CHAMPIONSHIPS,
+    PAGE_COUNTRIES,
+    PAGE_FIXTURES,
+    PAGE_MATCH,
+    PAGE_RESULTS,
+    PAGE_TEAM,
+    benchmark,
+    benchmark_dates,
+    date_texts,
+    load_pages,
+    page_type,
+)
+from app.betexplorer.schemas import SportType
+from app.config import settings
+from app.utilbase import PARSER_LEXBOR, PARSER_MODEST
+
+
+class TestBenchmark:
+    """Тест замера скорости разбора сохраненных страниц."""
+
+    def test_page_type(self) -> None:
+        """Вид страницы определяется по ее пути."""
+        assert page_type('football.http') == (PAGE_COUNTRIES, SportType.FOOTBALL)
+        assert page_type('hockey/russia.http') == (PAGE_CHAMPIONSHIPS, SportType.HOCKEY)
+        assert page_type('football/england/fa-cup/results_stage_ED4ZQdit.http')[0] == PAGE_RESULTS
+        assert page_type('football/england/fa-cup/fixtures.http')[0] == PAGE_FIXTURES
+        assert page_type('football/team/wolves/j3Azpf5d.http')[0] == PAGE_TEAM
+        assert page_type('football/england/fa-cup/arsenal-chelsea/AbCd1234.http')[0] == PAGE_MATCH
+        assert page_type('match-odds-old/AbCd1234/1/ah/1.http')[0] == PAGE_AH
+
+    @pytest.mark.asyncio
+    async def test_benchmark(self) -> None:
+        """Время разбора замеряется для каждого вида страниц и каждого разборщика."""
+        pages = await load_pages([settings.DOWNLOAD_TEST_DIRECTORY])
+        assert len(pages[PAGE_RESULTS]) == 3
+        timings = benchmark(pages, (PARSER_MODEST, PARSER_LEXBOR))
+        assert set(timings) == {(kind.name, backend) for kind in pages for backend in (PARSER_MODEST, PARSER_LEXBOR)}
+        assert all(timing > 0 for timing in timings.values())
+
+    @pytest.mark.asyncio
+    async def test_benchmark_dates(self) -> None:
+        """Даты берутся из колонки с датой, время замеряется с запоминанием дат и без."""
+        pages = await load_pages([settings.DOWNLOAD_TEST_DIRECTORY])
+        assert all(text[:2].isdigit() or text.startswith(('Today', 'Tomorrow'))
+                   for page in pages[PAGE_FIXTURES] for text in date_texts(page, 1))
+        timings = benchmark_dates(pages)
+        assert set(timings) == {(kind, method) for kind in ('results', 'fixtures') for method in ('memo', 'no memo')}
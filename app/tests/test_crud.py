@@ -26,6 +26,7 @@ from app.betexplorer.schemas import (
     MatchBetexplorer,
     SportBetexplorer,
     SportType,
+    StoredResults,
     TeamBetexplorer,
 )
 from app.config import settings
@@ -1831,3 +1832,31 @@ class TestInsertChampionshipStage:
         stage_id = await crud.insert_championship_stage(session, championship_id, championship_stage)
 
         assert isinstance(stage_id, int)
+
+
+class TestLastResults:
+    """Тест поиска самых поздних сохраненных результатов чемпионата."""
+
+    @pytest.mark.asyncio
+    async def test_last_results(self, crud: CRUDbetexplorer, session: AsyncSession) -> None:
+        """По каждой стадии - самый поздний день результатов и все матчи этого дня, расписание не учитывается."""
+        crud.save_database = DATABASE_WRITE_DATA
+        date: datetime.datetime = datetime.datetime(2024, 1, 1)  # noqa: DTZ001
+        async with session.begin():
+            session.add_all([Match(
+                championship_id=1, match_url=match_url, home_team_id=1, away_team_id=2, game_date=game_date,
+                is_fixture=is_fixture, stage_name=stage_name, download_date=date, save_date=date,
+            ) for match_url, game_date, is_fixture, stage_name in (
+                ('/m/1/', datetime.datetime(2024, 1, 10, 19), 0, None),  # noqa: DTZ001
+                ('/m/2/', datetime.datetime(2024, 1, 10, 21), 0, None),  # noqa: DTZ001
+                ('/m/3/', datetime.datetime(2024, 1, 9, 19), 0, None),  # noqa: DTZ001
+                ('/m/4/', datetime.datetime(2024, 1, 12, 19), 1, None),  # noqa: DTZ001
+                ('/m/5/', datetime.datetime(2024, 1, 5, 19), 0, 'Main'),  # noqa: DTZ001
+            )])
+        assert await crud.last_results(session, 1) == {
+            None: StoredResults(datetime.date(2024, 1, 10), frozenset({'/m/1/', '/m/2/'})),
+            'Main': StoredResults(datetime.date(2024, 1, 5), frozenset({'/m/5/'})),
+        }
+        assert await crud.last_results(session, 2) == {}
+        crud.save_database = DATABASE_NOT_USE
+        assert await crud.last_results(session, 1) == {}
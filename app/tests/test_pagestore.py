@@ -0,0 +1,187 @@
+"""Тесты хранилищ сохраненных страниц."""
+import datetime  # noqa: ICN001
+from typing import TYPE_CHECKING
+
+import aiofiles
+import pytest
+
+from app import pagestore
+from app.betexplorer.betexplorer import CSS_RESULTS, get_results_fixtures
+from app.betexplorer.schedule import SERVICE_FILES
+from app.betexplorer.schemas import SportType
+from app.config import settings
+from app.pagestore import (
+    GZIP_MAGIC,
+    FilePageStore,
+    PageStore,
+    ParsedCache,
+    SQLitePageStore,
+    StoreConfig,
+    migrate,
+    open_store,
+)
+from app.utilbase import LoadSave
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pytest_mock import MockerFixture
+
+
+class TestPageStore:
+    """Тест хранилищ страниц."""
+
+    @pytest.mark.asyncio
+    async def test_sqlite_store(self, tmp_path: Path) -> None:
+        """Страница, дата загрузки и ETag сохраняются и читаются из базы SQLite."""
+        store = SQLitePageStore(str(tmp_path / 'pages.sqlite'))
+        creation_date = datetime.datetime(2024, 5, 1, 15, 30)  # noqa: DTZ001
+        assert await store.creation_date('football/page.http') is None
+        await store.write('football/page.http', '<div>\r\nText</div>', creation_date)
+        await store.set_etag('football/page.http', '"v1"')
+        await store.touch('football/page.http', creation_date + datetime.timedelta(days=1))
+        assert await store.read_text('football/page.http') == '<div>\nText</div>'
+        assert await store.get_etag('football/page.http') == '"v1"'
+        assert await store.creation_date('football/page.http') == creation_date + datetime.timedelta(days=1)
+        assert list(store.keys()) == ['football/page.http']
+        store.close()
+
+    @pytest.mark.asyncio
+    async def test_migrate(self, tmp_path: Path) -> None:
+        """Перенесенные в базу (со сжатием) страницы читаются так же, как сохраненные файлы."""
+        source = FilePageStore(settings.DOWNLOAD_TEST_DIRECTORY)
+        target = SQLitePageStore(str(tmp_path / 'pages.sqlite'), compression='gzip')
+        assert await migrate(source, target) == len(list(source.keys()))
+        key: str = 'football/england/fa-cup/results.http'
+        assert await target.creation_date(key) == await source.creation_date(key)
+        assert await target.read_bytes('res/images/team-logo/MesiZT83-CjV6Eptm.png') == \
+               await source.read_bytes('res/images/team-logo/MesiZT83-CjV6Eptm.png')
+
+        from_files = LoadSave(root_url='https://www.betexplorer.com', root_dir=settings.DOWNLOAD_TEST_DIRECTORY)
+        from_sqlite = LoadSave(root_url='https://www.betexplorer.com', root_dir=str(tmp_path), store=target)
+        expected = await from_files.get_read('/football/england/fa-cup/results/', CSS_RESULTS)
+        received = await from_sqlite.get_read('/football/england/fa-cup/results/', CSS_RESULTS)
+        await from_sqlite.close_session()
+        assert received.node.html == expected.node.html
+        assert received.creation_date == expected.creation_date
+
+    @pytest.mark.asyncio
+    async def test_service_files(self, tmp_path: Path) -> None:
+        """Служебные файлы загрузки в каталоге страниц не считаются страницами и не переносятся."""
+        with pytest.raises(TypeError):
+            PageStore()
+        source = FilePageStore(str(tmp_path / 'pages'), manifest=True, service_files=SERVICE_FILES)
+        await source.write('football.http', '<div>Countries</div>', datetime.datetime(2024, 5, 1))  # noqa: DTZ001
+        await source.set_etag('football.http', '"v1"')
+        source.close()
+        for name in SERVICE_FILES:
+            (tmp_path / 'pages' / name).write_text('{}', encoding='utf-8')
+        assert list(source.keys()) == ['football.http']
+        target = SQLitePageStore(str(tmp_path / 'pages.sqlite'))
+        assert await migrate(source, target) == 1
+        assert list(target.keys()) == ['football.http']
+        target.close()
+
+    @pytest.mark.asyncio
+    async def test_compression(self, tmp_path: Path) -> None:
+        """Страницы сохраняются сжатыми, несжатые страницы, сохраненные ранее, читаются как обычно."""
+        store = open_store(str(tmp_path), StoreConfig(compression='gzip', level=6))
+        creation_date = datetime.datetime(2024, 5, 1, 15, 30)  # noqa: DTZ001
+        (tmp_path / 'old.http').write_text('<div>Old</div>', encoding='utf-8')
+        await store.write('football/page.http', '<div>Текст</div>', creation_date)
+        await store.write('res/logo.png', b'\x89PNG', creation_date)
+        assert (tmp_path / 'football' / 'page.http').read_bytes()[:2] == GZIP_MAGIC
+        assert await store.read_html('football/page.http') == '<div>Текст</div>'.encode()
+        assert await store.read_text('old.http') == '<div>Old</div>'
+        assert await store.read_bytes('res/logo.png') == b'\x89PNG'
+        assert await store.creation_date('football/page.http') == creation_date
+        with pytest.raises(ValueError, match='lz4'):
+            open_store(str(tmp_path), StoreConfig(compression='lz4'))
+
+    @pytest.mark.asyncio
+    async def test_manifest(self, tmp_path: Path) -> None:
+        """Наличие и дата файлов берутся из списка, изменения других процессов применяются при загрузке."""
+        creation_date = datetime.datetime(2024, 5, 1, 15, 30)  # noqa: DTZ001
+        (tmp_path / 'football').mkdir()
+        (tmp_path / 'football' / 'old.http').write_text('<div>Old</div>', encoding='utf-8')
+        store = FilePageStore(str(tmp_path), manifest=True)
+        store.prepare()
+        (tmp_path / 'football' / 'unknown.http').write_text('<div>Unknown</div>', encoding='utf-8')
+        assert await store.creation_date('football/old.http') is not None
+        assert await store.creation_date('football/unknown.http') is None
+        await store.write('football/page.http', '<div>New</div>', creation_date)
+        assert await store.creation_date('football/page.http') == creation_date
+        store.close()
+
+        other = FilePageStore(str(tmp_path), manifest=True)
+        assert await other.creation_date('football/page.http') == creation_date
+        assert '.manifest' not in list(other.keys())
+
+    @pytest.mark.asyncio
+    async def test_manifest_shared(self, tmp_path: Path, mocker: MockerFixture) -> None:
+        """Файлы, записанные и обновленные другим процессом, видны после применения журнала, без обращения к диску."""
+        creation_date = datetime.datetime(2024, 5, 1, 15, 30)  # noqa: DTZ001
+        first = FilePageStore(str(tmp_path), manifest=True)
+        first.prepare()
+        second = FilePageStore(str(tmp_path), manifest=True)
+        assert await second.creation_date('football/page.http') is None
+        await first.write('football/page.http', '<div>Old</div>', creation_date)
+        stat = mocker.spy(pagestore.os, 'stat')
+        assert await second.creation_date('football/page.http') is None
+        assert stat.call_count == 0
+        second.manifest.refresh()
+        assert await second.creation_date('football/page.http') == creation_date
+        await first.touch('football/page.http', creation_date + datetime.timedelta(days=1))
+        second.manifest.refresh()
+        assert await second.creation_date('football/page.http') == creation_date + datetime.timedelta(days=1)
+        await second.write('football/other.http', '<div>Other</div>', creation_date)
+        first.manifest.refresh()
+        assert await first.creation_date('football/other.http') == creation_date
+        with (tmp_path / '.manifest.journal').open('a', encoding='utf-8') as f:
+            f.write('football/partial.http\t10')
+        first.manifest.refresh()
+        assert await first.creation_date('football/partial.http') is None
+        first.close()
+        second.close()
+
+    @pytest.mark.asyncio
+    async def test_manifest_deleted(self, tmp_path: Path) -> None:
+        """Файл, удаленный вне программы, считается не сохраненным после попытки его прочитать."""
+        store = FilePageStore(str(tmp_path), manifest=True)
+        store.prepare()
+        await store.write('football/page.http', '<div>Page</div>', datetime.datetime(2024, 5, 1, 15, 30))  # noqa: DTZ001
+        (tmp_path / 'football' / 'page.http').unlink()
+        with pytest.raises(FileNotFoundError):
+            await store.read_text('football/page.http')
+        assert await store.creation_date('football/page.http') is None
+        store.close()
+        assert await FilePageStore(str(tmp_path), manifest=True).creation_date('football/page.http') is None
+
+    @pytest.mark.asyncio
+    async def test_parsed_cache(self, tmp_path: Path, mocker: MockerFixture) -> None:
+        """При повторной обработке неизменившихся страниц используется сохраненный результат разбора."""
+        results = []
+        for _ in range(2):
+            ls = LoadSave(root_url='https://www.betexplorer.com', root_dir=settings.DOWNLOAD_TEST_DIRECTORY,
+                          parsed=ParsedCache(str(tmp_path / 'parsed.sqlite')))
+            load_file = mocker.spy(ls, 'load_file')
+            results.append(await get_results_fixtures(ls, '/football/england/fa-cup/', SportType.FOOTBALL, 1))
+            await ls.close_session()
+        assert ls.stats['parsed_cached'] > 0
+        assert load_file.call_count == 0
+        assert results[1]['stages'] == results[0]['stages']
+        assert [match['match_url'] for match in results[1]['matches']] == \
+               [match['match_url'] for match in results[0]['matches']]
+        assert results[1]['matches'][0]['save_date'] > results[0]['matches'][0]['save_date']
+
+    @pytest.mark.asyncio
+    async def test_sync_read(self, tmp_path: Path, mocker: MockerFixture) -> None:
+        """Небольшие файлы читаются без aiofiles, большие - через пул потоков."""
+        store = FilePageStore(str(tmp_path), sync_read_limit=100)
+        (tmp_path / 'small.http').write_bytes(b'<div>Small</div>')
+        (tmp_path / 'large.http').write_bytes(large := b'<div>' + b'x' * 200 + b'</div>')
+        aiofiles_open = mocker.spy(aiofiles, 'open')
+        assert await store.read_html('small.http') == b'<div>Small</div>'
+        assert aiofiles_open.call_count == 0
+        assert await store.read_html('large.http') == large
+        assert aiofiles_open.call_count == 1
@@ -1,6 +1,9 @@
 """Тестирование функции разбора страницы BetExplorer."""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 import datetime
-from typing import List, Optional
+import pickle
+from typing import TYPE_CHECKING, List, Optional
 
 from deepdiff import DeepDiff
 import pytest
@@ -10,6 +13,7 @@ from selectolax.parser import HTMLParser, Node
 
 from app.betexplorer.betexplorer import (
     COLUMN_GAME_DATE,
+    COLUMN_HANDLERS,
     COLUMN_ODDS_1,
     COLUMN_ODDS_2,
     COLUMN_ODDS_X,
@@ -21,11 +25,16 @@ from app.betexplorer.betexplorer import (
     CSS_SHOOTERS,
     IS_FIXTURE,
     IS_RESULT,
+    get_column_handlers,
     get_column_type,
     get_results,
     get_results_fixtures,
     get_team,
+    init_worker,
     match_init,
+    new_results,
+    parse_date_fixtures,
+    parse_date_results,
     parsing_championships,
     parsing_countries,
     parsing_date_fixtures,
@@ -43,21 +52,36 @@ from app.betexplorer.betexplorer import (
     parsing_team,
     parsing_team_data,
     parsing_team_match,
+    run_championships,
+    run_pipeline,
     update_match_time,
 )
 from app.betexplorer.crud import DATABASE_NOT_USE, CRUDbetexplorer
+from app.betexplorer.freshness import FreshnessPolicy
+from app.betexplorer.pipeline import PipelineConfig
+from app.betexplorer.schedule import Checkpoint, WorkCosts
 from app.betexplorer.schemas import (
     ChampionshipBetexplorer,
     ChampionshipStageBetexplorer,
     CountryBetexplorer,
     MatchBetexplorer,
+    MatchRecord,
     ScoreHalvesBetexplorer,
     ShooterBetexplorer,
+    ShooterRecord,
     SportType,
+    StoredResults,
     TeamBetexplorer,
+    as_plain,
 )
+from app.betexplorer.teams import TeamRegistry
 from app.config import settings
-from app.utilbase import LoadSave, ReceivedData
+from app.database import DatabaseSessionManager
+from app.ratelimit import RateLimiter
+from app.utilbase import PARSER_MODEST, LoadSave, ReceivedData
+
+if TYPE_CHECKING:
+    from pytest_mock import MockerFixture
 
 _PARSERS_PARAMETRIZER = ('parser', (HTMLParser, LexborHTMLParser))
 
@@ -501,6 +525,18 @@ class TestParsingDateResults:
                 elif index == 4:
                     assert res is None
 
+    def test_parse_date_results(self):
+        """Все варианты записи даты разбираются одним выражением, повторная дата берется из запомненных."""
+        creation_date = datetime.datetime(2024, 2, 18)  # noqa: DTZ001
+        parse_date_results.cache_clear()
+        assert parse_date_results('31/12/2023', creation_date) == datetime.datetime(2023, 12, 31)  # noqa: DTZ001
+        assert parse_date_results('10-02-', creation_date) == datetime.datetime(2024, 2, 10)  # noqa: DTZ001
+        assert parse_date_results('10.02.20', creation_date) == datetime.datetime(2024, 2, 10)  # noqa: DTZ001
+        assert parse_date_results('Yesterday', datetime.datetime(2024, 3, 1)) == datetime.datetime(2024, 2, 29)  # noqa: DTZ001
+        assert parse_date_results('Today 15:00', creation_date) is None
+        assert parse_date_results('31/12/2023', creation_date) == datetime.datetime(2023, 12, 31)  # noqa: DTZ001
+        assert parse_date_results.cache_info().hits == 1
+
 
 class TestParsingTeam:
 
@@ -577,6 +613,15 @@ class TestParsingDateFixtures:
                 elif index == 5:
                     assert res == datetime.datetime(year=2024, month=2, day=20, hour=19, minute=20)
 
+    def test_parse_date_fixtures(self):
+        """Все варианты записи даты в расписании разбираются одним выражением."""
+        creation_date = datetime.datetime(2024, 12, 31, 16, 10)  # noqa: DTZ001
+        assert parse_date_fixtures('Tomorrow 9:05', creation_date) == datetime.datetime(2025, 1, 1, 9, 5)  # noqa: DTZ001
+        assert parse_date_fixtures('02.01.2025 20:30', creation_date) == datetime.datetime(2025, 1, 2, 20, 30)  # noqa: DTZ001
+        assert parse_date_fixtures('02.01. 20:30', creation_date) == datetime.datetime(2024, 1, 2, 20, 30)  # noqa: DTZ001
+        assert parse_date_fixtures('02.01.', creation_date) is None
+        assert parse_date_fixtures('Today', creation_date) is None
+
 
 class TestParsingDateMatch:
 
@@ -645,7 +690,7 @@ class TestParsingScoreHalves:
         node = parser(html).css_first('ul.list-details')
         for season_table in node.iter(False):
             for index, item in enumerate(season_table.iter(False)):
-                res = parsing_score_halves(item)
+                res = as_plain(parsing_score_halves(item))
                 if index == 0:
                     assert not DeepDiff(pars, res)
 
@@ -772,7 +817,7 @@ class TestParsingShooters:
         node = parser(html).css_first(CSS_SHOOTERS)
         for tab_index, tab_item in enumerate(node.iter(False)):
             table_data = tab_item.css_first('table tbody')
-            res: List[ShooterBetexplorer] = parsing_shooters(SportType.FOOTBALL, table_data, tab_index)
+            res: list[ShooterBetexplorer] = as_plain(parsing_shooters(SportType.FOOTBALL, table_data, tab_index))
             if tab_index == 0:
                 assert not DeepDiff(pars, res)
             if tab_index == 1:
@@ -781,7 +826,7 @@ class TestParsingShooters:
         node = parser(html_2).css_first(CSS_SHOOTERS)
         for tab_index, tab_item in enumerate(node.iter(False)):
             table_data = tab_item.css_first('table tbody')
-            res: List[ShooterBetexplorer] = parsing_shooters(SportType.FOOTBALL, table_data, tab_index)
+            res: list[ShooterBetexplorer] = as_plain(parsing_shooters(SportType.FOOTBALL, table_data, tab_index))
             if tab_index == 0:
                 assert not DeepDiff(pars_21, res)
             if tab_index == 1:
@@ -865,6 +910,7 @@ async def test_parsing_match_time(parser):
             {'shooter_id': None, 'home_away': 1, 'event_order': 4, 'event_time': None, 'overtime': None, 'player_name': 'Fati Ansu', 'penalty_kick': '(penalty kick)'},
             {'shooter_id': None, 'home_away': 1, 'event_order': 5, 'event_time': None, 'overtime': None, 'player_name': 'Pedri', 'penalty_kick': '(penalty kick)'}
         ],
+        'match_event': [],
         'stage_name': 'stage_name',
         'round_name': 'round_name',
         'round_number': 10,
@@ -969,7 +1015,9 @@ async def test_parsing_match_time(parser):
     node = parser(html).css_first('div')
     soap: ReceivedData = ReceivedData(node, datetime.datetime(2020, 1, 1, 10, 30))
     match: Optional[MatchBetexplorer] = parsing_match_time(soap, SportType.FOOTBALL, championship_id, 'stage_name', 'round_name', 10, IS_FIXTURE)
-    assert not DeepDiff(pars, match, exclude_paths=["root['save_date']", "root['download_date']", "root['home_team']['download_date']", "root['home_team']['save_date']", "root['away_team']['download_date']", "root['away_team']['save_date']"])
+    assert not DeepDiff(pars, as_plain(match), exclude_paths=[
+        "root['save_date']", "root['download_date']", "root['home_team']['download_date']",
+        "root['home_team']['save_date']", "root['away_team']['download_date']", "root['away_team']['save_date']"])
 
 
 class TestUpdateMatchTime:
@@ -1241,6 +1289,41 @@ class TestGetColumnType:
             res = get_column_type(sport_id, IS_FIXTURE, 6)
             assert res is None
 
+    def test_get_column_handlers(self):
+        """Разбор колонок по порядку соответствует типам колонок для каждого вида спорта."""
+        for sport_id in SportType:
+            for is_fixture in (IS_RESULT, IS_FIXTURE):
+                handlers = get_column_handlers(sport_id, is_fixture)
+                for index in range(8):
+                    column_type = get_column_type(sport_id, is_fixture, index)
+                    handler = handlers[index] if index < len(handlers) else None
+                    assert handler is (None if column_type is None else COLUMN_HANDLERS[is_fixture, column_type])
+
+
+class TestMatchRecord:
+    """Тест компактной записи матча."""
+
+    def test_match_record(self):
+        """Запись матча работает как словарь, списки создаются при обращении, дата разбора одна на страницу."""
+        creation_date = datetime.datetime(2024, 5, 1, 12, 0)  # noqa: DTZ001
+        save_date = datetime.datetime(2024, 5, 2, 12, 0)  # noqa: DTZ001
+        match = match_init(SportType.FOOTBALL.value, 1, 'Main', None, None, IS_RESULT, creation_date, save_date)
+        assert isinstance(match, MatchRecord)
+        assert match['home_team']['save_date'] == match['away_team']['save_date'] == match['save_date'] == save_date
+        assert match.get('odds_1') is None
+        match['odds_1'] = 1.5
+        match['shooters'].append(ShooterRecord(home_away=0, event_order=0))
+        assert match.odds_1 == 1.5
+        plain = match.as_dict()
+        assert plain['shooters'][0]['event_order'] == 0
+        assert plain['score_halves'] == []
+        assert plain['home_team']['sport_id'] == SportType.FOOTBALL.value
+        assert match == plain
+        assert pickle.loads(pickle.dumps(match)) == match  # noqa: S301
+        with pytest.raises(KeyError):
+            match['unknown'] = 1
+
+
 class TestMatchInit:
 
     @pytest.mark.asyncio()
@@ -1287,6 +1370,7 @@ class TestMatchInit:
             'score_stage': None, 'score_stage_short': None,
             'score_halves': [],
             'shooters': [],
+            'match_event': [],
             'stage_name': 'Qualification',
             'round_name': '26. ROUND',
             'round_number': 26,
@@ -1303,7 +1387,9 @@ class TestMatchInit:
             is_fixture=is_fixture,
             creation_date=datetime.datetime(2023, 10, 17),
         )
-        assert not DeepDiff(pars, res, exclude_paths=["root['save_date']", "root['download_date']", "root['away_team']['save_date']", "root['home_team']['save_date']"])
+        assert not DeepDiff(pars, as_plain(res), exclude_paths=[
+            "root['save_date']", "root['download_date']", "root['away_team']['save_date']",
+            "root['home_team']['save_date']"])
 
 
 class TestParsingResults:
@@ -1454,7 +1540,7 @@ class TestParsingResults:
         soap: ReceivedData = ReceivedData(node, datetime.datetime(2020, 1, 1, 10, 30))
         res = parsing_results(soap, SportType.FOOTBALL, championship_id, IS_RESULT)
         assert not DeepDiff(pars, res['stages'])
-        assert not DeepDiff(pars_match, res['matches'],
+        assert not DeepDiff(pars_match, as_plain(res['matches']),
                             exclude_paths=["root[0]['save_date']", "root[0]['download_date']",
                                            "root[1]['save_date']", "root[1]['download_date']",
                                            "root[0]['home_team']['download_date']",
@@ -1467,6 +1553,45 @@ class TestParsingResults:
                                            "root[1]['away_team']['save_date']",
                                            ])
 
+    @pytest.mark.parametrize(*_PARSERS_PARAMETRIZER)
+    def test_new_results(self, parser: type):
+        """Пропускаются матчи раньше сохраненного дня и сохраненные матчи этого дня, перенесенные матчи остаются."""
+        rows = ''.join(
+            f'<tr><td class="h-text-left"><a href="{url}" class="in-match"><span>A</span> - <span>B</span></a></td>'
+            f'<td class="h-text-center"><a href="{url}">1:0</a></td>'
+            f'<td class="table-main__odds" data-odd="1.50"></td><td class="table-main__odds" data-odd="3.50"></td>'
+            f'<td class="table-main__odds" data-odd="5.00"></td><td class="h-text-right">{date}</td></tr>'
+            for url, date in (('/m/new/', '20.10.2023'), ('/m/stored/', '17.10.2023'),
+                              ('/m/same-day/', '17.10.2023'), ('/m/old/', '16.10.2023'),
+                              ('/m/rescheduled/', '18.10.2023')))
+        html = (f'<div class="columns__item columns__item--68 columns__item--tab-100">'
+                f'<table class="table-main js-tablebanner-t js-tablebanner-ntb"><tr><th colspan="2">1. Round</th>'
+                f'<th>1</th><th>X</th><th>2</th><th></th></tr>{rows}</table></div>')
+        soup: ReceivedData = ReceivedData(parser(html).css_first(CSS_RESULTS), datetime.datetime(2023, 10, 21))  # noqa: DTZ001
+        stored: StoredResults = StoredResults(datetime.date(2023, 10, 17), frozenset({'/m/stored/'}))
+        matches: list[MatchBetexplorer] = parsing_results(soup, SportType.FOOTBALL, 1, None, IS_RESULT)
+        assert [match['match_url'] for match in matches] == [
+            '/m/new/', '/m/stored/', '/m/same-day/', '/m/old/', '/m/rescheduled/']
+        assert [match['match_url'] for match in new_results(matches, stored)] == [
+            '/m/new/', '/m/same-day/', '/m/rescheduled/']
+        assert new_results(matches, None) == matches
+
+    @pytest.mark.parametrize(*_PARSERS_PARAMETRIZER)
+    def test_parsing_fixtures_saved_date(self, parser: type):
+        """Пустая колонка даты в расписании - дата предыдущего матча, строка без колонок ее не сбрасывает."""
+        def row(url: str, date: str) -> str:
+            return (f'<tr><td class="table-main__datetime">{date}</td><td class="h-text-left">'
+                    f'<a href="{url}" class="in-match"><span>A</span> - <span>B</span></a></td></tr>')
+
+        html = (f'<div class="columns__item columns__item--68 columns__item--tab-100">'
+                f'<table class="table-main table-main--leaguefixtures h-mb15 js-tablebanner-t js-tablebanner-ntb">'
+                f'<tr><th colspan="2">1. Round</th></tr>{row("/m/1/", "20.10. 18:00")}<tr> </tr>'
+                f'{row("/m/2/", "")}</table></div>')
+        soup: ReceivedData = ReceivedData(parser(html).css_first(CSS_RESULTS), datetime.datetime(2023, 10, 1))  # noqa: DTZ001
+        matches: list[MatchBetexplorer] = parsing_results(soup, SportType.FOOTBALL, 1, None, IS_FIXTURE)
+        assert [match['match_url'] for match in matches if match['match_url'] is not None] == ['/m/1/', '/m/2/']
+        assert matches[-1]['game_date'] == datetime.datetime(2023, 10, 20, 18, 0)  # noqa: DTZ001
+
 
 class TestGetResults:
 
@@ -1644,7 +1769,7 @@ class TestGetResults:
         ls.load_net = False
         res = await get_results('/football/england/fa-cup/', SportType.FOOTBALL, championship_id, IS_RESULT, False)
         assert not DeepDiff(pars, res['stages'])
-        assert not DeepDiff(pars_match, res['matches'],
+        assert not DeepDiff(pars_match, as_plain(res['matches']),
                             exclude_paths=["root[0]['save_date']", "root[0]['download_date']",
                                            "root[1]['save_date']", "root[1]['download_date']",
                                            "root[0]['home_team']['download_date']",
@@ -1658,7 +1783,7 @@ class TestGetResults:
 
         res = await get_results('/football/england/fa-cup/', SportType.FOOTBALL, championship_id, IS_FIXTURE, False)
         assert not DeepDiff(pars, res['stages'])
-        assert not DeepDiff(pars_match_fix, res['matches'],
+        assert not DeepDiff(pars_match_fix, as_plain(res['matches']),
                             exclude_paths=["root[0]['save_date']", "root[0]['download_date']",
                                            "root[1]['save_date']", "root[1]['download_date']",
                                            "root[0]['home_team']['download_date']",
@@ -1713,6 +1838,36 @@ class TestGetTeam:
         await get_team(ls, crd, session, [team], fast_country, fast_team)
         assert team['team_id'] == 1
 
+    @pytest.mark.asyncio
+    async def test_get_team_concurrent(self, mocker: MockerFixture):
+        """Одновременные задачи загружают страницу команды один раз."""
+        teams: list[TeamBetexplorer] = [
+            {
+                'team_id': None,
+                'sport_id': SportType.FOOTBALL.value,
+                'team_name': None,
+                'team_full': None,
+                'team_url': '/football/team/brighton/2XrRecc3',
+                'team_country': None,
+                'country_id': None,
+                'team_emblem': None,
+            } for _ in range(3)
+        ]
+        fast_team: dict[(int, int, str, str, str), TeamBetexplorer | None] = {}
+        team_loading: dict = {}
+        ls = LoadSave(
+            root_url='https://www.betexplorer.com',
+            root_dir=settings.DOWNLOAD_TEST_DIRECTORY,
+        )
+        get_read = mocker.spy(ls, 'get_read')
+        crd = CRUDbetexplorer(save_database=DATABASE_NOT_USE)
+
+        await asyncio.gather(*(get_team(ls, crd, None, [team], {'England': 1}, fast_team, team_loading,
+                                        asyncio.Lock()) for team in teams))
+        assert get_read.call_count == 1
+        assert all(team['team_country'] == 'England' and team['country_id'] == 1 for team in teams)
+        assert not team_loading
+
 
 class TestGetResultsFixtures:
 
@@ -1894,7 +2049,7 @@ class TestGetResultsFixtures:
         ls.load_net = False
         res = await get_results_fixtures(ls, '/football/england/fa-cup/', SportType.FOOTBALL, championship_id, False)
         assert not DeepDiff(pars, res['stages'])
-        assert not DeepDiff(pars_match, res['matches'], exclude_paths=[
+        assert not DeepDiff(pars_match, as_plain(res['matches']), exclude_paths=[
             "root[0]['save_date']", "root[0]['download_date']",
             "root[1]['save_date']", "root[1]['download_date']",
             "root[2]['save_date']", "root[2]['download_date']",
@@ -1911,3 +2066,58 @@ class TestGetResultsFixtures:
             "root[2]['away_team']['download_date']",
             "root[2]['away_team']['save_date']",
             ])
+
+
+class TestWorker:
+    """Тест окружения рабочего процесса."""
+
+    def test_run_championships(self):
+        """Задачи выполняются в окружении, созданном при запуске процесса, статистика возвращается за задачу."""
+        url = '/football/england/fa-cup/'
+        championship: ChampionshipBetexplorer = {
+            'championship_id': None,
+            'sport_id': SportType.FOOTBALL.value,
+            'country_id': None,
+            'championship_url': url,
+            'championship_name': 'FA Cup',
+            'championship_order': 0,
+            'championship_years': '2023/2024',
+        }
+        with ProcessPoolExecutor(max_workers=1, initializer=init_worker, initargs=(
+                RateLimiter(), settings.DOWNLOAD_TEST_DIRECTORY, None, None, None, 1, False, DATABASE_NOT_USE,
+                None, None, PARSER_MODEST, TeamRegistry())) as pool:
+            results = [pool.submit(
+                run_championships, False, False, SportType.FOOTBALL, [championship], FreshnessPolicy(), {}, False,
+            ).result() for _ in range(2)]
+        assert results[0][1][url].matches == 18
+        assert results[0] == results[1]
+
+    @pytest.mark.asyncio
+    async def test_run_pipeline(self):
+        """Сезоны проходят загрузку, разбор в процессах и запись, итоги совпадают с разбором в одном процессе."""
+        url = '/football/england/fa-cup/'
+        championship: ChampionshipBetexplorer = {
+            'championship_id': None,
+            'sport_id': SportType.FOOTBALL.value,
+            'country_id': None,
+            'championship_url': url,
+            'championship_name': 'FA Cup',
+            'championship_order': 0,
+            'championship_years': '2023/2024',
+        }
+        ls = LoadSave(
+            root_url='https://www.betexplorer.com',
+            root_dir=settings.DOWNLOAD_TEST_DIRECTORY,
+        )
+        costs = WorkCosts()
+        checkpoint = Checkpoint()
+        with ProcessPoolExecutor(max_workers=2, initializer=init_worker, initargs=(
+                RateLimiter(), settings.DOWNLOAD_TEST_DIRECTORY, None, None, None, 1, False, DATABASE_NOT_USE,
+                None, None, PARSER_MODEST, TeamRegistry())) as pool:
+            _, failed = await run_pipeline(
+                ls, DatabaseSessionManager(), CRUDbetexplorer(save_database=DATABASE_NOT_USE), pool,
+                PipelineConfig(fetchers=1, parsers=2, batch=2, pages_queue=1, results_queue=1),
+                [(SportType.FOOTBALL, championship, {})], FreshnessPolicy(), False, costs, checkpoint)
+        assert failed == 0
+        assert checkpoint.done[url]['matches'] == 18
+        assert costs.cost(championship) == 18
@@ -0,0 +1,53 @@
+"""Тестирование очередей конвейера загрузки."""
+import asyncio
+
+import pytest
+
+from app.betexplorer.pipeline import StageQueue
+
+
+class TestStageQueue:
+    """Тест очереди между стадиями конвейера."""
+
+    @pytest.mark.asyncio
+    async def test_backpressure(self) -> None:
+        """Поставщик ждет, пока потребитель не освободит место, ожидание и глубина учитываются."""
+        queue: StageQueue = StageQueue('test', 2)
+        received: list[int] = []
+
+        async def produce() -> None:
+            for item in range(5):
+                await queue.put(item)
+            await queue.close(1)
+
+        async def consume() -> None:
+            await asyncio.sleep(0.05)
+            while (item := await queue.get()) is not None:
+                received.append(item)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(produce(), consume())
+        assert received == [0, 1, 2, 3, 4]
+        assert queue.items == 5
+        assert queue.depth_max == 2
+        assert queue.put_waits > 0
+        assert 'элементов 5' in queue.report()
+
+    @pytest.mark.asyncio
+    async def test_close(self) -> None:
+        """Каждый потребитель получает признак завершения стадии, он не учитывается в замерах."""
+        queue: StageQueue = StageQueue('test', 1)
+
+        async def consume() -> int:
+            count: int = 0
+            while await queue.get() is not None:
+                count += 1
+            return count
+
+        consumers: asyncio.Future = asyncio.gather(consume(), consume(), consume())
+        for item in range(4):
+            await queue.put(item)
+        await queue.close(3)
+        assert sum(await consumers) == 4
+        assert queue.items == 4
+        assert queue.get_waits > 0
@@ -0,0 +1,80 @@
+"""Тесты ограничителя частоты запросов."""
+import asyncio
+import time
+
+import pytest
+
+from app.ratelimit import DEFAULT_HOST, HostLimit, RateLimiter, RetryPolicy
+
+
+class TestRateLimiter:
+    """Тест ограничителя частоты запросов."""
+
+    @pytest.mark.asyncio
+    async def test_burst_without_waiting(self) -> None:
+        """Запросы в пределах burst выполняются без ожидания."""
+        limiter = RateLimiter({'www.betexplorer.com': HostLimit(rate=1.0, burst=3, in_flight=3)})
+        start: float = time.monotonic()
+        for _ in range(3):
+            async with limiter.limit('https://www.betexplorer.com/football/'):
+                pass
+        assert time.monotonic() - start < 0.5
+
+    @pytest.mark.asyncio
+    async def test_rate_after_burst(self) -> None:
+        """После исчерпания burst запросы идут с заданной частотой."""
+        limiter = RateLimiter({'www.betexplorer.com': HostLimit(rate=20.0, burst=1, in_flight=5)})
+        start: float = time.monotonic()
+        for _ in range(4):
+            async with limiter.limit('https://www.betexplorer.com/football/'):
+                pass
+        assert time.monotonic() - start >= 0.14
+
+    @pytest.mark.asyncio
+    async def test_in_flight(self) -> None:
+        """Одновременно выполняется не больше in_flight запросов."""
+        limiter = RateLimiter({'www.betexplorer.com': HostLimit(rate=1000.0, burst=100, in_flight=2)})
+        active: int = 0
+        peak: int = 0
+
+        async def request() -> None:
+            nonlocal active, peak
+            async with limiter.limit('https://www.betexplorer.com/football/'):
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*(request() for _ in range(8)))
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_unknown_host_uses_default(self) -> None:
+        """Сайт без явных ограничений использует ограничения по умолчанию."""
+        limiter = RateLimiter({DEFAULT_HOST: HostLimit(rate=1000.0, burst=1, in_flight=1)})
+        async with limiter.limit('https://example.com/'):
+            assert limiter._try_acquire(limiter._slot('https://other.com/')) > 0  # noqa: SLF001
+
+    @pytest.mark.asyncio
+    async def test_circuit_breaker(self) -> None:
+        """После failures ошибок подряд обращения к сайту приостанавливаются на cooldown секунд."""
+        limiter = RateLimiter(
+            {DEFAULT_HOST: HostLimit(rate=1000.0, burst=100, in_flight=10, failures=2, cooldown=0.2)})
+        url: str = 'https://www.betexplorer.com/football/'
+        assert not limiter.record_failure(url)
+        limiter.record_success(url)
+        assert not limiter.record_failure(url)
+        assert limiter.record_failure(url)
+        start: float = time.monotonic()
+        async with limiter.limit(url):
+            pass
+        assert time.monotonic() - start >= 0.15
+
+    def test_backoff(self) -> None:
+        """Пауза растет в 2 раза, не превышает max_delay и не меньше Retry-After."""
+        retry = RetryPolicy(attempts=4, base_delay=10.0, max_delay=30.0)
+        assert 5.0 <= retry.backoff(0) <= 10.0
+        assert 10.0 <= retry.backoff(1) <= 20.0
+        assert 15.0 <= retry.backoff(5) <= 30.0
+        assert retry.backoff(0, retry_after=25.0) == 25.0
+        assert retry.backoff(0, retry_after=1000.0) <= 30.0
@@ -0,0 +1,86 @@
+"""Тестирование распределения сезонов чемпионатов между рабочими процессами."""
+from typing import TYPE_CHECKING
+
+from app.betexplorer.schedule import Checkpoint, SeasonDone, WorkCosts, season_done
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from app.betexplorer.schemas import ChampionshipBetexplorer
+
+
+def championship(url: str) -> ChampionshipBetexplorer:
+    """Сезон чемпионата с заданной ссылкой."""
+    return {
+        'championship_id': None,
+        'sport_id': 1,
+        'country_id': None,
+        'championship_url': url,
+        'championship_name': url,
+        'championship_order': 0,
+        'championship_years': '2023/2024',
+    }
+
+
+class TestWorkCosts:
+    """Тест трудоемкости сезонов чемпионатов."""
+
+    def test_priority(self) -> None:
+        """Сначала сезоны с неизвестной трудоемкостью, затем по ее убыванию."""
+        costs: WorkCosts = WorkCosts()
+        costs.update({'/small/': 10, '/big/': 400, '/empty/': 0})
+        championships: list[ChampionshipBetexplorer] = [
+            championship(url) for url in ('/small/', '/empty/', '/new/', '/big/')]
+        assert [item['championship_url'] for item in sorted(championships, key=costs.priority)] == [
+            '/new/', '/big/', '/small/', '/empty/']
+
+    def test_complete_incremental(self) -> None:
+        """Инкрементальная загрузка сезона не меняет его трудоемкость."""
+        costs: WorkCosts = WorkCosts()
+        costs.update({'/big/': 400})
+        costs.complete({'/big/': SeasonDone(2, 'abc', incremental=True), '/new/': SeasonDone(50, 'def')})
+        assert costs.cost(championship('/big/')) == 400
+        assert costs.cost(championship('/new/')) == 50
+
+    def test_save(self, tmp_path: Path) -> None:
+        """Трудоемкость сохраняется для следующего запуска, испорченный файл не мешает работе."""
+        path: str = str(tmp_path / 'costs.json')
+        costs: WorkCosts = WorkCosts(path)
+        costs.update({'/big/': 400})
+        costs.save()
+        assert WorkCosts(path).cost(championship('/big/')) == 400
+        assert WorkCosts(path).cost(championship('/new/')) is None
+        (tmp_path / 'costs.json').write_text('[', encoding='utf-8')
+        assert WorkCosts(path).costs == {}
+
+
+class TestCheckpoint:
+    """Тест контрольной точки загрузки."""
+
+    def test_resume(self, tmp_path: Path) -> None:
+        """Завершенные сезоны пропускаются только при продолжении незавершенной загрузки."""
+        path: str = str(tmp_path / 'checkpoint.jsonl')
+        checkpoint: Checkpoint = Checkpoint(path)
+        checkpoint.complete(1, championship('/done/'), season_done([]))
+        checkpoint.close()
+        with (tmp_path / 'checkpoint.jsonl').open('a', encoding='utf-8') as f:
+            f.write('{"championship_url": "/bro')
+        checkpoint = Checkpoint(path, resume=True)
+        assert checkpoint.is_done(championship('/done/'))
+        assert not checkpoint.is_done(championship('/bro'))
+        assert checkpoint.done['/done/']['content_hash'] == season_done([]).content_hash
+        assert not checkpoint.done['/done/']['incremental']
+        checkpoint.complete(1, championship('/next/'), SeasonDone(3, 'abc', incremental=True))
+        checkpoint.close()
+        checkpoint = Checkpoint(path, resume=True)
+        assert checkpoint.is_done(championship('/next/'))
+        assert checkpoint.done['/next/']['incremental']
+        checkpoint.finish()
+        assert not Checkpoint(path, resume=True).is_done(championship('/done/'))
+        assert not Checkpoint(path).done
+
+    def test_season_done(self) -> None:
+        """Хэш зависит от счета матчей."""
+        match: dict = {'match_url': '/m/', 'game_date': None, 'home_score': 1, 'away_score': 0}
+        assert season_done([match]).matches == 1
+        assert season_done([match]) != season_done([{**match, 'home_score': 2}])
@@ -0,0 +1,79 @@
+"""Тестирование справочника команд, общего для рабочих процессов."""
+import asyncio
+import datetime  # noqa: ICN001
+import multiprocessing
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+
+from app.betexplorer.teams import TEAM_CLAIM_TIMEOUT, TeamRegistry
+from app.utilbase import Freshness
+
+if TYPE_CHECKING:
+    from app.betexplorer.schemas import TeamBetexplorer
+
+TEAM_URL: str = '/football/team/arsenal/hA1Zm19f/'
+
+
+def team(download_date: datetime.datetime) -> TeamBetexplorer:
+    """Команда, загруженная в заданное время."""
+    return {
+        'team_id': 1,
+        'sport_id': 1,
+        'team_name': 'Arsenal',
+        'team_full': 'Arsenal',
+        'team_url': TEAM_URL,
+        'team_country': 'England',
+        'country_id': 1,
+        'team_emblem': None,
+        'download_date': download_date,
+        'save_date': download_date,
+    }
+
+
+class TestTeamRegistry:
+    """Тест справочника команд."""
+
+    @pytest.mark.asyncio
+    async def test_claim(self) -> None:
+        """Отсутствующую команду загружает первый запросивший, неудачную загрузку может повторить другой."""
+        registry: TeamRegistry = TeamRegistry()
+        assert await registry.acquire(TEAM_URL) is None
+        await registry.release(TEAM_URL, None)
+        assert await registry.acquire(TEAM_URL) is None
+        loaded: TeamBetexplorer = team(datetime.datetime.now())  # noqa: DTZ005
+        await registry.release(TEAM_URL, loaded)
+        assert await registry.acquire(TEAM_URL) == loaded
+
+    @pytest.mark.asyncio
+    async def test_shared(self) -> None:
+        """Команда, которую загружает другой процесс, ожидается и берется из общего словаря."""
+        with multiprocessing.Manager() as manager:
+            shared, lock = manager.dict(), manager.Lock()
+            first: TeamRegistry = TeamRegistry(shared, lock)
+            second: TeamRegistry = TeamRegistry(shared, lock)
+            assert await first.acquire(TEAM_URL) is None
+            waiting: asyncio.Task = asyncio.create_task(second.acquire(TEAM_URL))
+            await asyncio.sleep(0.3)
+            assert not waiting.done()
+            loaded: TeamBetexplorer = team(datetime.datetime.now())  # noqa: DTZ005
+            await first.release(TEAM_URL, loaded)
+            assert await asyncio.wait_for(waiting, 5) == loaded
+
+    @pytest.mark.asyncio
+    async def test_expired_claim(self) -> None:
+        """Загрузка, прерванная другим процессом, занимается заново."""
+        registry: TeamRegistry = TeamRegistry({TEAM_URL: time.time() - TEAM_CLAIM_TIMEOUT - 1})
+        assert await registry.acquire(TEAM_URL) is None
+
+    @pytest.mark.asyncio
+    async def test_preload(self) -> None:
+        """Команда из базы данных не загружается, пока ее страница не устарела."""
+        freshness: Freshness = Freshness(datetime.timedelta(days=1))
+        fresh: TeamRegistry = TeamRegistry()
+        fresh.preload([team(datetime.datetime.now())])  # noqa: DTZ005
+        assert (await fresh.acquire(TEAM_URL, freshness))['team_id'] == 1
+        stale: TeamRegistry = TeamRegistry()
+        stale.preload([team(datetime.datetime.now() - datetime.timedelta(days=2))])  # noqa: DTZ005
+        assert await stale.acquire(TEAM_URL, freshness) is None
@@ -0,0 +1,378 @@
+"""Тесты загрузки и сохранения данных (LoadSave)."""
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+import datetime  # noqa: ICN001
+import json
+import os
+from typing import TYPE_CHECKING
+
+from aiohttp import web
+import pytest
+import pytest_asyncio
+from selectolax.lexbor import LexborNode
+from selectolax.parser import HTMLParser
+
+from app.betexplorer.betexplorer import CSS_RESULTS
+from app.betexplorer.freshness import FreshnessPolicy, PageKind
+from app.config import settings
+from app.ratelimit import DEFAULT_HOST, HostLimit, RateLimiter, RetryPolicy
+from app.utilbase import (
+    PARSER_LEXBOR,
+    Freshness,
+    LoadSave,
+    decode_odds_page,
+    gather_limited,
+    http_date,
+    retry_after_seconds,
+    to_utf8,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pytest_mock import MockerFixture
+
+
+@pytest.fixture
+def load_save() -> LoadSave:
+    """Загрузчик страниц из каталога с тестовыми данными."""
+    return LoadSave(
+        root_url='https://www.betexplorer.com',
+        root_dir=settings.DOWNLOAD_TEST_DIRECTORY,
+    )
+
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+
+@pytest_asyncio.fixture
+async def serve() -> AsyncIterator[Callable[[dict[str, Handler]], Awaitable[str]]]:
+    """Запуск тестовых сайтов с заданными обработчиками страниц (сайты останавливаются после теста)."""
+    runners: list[web.AppRunner] = []
+
+    async def start(routes: dict[str, Handler]) -> str:
+        app = web.Application()
+        for path, handler in routes.items():
+            app.router.add_get(path, handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        runners.append(runner)
+        await web.TCPSite(runner, '127.0.0.1', 0).start()
+        return f'http://127.0.0.1:{runner.addresses[0][1]}'
+
+    yield start
+    for runner in runners:
+        await runner.cleanup()
+
+
+@pytest_asyncio.fixture
+async def site(serve: Callable[[dict[str, Handler]], Awaitable[str]]) -> tuple[str, list[dict]]:
+    """Тестовый сайт, отдающий одну страницу с поддержкой ETag/If-Modified-Since."""
+    requests: list[dict] = []
+
+    async def page(request: web.Request) -> web.Response:
+        requests.append(dict(request.headers))
+        if request.headers.get('If-None-Match') == '"v1"':
+            return web.Response(status=304, headers={'ETag': '"v1"'})
+        return web.Response(text='<div class="page">Text</div>', content_type='text/html', headers={'ETag': '"v1"'})
+
+    return await serve({'/football/page/': page}), requests
+
+
+class TestGatherLimited:
+    """Тест одновременного выполнения задач с ограничением."""
+
+    @pytest.mark.asyncio
+    async def test_keeps_order_and_limit(self) -> None:
+        """Результаты возвращаются в порядке задач, одновременно выполняется не больше limit."""
+        active: int = 0
+        peak: int = 0
+
+        async def task(number: int) -> int:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01 * (5 - number))
+            active -= 1
+            return number
+
+        assert await gather_limited(2, *(task(number) for number in range(5))) == [0, 1, 2, 3, 4]
+        assert peak == 2
+
+
+class TestParserBackend:
+    """Тест выбора разборщика HTML."""
+
+    @pytest.mark.asyncio
+    async def test_lexbor(self) -> None:
+        """Страница разбирается выбранным разборщиком, результат совпадает с Modest."""
+        modest = LoadSave(root_url='https://www.betexplorer.com', root_dir=settings.DOWNLOAD_TEST_DIRECTORY)
+        lexbor = LoadSave(root_url='https://www.betexplorer.com', root_dir=settings.DOWNLOAD_TEST_DIRECTORY,
+                          parser_backend=PARSER_LEXBOR)
+        url: str = '/football/england/fa-cup/results/'
+        lexbor_page = await lexbor.get_read(url, CSS_RESULTS)
+        assert isinstance(lexbor_page.node, LexborNode)
+        assert lexbor_page.node.text() == (await modest.get_read(url, CSS_RESULTS)).node.text()
+        with pytest.raises(ValueError, match='html5'):
+            LoadSave(root_url='https://www.betexplorer.com', root_dir='.', parser_backend='html5')
+
+
+class TestCoalesce:
+    """Тест объединения одновременных одинаковых запросов."""
+
+    @pytest.mark.asyncio
+    async def test_get_read_coalesced(self, load_save: LoadSave, mocker: MockerFixture) -> None:
+        """Одновременные запросы одной страницы читают файл один раз и получают один результат."""
+        load_file = mocker.spy(load_save, 'load_file')
+        url: str = '/football/england/fa-cup/results/'
+        results = await asyncio.gather(*(load_save.get_read(url, CSS_RESULTS) for _ in range(3)))
+        assert load_file.call_count == 1
+        assert results[0] is not None
+        assert all(result is results[0] for result in results)
+        assert load_save.stats['coalesced'] == 2
+        assert not load_save._in_flight
+
+    @pytest.mark.asyncio
+    async def test_get_read_sequential(self, load_save: LoadSave, mocker: MockerFixture) -> None:
+        """Последовательные запросы не объединяются."""
+        load_file = mocker.spy(load_save, 'load_file')
+        url: str = '/football/england/fa-cup/results/'
+        await load_save.get_read(url, CSS_RESULTS)
+        await load_save.get_read(url, CSS_RESULTS)
+        assert load_file.call_count == 2
+        assert load_save.stats['coalesced'] == 0
+
+
+class TestRevalidation:
+    """Тест повторной проверки страниц на сервере (If-Modified-Since / ETag)."""
+
+    def test_http_date(self) -> None:
+        """Время файла переводится в UTC для заголовка If-Modified-Since."""
+        assert http_date(datetime.datetime(2024, 5, 1, 15, 30)) == 'Wed, 01 May 2024 12:30:00 GMT'  # noqa: DTZ001
+
+    @pytest.mark.asyncio
+    async def test_not_modified(self, site: tuple[str, list[dict]], tmp_path: Path) -> None:
+        """Неизменившаяся страница не скачивается повторно, используется сохраненный файл."""
+        root_url, requests = site
+        ls = LoadSave(root_url=root_url, root_dir=str(tmp_path))
+        await ls.load_data(load_net=True)
+        first = await ls.get_read('/football/page/', 'div.page')
+        second = await ls.get_read('/football/page/', 'div.page', need_refresh=True)
+        await ls.close_session()
+        assert 'If-None-Match' not in requests[0]
+        assert requests[1]['If-None-Match'] == '"v1"'
+        assert 'If-Modified-Since' in requests[1]
+        assert ls.stats['not_modified'] == 1
+        assert first.node.html == second.node.html
+        assert (tmp_path / 'football' / 'page.http.etag').read_text() == '"v1"'
+
+
+class TestEncoding:
+    """Тест перекодировки загруженных страниц."""
+
+    @pytest.mark.asyncio
+    async def test_bytes_page(self, serve: Callable[[dict[str, Handler]], Awaitable[str]], tmp_path: Path) -> None:
+        """Страница в другой кодировке перекодируется в UTF-8, сохраняется только найденный фрагмент."""
+        async def page(_request: web.Request) -> web.Response:
+            return web.Response(body='<p>Шапка</p><div class="page">Текст</div>'.encode('cp1251'),
+                                content_type='text/html', charset='windows-1251')
+
+        ls = LoadSave(root_url=await serve({'/football/page/': page}), root_dir=str(tmp_path))
+        await ls.load_data(load_net=True)
+        received = await ls.get_read('/football/page/', 'div.page')
+        await ls.close_session()
+        assert received.node.text() == 'Текст'
+        assert (tmp_path / 'football' / 'page.http').read_bytes() == '<div class="page">Текст</div>'.encode()
+        assert to_utf8(b'\xd2', 'cp1251') == '\N{CYRILLIC CAPITAL LETTER TE}'.encode()
+        assert to_utf8(b'\xd2', None) == b'\xd2'
+
+
+class TestConnectionPool:
+    """Тест пула соединений с сайтом."""
+
+    @pytest.mark.asyncio
+    async def test_keep_alive(self, site: tuple[str, list[dict]], tmp_path: Path) -> None:
+        """Параметры пула передаются в TCPConnector, соединение используется повторно."""
+        root_url, requests = site
+        ls = LoadSave(root_url=root_url, root_dir=str(tmp_path))
+        await ls.load_data(load_net=True, config_http={'limit': 3, 'limit_per_host': 2, 'force_close': False})
+        assert ls.connector.limit == 3
+        assert ls.connector.limit_per_host == 2
+        for _ in range(3):
+            await ls.get_file_bet(f'{root_url}/football/page/')
+        await ls.close_session()
+        assert len(requests) == 3
+        assert ls.stats['requests'] == 3
+        assert ls.stats['connections_created'] == 1
+        assert ls.stats['connections_reused'] == 2
+
+    @pytest.mark.asyncio
+    async def test_force_close(self, site: tuple[str, list[dict]], tmp_path: Path) -> None:
+        """При force_close каждый запрос открывает новое соединение."""
+        root_url, _ = site
+        ls = LoadSave(root_url=root_url, root_dir=str(tmp_path))
+        await ls.load_data(load_net=True, config_http={'limit': 3, 'force_close': True})
+        assert ls.connector.force_close
+        for _ in range(3):
+            await ls.get_file_bet(f'{root_url}/football/page/')
+        await ls.close_session()
+        assert ls.stats['connections_created'] == 3
+        assert ls.stats['connections_reused'] == 0
+
+
+class TestOddsPage:
+    """Тест извлечения HTML из страницы коэффициентов."""
+
+    def test_decode_odds_page(self) -> None:
+        """HTML извлекается из JSON, атрибуты onclick счетчика удаляются, остальные остаются."""
+        html: str = ('<table class="table-main">\n<tr><td><a href="/b/" onclick="dataLayer.push({\'e\': 1})"'
+                     ' class="bk">Bet365</a></td><td onclick="show()">1.5</td></tr></table>')
+        data: bytes = json.dumps({'odds': html}).encode()
+        decoded: bytes = decode_odds_page(data)
+        assert b'dataLayer' not in decoded
+        assert b'onclick="show()"' in decoded
+        node = HTMLParser(decoded).css_first('a')
+        assert dict(node.attrs) == {'href': '/b/', 'class': 'bk'}
+        assert node.text() == 'Bet365'
+        assert decode_odds_page(b'{"odds":"<p>\\"x\\"<\\/p>"}') == b'<p>"x"</p>'
+
+    def test_decode_odds_page_fallback(self, mocker: MockerFixture) -> None:
+        """Разбор JSON и разбор заменами без JSON дают одинаковый результат (переводы строк CRLF)."""
+        data: bytes = (b'{"odds":"<table class=\\"table-main\\">\\n<tr><td><a href=\\"\\/b\\/\\" '
+                       b'onclick=\\"dataLayer.push({\'e\': 1})\\">Bet365<\\/a><\\/td><\\/tr>\\n<\\/table>"}')
+        decoded: bytes = decode_odds_page(data)
+        assert decoded == b'<table class="table-main">\r\n<tr><td><a href="/b/">Bet365</a></td></tr>\r\n</table>'
+        mocker.patch('app.utilbase.json.loads', side_effect=ValueError)
+        assert decode_odds_page(data) == decoded
+
+
+class TestFreshness:
+    """Тест правил обновления сохраненных страниц."""
+
+    def test_is_stale(self) -> None:
+        """Страница устаревает по возрасту, окончательная страница не устаревает никогда."""
+        now = datetime.datetime(2024, 5, 10, 12, 0)  # noqa: DTZ001
+        assert Freshness(datetime.timedelta(hours=12)).is_stale(datetime.datetime(2024, 5, 9, 23, 0), now)  # noqa: DTZ001
+        assert not Freshness(datetime.timedelta(hours=12)).is_stale(datetime.datetime(2024, 5, 10, 1, 0), now)  # noqa: DTZ001
+        assert not Freshness().is_stale(datetime.datetime(2000, 1, 1), now)  # noqa: DTZ001
+        settled = Freshness(None, datetime.datetime(2024, 5, 9))  # noqa: DTZ001
+        assert settled.is_stale(datetime.datetime(2024, 5, 8), now)  # noqa: DTZ001
+        assert not settled.is_stale(datetime.datetime(2024, 5, 9, 1, 0), now)  # noqa: DTZ001
+
+    def test_policy(self) -> None:
+        """Архивные чемпионаты и сыгранные матчи не обновляются после окончательной загрузки."""
+        policy = FreshnessPolicy({PageKind.RESULTS: (datetime.timedelta(hours=1), None)})
+        now = datetime.datetime(2024, 5, 10)  # noqa: DTZ001
+        assert policy.is_archived('2022/2023', now)
+        assert not policy.is_archived('2023/2024', now)
+        assert not policy.is_archived('', now)
+        assert policy.page(PageKind.RESULTS) == Freshness(datetime.timedelta(hours=1))
+        assert policy.season(PageKind.RESULTS, '2019/2020') == Freshness(None, datetime.datetime(2021, 1, 1))  # noqa: DTZ001
+        match = policy.match(datetime.datetime(2024, 5, 1, 18, 0), '2023/2024', now=now)  # noqa: DTZ001
+        assert match.not_before == datetime.datetime(2024, 5, 3, 18, 0)  # noqa: DTZ001
+        assert policy.match(datetime.datetime(2024, 8, 1), '2024/2025', now=now).not_before is None  # noqa: DTZ001
+
+    def test_policy_match(self) -> None:
+        """Далекий матч не обновляется, ближайший и прошедший обновляются до окончательной загрузки."""
+        policy = FreshnessPolicy()
+        now = datetime.datetime.now()  # noqa: DTZ005
+        distant = policy.match(now + datetime.timedelta(days=30), '', now=now)
+        assert not distant.is_stale(now - datetime.timedelta(days=365), now)
+        upcoming = policy.match(now + datetime.timedelta(days=3), '', now=now)
+        assert upcoming.is_stale(now - datetime.timedelta(minutes=1), now)
+        played = policy.match(now - datetime.timedelta(days=5), '', now=now)
+        assert played.is_stale(now - datetime.timedelta(days=4), now)
+        assert not played.is_stale(now - datetime.timedelta(days=2), now)
+        assert policy.match(None, '', now=now) == policy.page(PageKind.MATCH)
+
+    @pytest.mark.asyncio
+    async def test_stale_page_revalidated(self, site: tuple[str, list[dict]], tmp_path: Path) -> None:
+        """Устаревшая страница проверяется на сервере, свежая читается с диска."""
+        root_url, requests = site
+        ls = LoadSave(root_url=root_url, root_dir=str(tmp_path))
+        await ls.load_data(load_net=True)
+        await ls.get_read('/football/page/', 'div.page')
+        await ls.get_read('/football/page/', 'div.page', freshness=Freshness(datetime.timedelta(days=1)))
+        assert len(requests) == 1
+        day_ago: float = (datetime.datetime.now() - datetime.timedelta(days=2)).timestamp()  # noqa: DTZ005
+        os.utime(tmp_path / 'football' / 'page.http', (day_ago, day_ago))
+        await ls.get_read('/football/page/', 'div.page', freshness=Freshness(datetime.timedelta(days=1)))
+        await ls.close_session()
+        assert len(requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_fetch(self, site: tuple[str, list[dict]], tmp_path: Path, mocker: MockerFixture) -> None:
+        """Свежая сохраненная страница не читается, отсутствующая и устаревшая загружаются."""
+        root_url, requests = site
+        ls = LoadSave(root_url=root_url, root_dir=str(tmp_path))
+        await ls.load_data(load_net=True)
+        load_saved = mocker.spy(ls, 'load_saved')
+        assert await ls.fetch('/football/page/', 'div.page') is not None
+        assert await ls.fetch('/football/page/', 'div.page', freshness=Freshness(datetime.timedelta(days=1)))
+        assert len(requests) == 1
+        assert load_saved.call_count == 0
+        day_ago: float = (datetime.datetime.now() - datetime.timedelta(days=2)).timestamp()  # noqa: DTZ005
+        os.utime(tmp_path / 'football' / 'page.http', (day_ago, day_ago))
+        assert await ls.fetch('/football/page/', 'div.page', freshness=Freshness(datetime.timedelta(days=1)))
+        await ls.close_session()
+        assert len(requests) == 2
+
+
+class TestRetry:
+    """Тест повтора неудачных запросов."""
+
+    def test_retry_after_seconds(self) -> None:
+        """Retry-After разбирается как количество секунд и как дата."""
+        assert retry_after_seconds('120') == 120.0
+        assert retry_after_seconds(None) is None
+        assert retry_after_seconds('soon') is None
+        assert retry_after_seconds('Wed, 01 May 2024 12:30:00 GMT') == 0.0
+
+    @pytest.mark.asyncio
+    async def test_retry_on_unavailable(self, serve: Callable[[dict[str, Handler]], Awaitable[str]],
+                                        tmp_path: Path) -> None:
+        """Ответ 503 повторяется с учетом Retry-After, 404 не повторяется."""
+        calls: list[str] = []
+
+        async def unavailable(request: web.Request) -> web.Response:
+            calls.append(request.path)
+            if len(calls) == 1:
+                return web.Response(status=503, headers={'Retry-After': '0'})
+            return web.Response(text='<div class="page">Text</div>', content_type='text/html')
+
+        async def missing(request: web.Request) -> web.Response:
+            calls.append(request.path)
+            return web.Response(status=404)
+
+        ls = LoadSave(root_url=await serve({'/football/page/': unavailable, '/football/missing/': missing}),
+                      root_dir=str(tmp_path))
+        await ls.load_data(load_net=True, limiter=RateLimiter({DEFAULT_HOST: HostLimit(100.0, 10, 10, 1, 0.05)}),
+                           retry_policy=RetryPolicy(attempts=3, base_delay=0.01, max_delay=0.05))
+        page = await ls.get_read('/football/page/', 'div.page')
+        missing_page = await ls.get_read('/football/missing/', 'div.page')
+        await ls.close_session()
+        assert page.node.text() == 'Text'
+        assert missing_page is None
+        assert calls == ['/football/page/', '/football/page/', '/football/missing/']
+        assert ls.stats['retries'] == 1
+        assert ls.stats['circuit_open'] == 1
+
+    @pytest.mark.asyncio
+    async def test_retry_after_clamped(self, serve: Callable[[dict[str, Handler]], Awaitable[str]],
+                                       tmp_path: Path) -> None:
+        """Слишком большой Retry-After не приостанавливает обращения к сайту дольше max_delay."""
+        calls: list[str] = []
+
+        async def unavailable(request: web.Request) -> web.Response:
+            calls.append(request.path)
+            if len(calls) == 1:
+                return web.Response(status=503, headers={'Retry-After': '86400'})
+            return web.Response(text='<div class="page">Text</div>', content_type='text/html')
+
+        ls = LoadSave(root_url=await serve({'/football/page/': unavailable}), root_dir=str(tmp_path))
+        await ls.load_data(load_net=True, limiter=RateLimiter({DEFAULT_HOST: HostLimit(100.0, 10, 10)}),
+                           retry_policy=RetryPolicy(attempts=3, base_delay=0.01, max_delay=0.05))
+        page = await asyncio.wait_for(ls.get_read('/football/page/', 'div.page'), 5)
+        await ls.close_session()
+        assert page.node.text() == 'Text'
+        assert len(calls) == 2
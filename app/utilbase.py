@@ -1,30 +1,73 @@
 """Обеспечение операций ввода-вывода с сайта и жесткого диска."""
 import asyncio
+import codecs
+from collections import Counter
 from contextlib import nullcontext
 import datetime
-from email.utils import parsedate_to_datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from http import HTTPStatus
 import inspect
-import multiprocessing
-import os
+import json
+import re
 import sys
 import traceback
-from typing import TYPE_CHECKING, Callable, NamedTuple, Optional, Union
+from typing import TYPE_CHECKING, Any, Final, NamedTuple, Optional
 from urllib.parse import parse_qsl, urljoin, urlparse
 
-import aiofiles
-from aiofiles import os as aiofiles_os
 import aiohttp
 
 # from aiofile import async_open, TextFileWrapper
-if TYPE_CHECKING:
-    from aiofiles.threadpool.text import AsyncTextIOWrapper
-from aiohttp import ClientConnectorError
-
-# from selectolax.lexbor import LexborHTMLParser, LexborNode
 from selectolax.parser import HTMLParser, Node
 
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # pragma: no cover - старые версии selectolax без lexbor
+    LexborHTMLParser = None
+
 from app.betexplorer.crud import DATABASE_NOT_USE, DatabaseUsage
 from app.database import DatabaseSessionManager
+from app.pagestore import FilePageStore, PageStore, ParsedCache
+from app.ratelimit import RateLimiter, RetryPolicy
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+    from types import SimpleNamespace
+
+SERVER_TIME_OFFSET: Final[datetime.timedelta] = datetime.timedelta(hours=3)
+"""Смещение времени сохраненных страниц относительно UTC (время в заголовке Date переводится в это время)."""
+
+PARSER_MODEST: Final[str] = 'modest'
+PARSER_LEXBOR: Final[str] = 'lexbor'
+HTML_PARSERS: Final[dict[str, type | None]] = {
+    PARSER_MODEST: HTMLParser,
+    PARSER_LEXBOR: LexborHTMLParser,
+}
+"""Разборщики HTML selectolax (None - не установлен)."""
+
+DEFAULT_CONFIG_HTTP: Final[dict] = {
+    'limit': 10,
+    'limit_per_host': 4,
+    'ttl_dns_cache': 300,
+    'keepalive_timeout': 30,
+    'force_close': False,
+}
+"""Параметры пула соединений по умолчанию (aiohttp.TCPConnector)."""
+
+
+async def gather_limited(limit: int, *aws: Awaitable) -> list[Any]:
+    """Выполнить задачи одновременно, но не более limit за раз.
+
+    :param limit: Количество одновременно выполняемых задач
+    :param aws: Задачи
+    :return: Результаты в порядке передачи задач
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(aw: Awaitable) -> Any:
+        async with semaphore:
+            return await aw
+
+    return list(await asyncio.gather(*(run(aw) for aw in aws)))
 
 
 def get_current_depth() -> int:
@@ -60,10 +103,112 @@ class ReceivedData(NamedTuple):
 class HTMLData(NamedTuple):
     """Скаченные из Интернета данные."""
 
-    text: Union[str, bytes]
-    """Данные."""
+    text: bytes
+    """Данные (тело ответа без перекодирования)."""
     creation_date: Optional[datetime.datetime]
     """Дата загрузки."""
+    status: int = HTTPStatus.OK
+    """Код ответа сервера (200 или 304 - страница не изменилась)."""
+    etag: str | None = None
+    """Версия страницы на сервере (заголовок ETag)."""
+    encoding: str | None = None
+    """Кодировка страницы (charset из Content-Type, None - файл, а не страница)."""
+
+
+def http_date(creation_date: datetime.datetime) -> str:
+    """Дата сохраненной страницы в формате заголовка If-Modified-Since.
+
+    :param creation_date: Дата загрузки страницы (время файла на диске)
+    """
+    return format_datetime((creation_date - SERVER_TIME_OFFSET).replace(tzinfo=datetime.UTC), usegmt=True)
+
+
+def html_parser(backend: str) -> type:
+    """Класс разборщика HTML по его имени.
+
+    :param backend: Имя разборщика ('modest', 'lexbor')
+    """
+    if backend not in HTML_PARSERS:
+        raise ValueError(f'Неизвестный разборщик HTML: {backend}')  # noqa: EM102, TRY003
+    if (parser := HTML_PARSERS[backend]) is None:
+        raise ValueError(f'Разборщик HTML {backend} не установлен (нужна более новая версия selectolax)')  # noqa: EM102, TRY003
+    return parser
+
+
+def to_utf8(data: bytes, encoding: str | None) -> bytes:
+    """Перекодировать страницу в UTF-8 (страницы сохраняются и разбираются в UTF-8).
+
+    :param data: Содержимое страницы
+    :param encoding: Кодировка страницы (None или UTF-8 - данные возвращаются как есть)
+    """
+    try:
+        if encoding is None or codecs.lookup(encoding).name == 'utf-8':
+            return data
+    except LookupError:
+        return data
+    return data.decode(encoding, errors='replace').encode('utf-8')
+
+
+REG_TRACKING_ONCLICK: Final[re.Pattern] = re.compile(r'(<a\b[^>]*?)\s+onclick="dataLayer\.push[^"]*"')
+"""Атрибут onclick ссылки со счетчиком посещений (dataLayer.push)."""
+
+
+def decode_odds_page(data: bytes) -> bytes:
+    """Извлечение HTML из страницы коэффициентов ({"odds": "<html>"}) без атрибутов onclick счетчика посещений.
+
+    Переводы строк заменяются на CRLF, как в сохраненных ранее страницах коэффициентов.
+
+    :param data: Тело ответа сервера в UTF-8
+    """
+    try:
+        html: str = json.loads(data)['odds'].replace('\n', '\r\n')
+    except (ValueError, KeyError, TypeError, AttributeError):
+        html = data.replace(b'\\n', b'\r\n').replace(b'\\"', b'"').replace(b'\\/', b'/')[9:-2].decode('utf-8')
+    return REG_TRACKING_ONCLICK.sub(r'\1', html).encode('utf-8')
+
+
+def retry_after_seconds(value: str | None) -> float | None:
+    """Пауза из заголовка Retry-After (количество секунд или дата).
+
+    :param value: Значение заголовка
+    :return: Пауза в секундах или None, если заголовка нет или он не разобран
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_date: datetime.datetime = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_date.tzinfo is None:
+        retry_date = retry_date.replace(tzinfo=datetime.UTC)
+    return max(0.0, (retry_date - datetime.datetime.now(datetime.UTC)).total_seconds())
+
+
+class Freshness(NamedTuple):
+    """Требования к свежести сохраненной страницы."""
+
+    max_age: datetime.timedelta | None = None
+    """Допустимый возраст страницы (None - не ограничен)."""
+    not_before: datetime.datetime | None = None
+    """Страница, загруженная после этой даты, окончательная и больше не обновляется."""
+
+    def is_stale(self, creation_date: datetime.datetime, now: datetime.datetime | None = None) -> bool:
+        """Сохраненную страницу нужно загрузить заново.
+
+        :param creation_date: Дата загрузки страницы (время файла на диске)
+        :param now: Текущее время
+        """
+        now = now or datetime.datetime.now()  # noqa: DTZ005
+        if self.not_before is not None:
+            if creation_date >= self.not_before:
+                return False
+            if self.not_before <= now:
+                return True
+        return self.max_age is not None and creation_date + self.max_age < now
 
 
 class LoadSave():
@@ -73,11 +218,17 @@ class LoadSave():
             self,
             root_url: str,
             root_dir: str,
+            store: PageStore | None = None,
+            parsed: ParsedCache | None = None,
+            parser_backend: str = PARSER_MODEST,
     ) -> None:
         """Инициализация класса для загрузки данных.
 
         :param root_url: Путь к коренной папки сайта
         :param root_dir: Путь для сохранения данных на диске
+        :param store: Хранилище сохраненных страниц (по умолчанию отдельные файлы в root_dir)
+        :param parsed: Сохраненные результаты разбора страниц (None - страницы всегда разбираются заново)
+        :param parser_backend: Разборщик HTML ('modest', 'lexbor')
         """
         self.headers: dict = {
             'referer': root_url,
@@ -85,10 +236,18 @@ class LoadSave():
         }
         self.root_url = root_url
         self.root_dir = root_dir
+        self.store: PageStore = store if store is not None else FilePageStore(root_dir)
+        self.parsed: ParsedCache | None = parsed
+        self.html_parser: type = html_parser(parser_backend)
         self.load_net = False
         self.connector = None
         self._session = None
-        self._lock = nullcontext()
+        self._limiter: RateLimiter | None = None
+        self.retry_policy: RetryPolicy = RetryPolicy()
+        self.config_http: dict = DEFAULT_CONFIG_HTTP
+        self.concurrency: int = 1
+        self.stats: Counter = Counter()
+        self._in_flight: dict[tuple, asyncio.Future] = {}
 
     async def __aexit__(self, *error_details) -> None:
         await self.close_session()
@@ -98,96 +257,184 @@ class LoadSave():
 
     def open_session(self) -> None:
         """Открыть соединение с сетью Интернет."""
-        self.connector = aiohttp.TCPConnector(limit=1, force_close=True)
-        self._session: aiohttp.ClientSession = aiohttp.ClientSession(connector=self.connector)
+        self.connector = aiohttp.TCPConnector(**self.config_http)
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_create_end.append(self._on_connection_create)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuse)
+        self._session: aiohttp.ClientSession = aiohttp.ClientSession(
+            connector=self.connector, trace_configs=[trace_config])
+
+    async def _on_request_start(self, _session: aiohttp.ClientSession, _context: SimpleNamespace,
+                                _params: aiohttp.TraceRequestStartParams) -> None:
+        """Подсчет запросов."""
+        self.stats['requests'] += 1
+
+    async def _on_connection_create(self, _session: aiohttp.ClientSession, _context: SimpleNamespace,
+                                    _params: aiohttp.TraceConnectionCreateEndParams) -> None:
+        """Подсчет новых соединений (каждое - это отдельное TCP+TLS рукопожатие)."""
+        self.stats['connections_created'] += 1
+
+    async def _on_connection_reuse(self, _session: aiohttp.ClientSession, _context: SimpleNamespace,
+                                   _params: aiohttp.TraceConnectionReuseconnParams) -> None:
+        """Подсчет повторно использованных соединений (сэкономленные рукопожатия)."""
+        self.stats['connections_reused'] += 1
 
     async def close_session(self) -> None:
-        """Закрыть соединение с сетью Интернет."""
+        """Закрыть соединение с сетью Интернет и хранилище страниц."""
         if self._session is not None:
             await self._session.close()
         if self.connector is not None:
             await self.connector.close()
+        self.store.close()
+        if self.parsed is not None:
+            self.parsed.close()
 
     async def load_data(
             self,
             load_net: bool = False,
-            lock: Optional[multiprocessing.Lock] = None,
+            limiter: RateLimiter | None = None,
+            config_http: dict | None = None,
+            concurrency: int = 1,
+            retry_policy: RetryPolicy | None = None,
     ) -> None:
         """Загрузка списка всех чемпионатов во всех странах.
 
         :param load_net: Загружать из интернета False - нет (использовать только сохраненные на диске), True - да
-        :param lock: Действия требующие монополизма
+        :param limiter: Ограничитель частоты запросов, общий для всех процессов
+        :param config_http: Параметры пула соединений (aiohttp.TCPConnector)
+        :param concurrency: Количество страниц, загружаемых одновременно
+        :param retry_policy: Правила повтора неудачных запросов
         """
-        if lock is not None:
-            self._lock = lock
+        self._limiter = limiter
+        if retry_policy is not None:
+            self.retry_policy = retry_policy
+        self.concurrency = concurrency
+        if config_http is not None:
+            self.config_http = config_http
         self.load_net = load_net
         if load_net:
             self.open_session()
 
-    async def get_file_bet(self, url: str, is_bytes: bool = False) -> Optional[HTMLData]:
+    async def _coalesce(self, key: tuple, factory: Callable[[], Awaitable]) -> Any:
+        """Объединить одновременные одинаковые запросы в один.
+
+        Если запрос с таким ключом уже выполняется, ожидается его результат, новый запрос не выполняется.
+
+        :param key: Ключ запроса
+        :param factory: Функция, создающая запрос
+        """
+        if (task := self._in_flight.get(key)) is not None:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(task)
+        task = asyncio.ensure_future(factory())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda done: self._in_flight.pop(key) if self._in_flight.get(key) is done else None)
+        return await asyncio.shield(task)
+
+    async def get_file_bet(self, url: str, is_bytes: bool = False,
+                           headers: dict | None = None) -> HTMLData | None:
         """Скачать данные из интернета.
 
         :param url: Путь к странице для скачивания
         :param is_bytes: Данные являются файлом (набор байт)
+        :param headers: Дополнительные заголовки запроса (If-Modified-Since, If-None-Match)
         """
-        with self._lock:
-            retries: int = 0
-            delay: float = 60.0
-            if url == 'javascript:void(0);':
-                print(datetime.datetime.now(), flush=True)
-                print(url, flush=True)
-                return None
-            while retries < 4:
-                try:
-                    r: aiohttp.ClientResponse
-                    async with self._session.get(url, headers=self.headers, timeout=200) as r:
-                        if r.status != 200:
-                            return None
-                            # r.raise_for_status()
+        return await self._coalesce(('get_file_bet', url, is_bytes, tuple(sorted((headers or {}).items()))),
+                                    lambda: self._get_file_bet(url, is_bytes=is_bytes, headers=headers))
+
+    async def _get_file_bet(self, url: str, *, is_bytes: bool, headers: dict | None) -> HTMLData | None:
+        """Скачать данные из интернета (без объединения запросов).
+
+        :param url: Путь к странице для скачивания
+        :param is_bytes: Данные являются файлом (набор байт)
+        :param headers: Дополнительные заголовки запроса
+        """
+        if url == 'javascript:void(0);':
+            print(datetime.datetime.now(), flush=True)
+            print(url, flush=True)
+            return None
+        attempt: int = 0
+        while True:
+            retry_after: float | None = None
+            try:
+                r: aiohttp.ClientResponse
+                async with (self._limiter.limit(url) if self._limiter is not None else nullcontext(),
+                            self._session.get(url, headers=self.headers if headers is None else self.headers | headers,
+                                              timeout=200) as r):
+                    if r.status in self.retry_policy.statuses:
+                        retry_after = retry_after_seconds(r.headers.get('Retry-After'))
+                        reason: str = f'HTTP {r.status}'
+                    elif r.status not in {HTTPStatus.OK, HTTPStatus.NOT_MODIFIED}:
+                        self.record_success(url)
+                        print(f'{datetime.datetime.now()} HTTP {r.status}: {url}', flush=True)  # noqa: DTZ005, T201
+                        return None
+                    else:
                         try:
                             creation_date = parsedate_to_datetime(r.headers['Date'])
                             if creation_date.tzinfo is not None and creation_date.tzinfo.utcoffset(creation_date) is not None:
-                                creation_date = creation_date.replace(tzinfo=None) + datetime.timedelta(hours=3)
+                                creation_date = creation_date.replace(tzinfo=None) + SERVER_TIME_OFFSET
                         except (ValueError, KeyError):
                             creation_date: datetime.datetime = datetime.datetime.now()
-                        if not is_bytes:
-                            return HTMLData(await r.text(), creation_date)
-                        return HTMLData(await r.read(), creation_date)
-                except (ClientConnectorError, ConnectionRefusedError, asyncio.TimeoutError) as ex:
-                    print(datetime.datetime.now(), flush=True)
-                    print(url, flush=True)
-                    print(ex, flush=True)
-                    await asyncio.sleep(delay)
-                    delay *= 2
-                    retries += 1
-                except RecursionError as ex:
-                    print(datetime.datetime.now(), flush=True)
-                    print(url, flush=True)
-                    print(ex, flush=True)
-                    print(traceback.format_exc())
-                    print(f'Текущая глубина: {get_current_depth()}')
-                    print(f'Текущая глубина2: {get_current_depth2()}')
-                    await asyncio.sleep(delay)
-                    delay *= 2
-                    retries += 1
-                except Exception as ex:
-                    print(datetime.datetime.now(), flush=True)
-                    print(url, flush=True)
-                    print(ex, flush=True)
-                    print('Неизвестная ошибка', flush=True)
-                    await asyncio.sleep(delay)
-                    delay *= 2
-                    retries += 1
-            return None
+                        ret = HTMLData(b'' if r.status == HTTPStatus.NOT_MODIFIED else await r.read(),
+                                       creation_date, r.status, r.headers.get('ETag'),
+                                       None if is_bytes else r.charset or 'utf-8')
+                        self.record_success(url)
+                        return ret
+            except (TimeoutError, aiohttp.ClientError, ConnectionError) as ex:
+                reason = str(ex) or type(ex).__name__
+            except RecursionError as ex:
+                print(datetime.datetime.now(), flush=True)
+                print(url, flush=True)
+                print(ex, flush=True)
+                print(traceback.format_exc())
+                print(f'Текущая глубина: {get_current_depth()}')
+                print(f'Текущая глубина2: {get_current_depth2()}')
+                return None
+            except Exception as ex:
+                print(datetime.datetime.now(), flush=True)
+                print(url, flush=True)
+                print(ex, flush=True)
+                print('Неизвестная ошибка', flush=True)
+                print(traceback.format_exc())
+                return None
+            self.record_failure(url, retry_after)
+            attempt += 1
+            if attempt >= self.retry_policy.attempts:
+                print(f'{datetime.datetime.now()} Не удалось загрузить ({reason}): {url}', flush=True)  # noqa: DTZ005, T201
+                return None
+            delay: float = self.retry_policy.backoff(attempt - 1, retry_after)
+            self.stats['retries'] += 1
+            print(f'{datetime.datetime.now()} {reason}, повтор через {delay:.0f} с: {url}', flush=True)  # noqa: DTZ005, T201
+            await asyncio.sleep(delay)
 
-    async def load_file(self, file_path: str) -> str:
-        """Чтение файла с диска.
+    def record_success(self, url: str) -> None:
+        """Сайт ответил, счетчик ошибок предохранителя сбрасывается.
 
-        :param file_path: Путь к файлу
+        :param url: Адрес страницы
         """
-        f: AsyncTextIOWrapper
-        async with aiofiles.open(file_path, mode='r', encoding='utf-8') as f:
-            return await f.read()
+        if self._limiter is not None:
+            self._limiter.record_success(url)
+
+    def record_failure(self, url: str, retry_after: float | None) -> None:
+        """Сайт не ответил или ответил временной ошибкой.
+
+        :param url: Адрес страницы
+        :param retry_after: Пауза, которую запросил сервер, секунд (ограничивается retry_policy.max_delay)
+        """
+        if self._limiter is None:
+            return
+        if retry_after is not None:
+            self._limiter.pause(url, min(retry_after, self.retry_policy.max_delay))
+        if self._limiter.record_failure(url):
+            self.stats['circuit_open'] += 1
+
+    async def load_file(self, key: str) -> str | bytes:
+        """Чтение сохраненной страницы для разбора (сжатая страница распаковывается сразу в байты для HTMLParser).
+
+        :param key: Ключ страницы в хранилище
+        """
+        return await self.store.read_html(key)
 
     # async def load_file2(self, file_path: str) -> str:
     #     """Чтение файла с диска.
@@ -198,107 +445,255 @@ class LoadSave():
     #     async with async_open(file_path, mode='r', encoding='utf-8') as f:
     #         return await f.read()
 
-    async def save_file(self, file_path: str, text: str, creation_date: datetime.datetime, is_bytes: bool = False) -> None:
-        """Запись файла на диск.
+    async def save_file(self, key: str, text: str | bytes, creation_date: datetime.datetime) -> None:
+        """Сохранение страницы.
+
+        :param key: Ключ страницы в хранилище
+        :param text: Содержимое страницы (текст или набор байт)
+        :param creation_date: Дата загрузки страницы
+        """
+        await self.store.write(key, text, creation_date)
+
+    async def save_etag(self, key: str, etag: str | None) -> None:
+        """Запомнить версию страницы на сервере.
+
+        :param key: Ключ страницы в хранилище
+        :param etag: Версия страницы (заголовок ETag)
+        """
+        await self.store.set_etag(key, etag)
+
+    async def conditional_headers(self, key: str, creation_date: datetime.datetime) -> dict:
+        """Заголовки для проверки, изменилась ли страница с момента сохранения.
+
+        :param key: Ключ страницы в хранилище
+        :param creation_date: Дата загрузки сохраненной страницы
+        """
+        headers: dict = {
+            'If-Modified-Since': http_date(creation_date),
+        }
+        if (etag := await self.store.get_etag(key)) is not None:
+            headers['If-None-Match'] = etag
+        return headers
+
+    async def touch_file(self, key: str, creation_date: datetime.datetime) -> None:
+        """Отметить сохраненную страницу как проверенную (страница на сервере не изменилась).
 
-        :param file_path: Путь к файлу
-        :param text: Содержимое файла
-        :param creation_date: Время модификации создаваемого файла
-        :param is_bytes: Сохранять данные как набор байт
+        :param key: Ключ страницы в хранилище
+        :param creation_date: Дата проверки
         """
-        await aiofiles_os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        f: AsyncTextIOWrapper
-        if not is_bytes:
-            async with aiofiles.open(file_path, mode='w', encoding='utf-8') as f:
-                await f.write(text)
-                await f.flush()
+        self.stats['not_modified'] += 1
+        await self.store.touch(key, creation_date)
+
+    async def load_saved(self, key: str, url: str, class_: str,
+                         creation_date: datetime.datetime) -> ReceivedData | None:
+        """Чтение и разбор сохраненной страницы.
+
+        :param key: Ключ страницы в хранилище
+        :param url: Путь к странице
+        :param class_: Имя класса который надо найти в файле
+        :param creation_date: Дата загрузки страницы
+        """
+        # async with aiofiles.open(file_path, mode='r', encoding='utf-8') as f:
+        #     rrr: str = await f.read()
+        # ret_node: Optional[Node] = HTMLParser(rrr).css_first(class_)
+        if class_ == '':
+            save_text: str | bytes = await self.load_file(key)
+            ret_node: Node | None = self.html_parser(save_text)
         else:
-            async with aiofiles.open(file_path, mode='wb') as f:
-                await f.write(text)
-                await f.flush()
-        dt_epoch: float = creation_date.timestamp()
-        os.utime(file_path, (dt_epoch, dt_epoch))
+            ret_node: Node | None = self.html_parser(await self.load_file(key)).css_first(class_)
+        if (ret_node is None) and (class_ != ''):
+            print(f'{datetime.datetime.now()} Not found: url = {url} class_= {class_}', flush=True)
+            return None
+        return ReceivedData(ret_node, creation_date)
+
+    @staticmethod
+    def is_stale(creation_date: datetime.datetime, freshness: Freshness | None) -> bool:
+        """Сохраненная страница устарела и ее нужно загрузить заново.
+
+        :param creation_date: Дата загрузки сохраненной страницы
+        :param freshness: Требования к свежести страницы
+        """
+        return freshness is not None and freshness.is_stale(creation_date)
+
+    @staticmethod
+    def page_key(url: str, suffix: str = '') -> str | None:
+        """Ключ страницы в хранилище: путь страницы на сайте (параметры запроса добавляются к имени).
+
+        :param url: Путь к странице
+        :param suffix: Расширение, добавляемое к имени
+        """
+        url_p = urlparse(url)
+        params: str = '_' + '_'.join('%s_%s' % e for e in parse_qsl(url_p.query)) if url_p.query else ''
+        split_url: list = [x for x in url_p.path.split('/') if x]
+        if not split_url:
+            return None
+        split_url[-1] += params + suffix
+        return '/'.join(split_url)
 
     async def get_read(self,
                        url: str,
                        class_: str,
                        need_refresh: bool = False,
+                       freshness: Freshness | None = None,
                        ) -> Optional[ReceivedData]:
         """Загрузка файла из интернета или скачивание с диска.
 
         :param url: Путь к странице для скачивания
         :param class_: Имя класса который надо найти в файле
         :param need_refresh: Необходимо обновить данные
+        :param freshness: Требования к свежести сохраненной страницы
         """
-        url_p = urlparse(url)
-        params: str = '_' + '_'.join('%s_%s' % e for e in parse_qsl(url_p.query)) if url_p.query else ''
-        split_url: list = [x for x in url_p.path.split('/') if x]
-        dir_adr: str = os.path.join(self.root_dir, *split_url[:-1])
-        file_name: str = split_url[-1] + params + '.http'
-        file_path: str = os.path.join(dir_adr, file_name)
-        if (not need_refresh or not self.load_net) and await aiofiles_os.path.exists(file_path):
-            # async with aiofiles.open(file_path, mode='r', encoding='utf-8') as f:
-            #     rrr: str = await f.read()
-            # ret_node: Optional[Node] = HTMLParser(rrr).css_first(class_)
-            if class_ == '':
-                save_text: str = await self.load_file(file_path)
-                ret_node: Node | None = HTMLParser(save_text)
-            else:
-                ret_node: Node | None = HTMLParser(await self.load_file(file_path)).css_first(class_)
-            date_file: datetime.datetime = datetime.datetime.fromtimestamp(await aiofiles_os.path.getmtime(file_path))
-            if (ret_node is None) and (class_ != ''):
-                print(f'{datetime.datetime.now()} Not found: url = {url} class_= {class_}', flush=True)
-                return None
-            return ReceivedData(ret_node, date_file)
+        return await self._coalesce(
+            ('get_read', url, class_, need_refresh, freshness),
+            lambda: self._get_read(url, class_, need_refresh=need_refresh, freshness=freshness))
+
+    async def _get_read(self, url: str, class_: str, *, need_refresh: bool,
+                        freshness: Freshness | None = None) -> ReceivedData | None:
+        """Загрузка файла из интернета или скачивание с диска (без объединения запросов).
+
+        :param url: Путь к странице для скачивания
+        :param class_: Имя класса который надо найти в файле
+        :param need_refresh: Необходимо обновить данные
+        :param freshness: Требования к свежести сохраненной страницы
+        """
+        key: str = self.page_key(url, '.http')
+        creation_date: datetime.datetime | None = await self.store.creation_date(key)
+        if self.load_net and creation_date is not None and not need_refresh:
+            need_refresh = self.is_stale(creation_date, freshness)
+        if (not need_refresh or not self.load_net) and creation_date is not None:
+            try:
+                return await self.load_saved(key, url, class_, creation_date)
+            except FileNotFoundError:  # файл удален вне программы, страница загружается заново
+                creation_date = None
         if self.load_net:
             ret: HTMLData | None
-            if (ret := await self.get_file_bet(urljoin(self.root_url, url))) is not None:
-                save_text: str = ret.text
+            if (ret := await self.get_file_bet(
+                    urljoin(self.root_url, url),
+                    headers=await self.conditional_headers(key, creation_date)
+                    if creation_date is not None else None)) is not None:
+                if ret.status == HTTPStatus.NOT_MODIFIED:
+                    await self.touch_file(key, ret.creation_date)
+                    return await self.load_saved(key, url, class_, ret.creation_date)
+                save_text: bytes = to_utf8(ret.text, ret.encoding)
                 ret_node: Node | None = None
                 if class_ == '':
-                    save_text = save_text.replace('\\n', '\r\n')
-                    save_text = save_text.replace('\\"', '"')
-                    save_text = save_text.replace('\\/', '/')
-                    save_text = save_text[9:-2]
-                    ret_node: Node | None = HTMLParser(save_text)
-                    for node in ret_node.css('a[onclick]'):
-                        if node.attrs['onclick'][:14] == 'dataLayer.push':
-                            del node.attrs['onclick']
-                    save_text = ret_node.html
-                elif (ret_node := HTMLParser(save_text).css_first(class_)) is not None:
-                    save_text = ret_node.html
-                await self.save_file(file_path, save_text, ret.creation_date)
+                    ret_node: Node | None = self.html_parser(decode_odds_page(save_text))
+                    save_text = ret_node.html.encode('utf-8')
+                elif (ret_node := self.html_parser(save_text).css_first(class_)) is not None:
+                    save_text = ret_node.html.encode('utf-8')
+                await self.save_file(key, save_text, ret.creation_date)
+                await self.save_etag(key, ret.etag)
                 if (ret_node is None) and (class_ != ''):
                     print(f'{datetime.datetime.now()} Not found: url = {url} class_= {class_}', flush=True)
                     return None
                 return ReceivedData(ret_node, ret.creation_date)
         return None
 
+    async def fetch(self,
+                    url: str,
+                    class_: str,
+                    need_refresh: bool = False,  # noqa: FBT001, FBT002
+                    freshness: Freshness | None = None) -> datetime.datetime | None:
+        """Загрузка страницы в хранилище, если ее там нет или она устарела (сохраненная страница не читается).
+
+        :param url: Путь к странице для скачивания
+        :param class_: Имя класса который надо найти в файле
+        :param need_refresh: Необходимо обновить данные
+        :param freshness: Требования к свежести сохраненной страницы
+        :return: Дата загрузки страницы или None, если страница не загружена
+        """
+        creation_date: datetime.datetime | None = await self.store.creation_date(self.page_key(url, '.http'))
+        if creation_date is not None and not (
+                self.load_net and (need_refresh or self.is_stale(creation_date, freshness))):
+            return creation_date
+        soup: ReceivedData | None
+        if (soup := await self.get_read(url, class_, need_refresh, freshness)) is None:
+            return None
+        return soup.creation_date
+
+    async def get_parsed(self,  # noqa: PLR0913
+                         url: str,
+                         class_: str,
+                         parser: Callable[..., Any],
+                         *args: Any,
+                         version: int = 0,
+                         need_refresh: bool = False,
+                         freshness: Freshness | None = None,
+                         on_cached: Callable[[Any], None] | None = None) -> Any:
+        """Загрузка страницы и ее разбор, с использованием сохраненного результата разбора.
+
+        :param url: Путь к странице для скачивания
+        :param class_: Имя класса который надо найти в файле
+        :param parser: Функция разбора страницы (первый параметр - ReceivedData)
+        :param args: Остальные параметры функции разбора
+        :param version: Версия разбора страниц (при ее изменении сохраненные результаты не используются)
+        :param need_refresh: Необходимо обновить данные
+        :param freshness: Требования к свежести сохраненной страницы
+        :param on_cached: Функция, вызываемая для результата, взятого из сохраненных
+        :return: Результат разбора или None, если страница не загружена
+        """
+        key: str | None = None
+        kind: str = f'{parser.__name__}{args!r}'
+        if self.parsed is not None:
+            key = self.page_key(url, '.http')
+            creation_date: datetime.datetime | None = await self.store.creation_date(key)
+            if (creation_date is not None
+                    and not (self.load_net and (need_refresh or self.is_stale(creation_date, freshness)))
+                    and (value := await self.parsed.get(key, kind, creation_date, version)) is not None):
+                self.stats['parsed_cached'] += 1
+                if on_cached is not None:
+                    on_cached(value)
+                return value
+        soup: ReceivedData | None
+        if (soup := await self.get_read(url, class_, need_refresh, freshness)) is None:
+            return None
+        value = parser(soup, *args)
+        if self.parsed is not None and value is not None:
+            await self.parsed.put(key, kind, soup.creation_date, version, value)
+        return value
+
     async def get_as_file(self,
                           url: str,
-                          need_refresh: bool = False) -> Optional[bytes]:
+                          need_refresh: bool = False,
+                          freshness: Freshness | None = None) -> bytes | None:
         """Загрузка файла из интернета в каталог.
 
         :param url: Путь к странице для скачивания
         :param need_refresh: Необходимо обновить данные
+        :param freshness: Требования к свежести сохраненного файла
         """
-        url_p = urlparse(url)
-        params: str = '_' + '_'.join('%s_%s' % e for e in parse_qsl(url_p.query)) if url_p.query else ''
-        try:
-            split_url: list = [x for x in url_p.path.split('/') if x]
-        except:
+        return await self._coalesce(('get_as_file', url, need_refresh, freshness),
+                                    lambda: self._get_as_file(url, need_refresh=need_refresh, freshness=freshness))
+
+    async def _get_as_file(self, url: str, *, need_refresh: bool,
+                           freshness: Freshness | None = None) -> bytes | None:
+        """Загрузка файла из интернета в каталог (без объединения запросов).
+
+        :param url: Путь к странице для скачивания
+        :param need_refresh: Необходимо обновить данные
+        :param freshness: Требования к свежести сохраненного файла
+        """
+        if (key := self.page_key(urlparse(url).path)) is None:
             print(f'Error in split: {url}', flush=True)
             return None
-        dir_adr: str = os.path.join(self.root_dir, *split_url[:-1])
-        file_name: str = split_url[-1]
-        file_path: str = os.path.join(dir_adr, file_name)
-        if (not need_refresh or not self.load_net) and await aiofiles_os.path.exists(file_path):
-            f: AsyncTextIOWrapper
-            async with aiofiles.open(file_path, mode='rb') as f:
-                return await f.read()
+        creation_date: datetime.datetime | None = await self.store.creation_date(key)
+        if self.load_net and creation_date is not None and not need_refresh:
+            need_refresh = self.is_stale(creation_date, freshness)
+        if (not need_refresh or not self.load_net) and creation_date is not None:
+            try:
+                return await self.store.read_bytes(key)
+            except FileNotFoundError:  # файл удален вне программы, он загружается заново
+                creation_date = None
         if self.load_net:
             ret: Optional[HTMLData]
-            if (ret := await self.get_file_bet(urljoin(self.root_url, url), is_bytes=True)) is not None:
-                await self.save_file(file_path, ret.text, ret.creation_date, is_bytes=True)
+            if (ret := await self.get_file_bet(
+                    urljoin(self.root_url, url), is_bytes=True,
+                    headers=await self.conditional_headers(key, creation_date)
+                    if creation_date is not None else None)) is not None:
+                if ret.status == HTTPStatus.NOT_MODIFIED:
+                    await self.touch_file(key, ret.creation_date)
+                    return await self.store.read_bytes(key)
+                await self.save_file(key, ret.text, ret.creation_date)
+                await self.save_etag(key, ret.etag)
                 return ret.text
         return None